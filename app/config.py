@@ -4,12 +4,18 @@ from dotenv import load_dotenv
 
 from app.integrations.matching import (
     DEFAULT_CONTAINER_SEGMENTS,
+    DEFAULT_CROSS_PLATFORM_MIN_SCORE,
     DEFAULT_CROSS_PLATFORM_MIN_SLUG_LEN,
     DEFAULT_LANG_PREFIXES,
+    DEFAULT_NAME_FUZZY_THRESHOLD,
     DEFAULT_SERVICE_BLOCKLIST,
     DEFAULT_SLUG_STOPLIST,
     DEFAULT_SUBPAGE_SEGMENTS,
 )
+from app.utils.resource_blocker import (
+    DEFAULT_BLOCKED_DOMAINS,
+    DEFAULT_BLOCKED_RESOURCE_TYPES,
+)
 
 
 def _parse_bool(value: str | None, default: bool) -> bool:
@@ -51,6 +57,14 @@ class Config:
     run_headless: bool
     timeout_ms: int
     user_agent: str | None
+    http_timeout_sec: float
+    http_retries: int
+    http_max_connections: int
+    http2: bool
+    block_resources: bool
+    block_resource_types: tuple[str, ...]
+    block_domains: tuple[str, ...]
+    allow_domains: tuple[str, ...]
     state_path: str
     max_telegram_chars: int
     log_level: str
@@ -62,6 +76,9 @@ class Config:
     source1_next_button_selector: str
     source1_coords_selector: str
     source1_detail_links: str
+    source1_detail_concurrency: int
+    source1_measure_waits: bool
+    source1_mode: str
     source2_url: str
     source2_next_button: str
     source2_month_list_links: str
@@ -72,6 +89,16 @@ class Config:
     opencage_base_url: str
     opencage_api_key: str
     opencage_delay_sec: float
+    opencage_burst: int
+    opencage_daily_quota: int
+    opencage_quota_reserve: int
+    opencage_ledger_path: str
+    geocode_workers: int
+    geocode_cache_path: str
+    geocode_cache_ttl_days: int
+    geocode_cache_negative_ttl_days: int
+    geocode_cache_max_entries: int
+    border_fallback_km: float
     canonical_lang_prefixes: tuple[str, ...]
     subpage_segments: tuple[str, ...]
     container_segments: tuple[str, ...]
@@ -80,12 +107,32 @@ class Config:
     block_generic_forms: bool
     cross_platform_match: bool
     cross_platform_min_slug_len: int
+    cross_platform_min_score: float
     slug_stoplist: tuple[str, ...]
     name_match: bool
+    name_fuzzy_match: bool
+    name_fuzzy_threshold: float
     race_name_columns: tuple[str, ...]
     source2_ical_url: str
     source2_ical_key: str
     source2_months_ahead: int
+    source2_feed_cache_path: str
+    source2_event_store_path: str
+    source2_card_workers: int
+    source2_card_per_host: int
+    races_snapshot_path: str
+    daemon_schedule: str
+    daemon_timezone: str
+    daemon_run_on_start: bool
+    run_lock_path: str
+    browser_recycle_mb: int
+
+
+def _parse_source1_mode(value: str | None) -> str:
+    mode = (value or "auto").strip().lower()
+    if mode not in ("auto", "dom", "json"):
+        raise ValueError(f"SOURCE1_MODE должен быть auto, dom или json: {value}")
+    return mode
 
 
 REQUIRED_ENV = [
@@ -122,6 +169,16 @@ def load_config() -> Config:
         run_headless=_parse_bool(os.getenv("RUN_HEADLESS"), True),
         timeout_ms=_parse_int(os.getenv("TIMEOUT_MS"), 30000),
         user_agent=os.getenv("USER_AGENT") or None,
+        http_timeout_sec=float(os.getenv("HTTP_TIMEOUT_SEC", "30")),
+        http_retries=_parse_int(os.getenv("HTTP_RETRIES"), 2),
+        http_max_connections=_parse_int(os.getenv("HTTP_MAX_CONNECTIONS"), 20),
+        http2=_parse_bool(os.getenv("HTTP2"), True),
+        block_resources=_parse_bool(os.getenv("BLOCK_RESOURCES"), True),
+        block_resource_types=_parse_csv(
+            os.getenv("BLOCK_RESOURCE_TYPES"), DEFAULT_BLOCKED_RESOURCE_TYPES
+        ),
+        block_domains=_parse_csv(os.getenv("BLOCK_DOMAINS"), DEFAULT_BLOCKED_DOMAINS),
+        allow_domains=_parse_csv(os.getenv("ALLOW_DOMAINS"), ()),
         state_path=os.getenv("STATE_PATH", "./data/notified.json"),
         max_telegram_chars=_parse_int(os.getenv("MAX_TELEGRAM_CHARS"), 3800),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
@@ -142,6 +199,9 @@ def load_config() -> Config:
             "SOURCE1_DETAIL_LINKS",
             "div.space-y-6 a.block.h-full a.w-full",
         ),
+        source1_detail_concurrency=_parse_int(os.getenv("SOURCE1_DETAIL_CONCURRENCY"), 4),
+        source1_measure_waits=_parse_bool(os.getenv("SOURCE1_MEASURE_WAITS"), False),
+        source1_mode=_parse_source1_mode(os.getenv("SOURCE1_MODE")),
         source2_url=os.getenv(
             "SOURCE2_URL", "https://www.portugalrunning.com/calendario-de-corridas/"
         ),
@@ -164,6 +224,18 @@ def load_config() -> Config:
         ),
         opencage_api_key=os.environ["OPENCAGE_API_KEY"],
         opencage_delay_sec=float(os.getenv("OPENCAGE_DELAY_SEC", "1.0")),
+        opencage_burst=_parse_int(os.getenv("OPENCAGE_BURST"), 1),
+        opencage_daily_quota=_parse_int(os.getenv("OPENCAGE_DAILY_QUOTA"), 2500),
+        opencage_quota_reserve=_parse_int(os.getenv("OPENCAGE_QUOTA_RESERVE"), 50),
+        opencage_ledger_path=os.getenv("OPENCAGE_LEDGER_PATH", "./data/opencage_ledger.json"),
+        geocode_workers=_parse_int(os.getenv("GEOCODE_WORKERS"), 2),
+        geocode_cache_path=os.getenv("GEOCODE_CACHE_PATH", "./data/geocode_cache.sqlite3"),
+        geocode_cache_ttl_days=_parse_int(os.getenv("GEOCODE_CACHE_TTL_DAYS"), 180),
+        geocode_cache_negative_ttl_days=_parse_int(
+            os.getenv("GEOCODE_CACHE_NEGATIVE_TTL_DAYS"), 14
+        ),
+        geocode_cache_max_entries=_parse_int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES"), 20000),
+        border_fallback_km=float(os.getenv("PORTUGAL_BORDER_FALLBACK_KM", "15")),
         canonical_lang_prefixes=_parse_csv(
             os.getenv("CANONICAL_LANG_PREFIXES"), DEFAULT_LANG_PREFIXES
         ),
@@ -183,8 +255,15 @@ def load_config() -> Config:
             os.getenv("CROSS_PLATFORM_MIN_SLUG_LEN"),
             DEFAULT_CROSS_PLATFORM_MIN_SLUG_LEN,
         ),
+        cross_platform_min_score=float(
+            os.getenv("CROSS_PLATFORM_MIN_SCORE", str(DEFAULT_CROSS_PLATFORM_MIN_SCORE))
+        ),
         slug_stoplist=_parse_csv(os.getenv("SLUG_STOPLIST"), DEFAULT_SLUG_STOPLIST),
         name_match=_parse_bool(os.getenv("NAME_MATCH"), True),
+        name_fuzzy_match=_parse_bool(os.getenv("NAME_FUZZY_MATCH"), True),
+        name_fuzzy_threshold=float(
+            os.getenv("NAME_FUZZY_THRESHOLD", str(DEFAULT_NAME_FUZZY_THRESHOLD))
+        ),
         race_name_columns=_parse_csv_keep_case(
             os.getenv("RACE_NAME_COLUMNS"), ("RACE NAME", "RACE NAME (PT)")
         ),
@@ -194,4 +273,18 @@ def load_config() -> Config:
         ),
         source2_ical_key=os.getenv("SOURCE2_ICAL_KEY", ""),
         source2_months_ahead=_parse_int(os.getenv("SOURCE2_MONTHS_AHEAD"), 0),
+        source2_feed_cache_path=os.getenv(
+            "SOURCE2_FEED_CACHE_PATH", "./data/source2_feed.json"
+        ),
+        source2_event_store_path=os.getenv(
+            "SOURCE2_EVENT_STORE_PATH", "./data/source2_events.json"
+        ),
+        source2_card_workers=_parse_int(os.getenv("SOURCE2_CARD_WORKERS"), 4),
+        source2_card_per_host=_parse_int(os.getenv("SOURCE2_CARD_PER_HOST"), 2),
+        races_snapshot_path=os.getenv("RACES_SNAPSHOT_PATH", "./data/races_snapshot.pickle"),
+        daemon_schedule=os.getenv("DAEMON_SCHEDULE", "2 6 * * *"),
+        daemon_timezone=os.getenv("DAEMON_TIMEZONE", "Europe/Lisbon"),
+        daemon_run_on_start=_parse_bool(os.getenv("RUN_SMOKE_ON_START"), True),
+        run_lock_path=os.getenv("RUN_LOCK_PATH", "./data/race_monitor.lock"),
+        browser_recycle_mb=_parse_int(os.getenv("BROWSER_RECYCLE_MB"), 1024),
     )
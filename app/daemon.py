@@ -0,0 +1,97 @@
+"""Долгоживущий режим: запуски по расписанию внутри одного процесса.
+
+Между запусками остаются «тёплыми» браузер Chromium, пул HTTP-соединений,
+авторизованный клиент Google Sheets и подключение Telegram. Браузер
+перезапускается, если после запуска память его процессов превысила
+BROWSER_RECYCLE_MB. Пересекающиеся запуски исключает файловая блокировка
+(RUN_LOCK_PATH), общая с ручным `python -m app.main`.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.config import load_config
+from app.logging_setup import setup_logging
+from app.main import Resources, close_resources, open_resources, run_once
+from app.utils.browser import child_rss_mb
+from app.utils.schedule import next_run_time, parse_schedule
+
+# Сон между проверками часов: переход на летнее время или пауза контейнера
+# не должны сдвинуть запуск больше чем на минуту.
+_MAX_SLEEP_SEC = 60.0
+
+
+async def _recycle_browser(resources: Resources, limit_mb: int, logger: logging.Logger) -> None:
+    if not resources.browser.started:
+        return
+    rss_mb = child_rss_mb()
+    logger.info("Память браузера после запуска: %.0f МБ (порог %s МБ)", rss_mb, limit_mb)
+    if limit_mb > 0 and rss_mb > limit_mb:
+        logger.info("Порог памяти превышен — браузер будет запущен заново при следующем запуске")
+        await resources.browser.close()
+
+
+async def _run_guarded(config, resources: Resources, logger: logging.Logger) -> None:
+    started = time.monotonic()
+    try:
+        code = await run_once(config, logger, resources)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Запуск завершился ошибкой: %s", exc)
+        code = 1
+    logger.info("Запуск завершён: код=%s время=%.1f с", code, time.monotonic() - started)
+    await _recycle_browser(resources, config.browser_recycle_mb, logger)
+
+
+async def daemon_async() -> int:
+    config = load_config()
+    setup_logging(config.log_level)
+    logger = logging.getLogger("race_monitor")
+    schedules = parse_schedule(config.daemon_schedule)
+    timezone = ZoneInfo(config.daemon_timezone)
+    logger.info("Демон: расписание «%s» (%s)", config.daemon_schedule, config.daemon_timezone)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    resources = open_resources(config, logger)
+    try:
+        if config.daemon_run_on_start:
+            logger.info("Тестовый запуск при старте")
+            await _run_guarded(config, resources, logger)
+        while not stop.is_set():
+            next_run = next_run_time(schedules, datetime.now(timezone))
+            logger.info("Следующий запуск: %s", next_run.isoformat())
+            while not stop.is_set():
+                remaining = (next_run - datetime.now(timezone)).total_seconds()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=min(remaining, _MAX_SLEEP_SEC))
+                except asyncio.TimeoutError:
+                    pass
+            if stop.is_set():
+                break
+            await _run_guarded(config, resources, logger)
+    finally:
+        logger.info("Демон остановлен, освобождение ресурсов")
+        await close_resources(resources)
+    return 0
+
+
+def main() -> int:
+    return asyncio.run(daemon_async())
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as exc:  # noqa: BLE001
+        logging.getLogger("race_monitor").exception("Критическая ошибка демона: %s", exc)
+        sys.exit(1)
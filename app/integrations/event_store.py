@@ -0,0 +1,91 @@
+"""Хранилище уже обработанных событий iCal-фида source2 (по UID).
+
+Для каждого события запоминаются отпечаток версии (SEQUENCE, LAST-MODIFIED и
+хэш значимых полей), найденная регистрационная ссылка, координаты и итог
+проверки страны. Если отпечаток не изменился, повторный запуск берёт результат
+отсюда и не трогает ни Playwright, ни OpenCage.
+
+DTSTAMP в отпечаток не входит: EventON проставляет его временем экспорта,
+и он меняется при каждой загрузке фида.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Any
+
+
+OUTCOME_PORTUGAL = "portugal"
+OUTCOME_OUTSIDE = "outside"
+
+_CONTENT_KEYS = ("SUMMARY", "DTSTART", "LOCATION", "URL")
+
+
+def event_uid(event: dict[str, str]) -> str:
+    return event.get("UID", "").strip() or event.get("URL", "").strip()
+
+
+def event_fingerprint(event: dict[str, str]) -> str:
+    content = "\x1f".join(event.get(key, "") for key in _CONTENT_KEYS)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    return f"{event.get('SEQUENCE', '0')}|{event.get('LAST-MODIFIED', '')}|{digest}"
+
+
+def load_event_store(path: str) -> dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {"events": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {"events": {}}
+
+
+def save_event_store(path: str, store: dict[str, Any]) -> None:
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(store, handle, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def lookup_event(store: dict[str, Any], uid: str, fingerprint: str) -> dict[str, Any] | None:
+    record = store.get("events", {}).get(uid)
+    if record is None or record.get("fingerprint") != fingerprint:
+        return None
+    return record
+
+
+def is_known_uid(store: dict[str, Any], uid: str) -> bool:
+    return uid in store.get("events", {})
+
+
+def remember_event(
+    store: dict[str, Any],
+    uid: str,
+    fingerprint: str,
+    dtstart: str,
+    reg_url: str,
+    coords: str,
+    outcome: str,
+) -> None:
+    store.setdefault("events", {})[uid] = {
+        "fingerprint": fingerprint,
+        "dtstart": dtstart[:8],
+        "reg_url": reg_url,
+        "coords": coords,
+        "outcome": outcome,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def prune_past_events(store: dict[str, Any], today: date) -> int:
+    events = store.get("events", {})
+    today_text = today.strftime("%Y%m%d")
+    past = [uid for uid, record in events.items() if record.get("dtstart", "") < today_text]
+    for uid in past:
+        events.pop(uid, None)
+    return len(past)
@@ -0,0 +1,48 @@
+"""Постоянный кэш iCal-фида source2.
+
+Хранит тело фида (отдельным файлом рядом с JSON, см. feed_body_path), заголовки
+ETag/Last-Modified для условных запросов, sha256 содержимого, последний рабочий
+ключ экспорта и уже разобранный список событий. Если сервер ответил 304 или хэш тела не
+изменился, разбор фида пропускается.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class FeedCacheEntry:
+    key: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    sha256: str = ""
+    fetched_at: str = ""
+    events: list[dict[str, str]] = field(default_factory=list)
+
+
+def feed_body_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".ics"
+
+
+def load_feed_cache(path: str) -> FeedCacheEntry:
+    if not path or not os.path.exists(path):
+        return FeedCacheEntry()
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return FeedCacheEntry(**data)
+    except (OSError, ValueError, TypeError):
+        # Повреждённый кэш не должен ронять запуск — просто скачаем фид заново.
+        return FeedCacheEntry()
+
+
+def save_feed_cache(path: str, entry: FeedCacheEntry) -> None:
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(asdict(entry), handle, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
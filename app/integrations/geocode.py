@@ -1,14 +1,23 @@
+import asyncio
 import logging
 import re
-import time
+import threading
+from collections.abc import Iterable
 from typing import Any
 
-import requests
+import httpx
 
+from app.integrations.geocode_cache import GeocodeCache
+from app.utils.http import http_client
+from app.utils.rate_limit import QuotaExhausted, RateLimiter, TokenBucket
 
 _NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
-_LAST_REQUEST_TS: float | None = None
-_CACHE: dict[str, tuple[float, float, bool]] = {}
+# Лимитеры по умолчанию (1 запрос в delay_sec), если вызывающий код не передал свой.
+_DEFAULT_LIMITERS: dict[float, RateLimiter] = {}
+_DEFAULT_LIMITERS_LOCK = threading.Lock()
+_MAX_ATTEMPTS = 3
+_RETRY_STATUSES = (502, 503, 504)
+_MAX_RETRY_AFTER_SEC = 60.0
 
 
 def parse_coordinates(text: str) -> tuple[float, float] | None:
@@ -26,43 +35,115 @@ def format_coordinates(lat: float, lon: float) -> str:
     return f"{lat:.6f}, {lon:.6f}"
 
 
-def _respect_delay(delay_sec: float) -> None:
-    global _LAST_REQUEST_TS
-    if _LAST_REQUEST_TS is None:
-        _LAST_REQUEST_TS = time.monotonic()
-        return
-    elapsed = time.monotonic() - _LAST_REQUEST_TS
-    if elapsed < delay_sec:
-        time.sleep(delay_sec - elapsed)
-    _LAST_REQUEST_TS = time.monotonic()
+def _default_limiter(delay_sec: float) -> RateLimiter:
+    with _DEFAULT_LIMITERS_LOCK:
+        limiter = _DEFAULT_LIMITERS.get(delay_sec)
+        if limiter is None:
+            rate = 1.0 / delay_sec if delay_sec > 0 else 0.0
+            limiter = RateLimiter(TokenBucket(rate, 1))
+            _DEFAULT_LIMITERS[delay_sec] = limiter
+        return limiter
 
 
-def _is_portugal(country_code: str | None) -> bool:
-    return (country_code or "").lower() == "pt"
+def _retry_after_sec(response: httpx.Response, default: float) -> float:
+    value = response.headers.get("Retry-After", "")
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = default
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER_SEC)
 
 
-def reverse_geocode_portugal(
-    lat: float,
-    lon: float,
+async def _request_opencage(
+    query: str,
     base_url: str,
     api_key: str,
     delay_sec: float,
+    limiter: RateLimiter | None,
     logger: logging.Logger,
-) -> bool:
-    _respect_delay(delay_sec)
+) -> dict[str, Any]:
+    """Запрос к OpenCage через лимитер: 429/Retry-After, 5xx, сетевые ошибки, rate.remaining.
+
+    Повторы — только здесь, не в общем HTTP-клиенте: каждая попытка проходит через
+    лимитер и учитывается в журнале квоты. Бросает QuotaExhausted, если суточная
+    квота почти исчерпана (402 или журнал).
+    """
+    limiter = limiter or _default_limiter(delay_sec)
     url = f"{base_url.rstrip('/')}/json"
     params = {
-        "q": f"{lat},{lon}",
+        "q": query,
         "key": api_key,
         "no_annotations": 1,
         "limit": 1,
     }
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-    data = response.json()
-    results = data.get("results", []) if isinstance(data, dict) else []
+    last_error = ""
+    for attempt in range(_MAX_ATTEMPTS):
+        await limiter.acquire_async()
+        try:
+            response = await http_client().get(url, params=params, timeout=30, retries=0)
+        except httpx.TransportError as exc:
+            limiter.record_call()
+            last_error = str(exc) or type(exc).__name__
+            wait = max(delay_sec, 1.0) * (attempt + 1)
+            logger.warning(
+                "OpenCage: сетевая ошибка, пауза %.1f с (попытка %s): %s", wait, attempt + 1, exc
+            )
+            limiter.retry_after(wait)
+            continue
+        limiter.record_call()
+        if response.status_code in _RETRY_STATUSES:
+            last_error = f"HTTP {response.status_code}"
+            wait = max(delay_sec, 1.0) * (attempt + 1)
+            logger.warning(
+                "OpenCage HTTP %s, пауза %.1f с (попытка %s)", response.status_code, wait, attempt + 1
+            )
+            limiter.retry_after(wait)
+            continue
+        if response.status_code == 429:
+            last_error = "HTTP 429"
+            wait = _retry_after_sec(response, max(delay_sec, 1.0) * (attempt + 1))
+            logger.warning("OpenCage 429, пауза %.1f с (попытка %s)", wait, attempt + 1)
+            limiter.retry_after(wait)
+            continue
+        if response.status_code == 402:
+            limiter.update_quota(0, None)
+            raise QuotaExhausted("OpenCage: суточная квота исчерпана (402)")
+        response.raise_for_status()
+        data = response.json()
+        rate = data.get("rate") if isinstance(data, dict) else None
+        if isinstance(rate, dict):
+            limiter.update_quota(rate.get("remaining"), rate.get("reset"))
+        return data if isinstance(data, dict) else {}
+    raise RuntimeError(f"OpenCage: {last_error} после {_MAX_ATTEMPTS} попыток")
+
+
+def _is_portugal(country_code: str | None) -> bool:
+    return (country_code or "").lower() == "pt"
+
+
+async def reverse_geocode_portugal(
+    lat: float,
+    lon: float,
+    base_url: str,
+    api_key: str,
+    delay_sec: float,
+    logger: logging.Logger,
+    *,
+    cache: GeocodeCache | None = None,
+    limiter: RateLimiter | None = None,
+) -> bool:
+    cache_key = cache.reverse_key(lat, lon) if cache is not None else ""
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached.in_pt
+
+    data = await _request_opencage(f"{lat},{lon}", base_url, api_key, delay_sec, limiter, logger)
+    results = data.get("results", [])
     if not results:
         logger.debug("Reverse geocode: no results for %s,%s", lat, lon)
+        if cache is not None:
+            cache.put(cache_key, False, lat, lon, False)
         return False
     components = results[0].get("components", {})
     country_code = components.get("country_code")
@@ -74,39 +155,38 @@ def reverse_geocode_portugal(
         country_code,
         is_pt,
     )
+    if cache is not None:
+        cache.put(cache_key, True, lat, lon, is_pt)
     return is_pt
 
 
-def geocode_location_portugal(
+async def geocode_location_portugal(
     location: str,
     base_url: str,
     api_key: str,
     delay_sec: float,
     logger: logging.Logger,
+    *,
+    cache: GeocodeCache | None = None,
+    limiter: RateLimiter | None = None,
 ) -> tuple[float, float] | None:
-    cache_key = location.strip().lower()
-    if not cache_key:
+    if not location.strip():
         return None
-    cached = _CACHE.get(cache_key)
-    if cached:
-        lat, lon, in_pt = cached
-        return (lat, lon) if in_pt else None
 
-    _respect_delay(delay_sec)
-    url = f"{base_url.rstrip('/')}/json"
-    params = {
-        "q": location,
-        "key": api_key,
-        "no_annotations": 1,
-        "limit": 1,
-    }
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-    data: dict[str, Any] = response.json()
-    results = data.get("results", []) if isinstance(data, dict) else []
+    # Постоянный кэш (с TTL, в том числе для «не найдено»): повторные запуски
+    # и итерации демона не ходят в OpenCage за теми же локациями.
+    disk_key = cache.forward_key(location) if cache is not None else ""
+    if cache is not None:
+        stored = cache.get(disk_key)
+        if stored is not None:
+            return (stored.lat, stored.lon) if stored.in_pt else None
+
+    data = await _request_opencage(location, base_url, api_key, delay_sec, limiter, logger)
+    results = data.get("results", [])
     if not results:
         logger.debug("Geocode: no results for '%s'", location)
-        _CACHE[cache_key] = (0.0, 0.0, False)
+        if cache is not None:
+            cache.put(disk_key, False, 0.0, 0.0, False)
         return None
 
     first = results[0]
@@ -124,5 +204,50 @@ def geocode_location_portugal(
         country_code,
         in_pt,
     )
-    _CACHE[cache_key] = (lat, lon, in_pt)
+    if cache is not None:
+        cache.put(disk_key, True, lat, lon, in_pt)
     return (lat, lon) if in_pt else None
+
+
+async def geocode_locations_portugal(
+    locations: Iterable[str],
+    base_url: str,
+    api_key: str,
+    delay_sec: float,
+    logger: logging.Logger,
+    *,
+    workers: int = 1,
+    cache: GeocodeCache | None = None,
+    limiter: RateLimiter | None = None,
+) -> dict[str, tuple[float, float] | None]:
+    """Геокодирует набор локаций конкурентно (не больше workers) в пределах общего лимитера.
+
+    Локации, пропущенные из-за режима «только кэш» (QuotaExhausted), в результат
+    не попадают — вызывающий код решает, что с ними делать.
+    """
+    unique = list(dict.fromkeys(loc for loc in locations if loc and loc.strip()))
+    results: dict[str, tuple[float, float] | None] = {}
+    quota_skipped = 0
+
+    slots = asyncio.Semaphore(max(1, workers))
+
+    async def _one(location: str) -> tuple[str, tuple[float, float] | None, bool]:
+        async with slots:
+            try:
+                coords = await geocode_location_portugal(
+                    location, base_url, api_key, delay_sec, logger, cache=cache, limiter=limiter
+                )
+            except QuotaExhausted:
+                return location, None, False
+        return location, coords, True
+
+    for location, coords, done in await asyncio.gather(*(_one(loc) for loc in unique)):
+        if done:
+            results[location] = coords
+        else:
+            quota_skipped += 1
+    if quota_skipped:
+        logger.warning(
+            "OpenCage: режим «только кэш», не геокодировано локаций=%s", quota_skipped
+        )
+    return results
@@ -0,0 +1,146 @@
+"""Постоянный кэш геокодинга OpenCage (SQLite).
+
+Общий для прямого (локация → координаты) и обратного (координаты → страна)
+геокодинга. Ключи:
+
+- `fwd:<локация>` — нормализованная строка локации (lower, схлопнутые пробелы);
+- `rev:<lat>,<lon>` — координаты, округлённые до coord_precision знаков.
+
+Записи живут ttl_days, «пустые» ответы (нет результатов) — negative_ttl_days.
+Размер ограничен max_entries: в конце запуска (evict) удаляются просроченные
+записи и самые давно использованные сверх лимита. Счётчики попаданий/промахов
+логируются в конце запуска.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import NamedTuple
+
+
+_DAY_SEC = 86400
+
+
+class CachedGeocode(NamedTuple):
+    found: bool
+    lat: float
+    lon: float
+    in_pt: bool
+
+
+@dataclass
+class GeocodeCacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    writes: int = 0
+    evicted: int = 0
+
+
+class GeocodeCache:
+    def __init__(
+        self,
+        path: str,
+        ttl_days: int,
+        negative_ttl_days: int,
+        max_entries: int,
+        coord_precision: int = 3,
+    ) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_sec = ttl_days * _DAY_SEC
+        self.negative_ttl_sec = negative_ttl_days * _DAY_SEC
+        self.max_entries = max_entries
+        self.coord_precision = coord_precision
+        self.stats = GeocodeCacheStats()
+        self._lock = threading.Lock()
+        # autocommit: каждая запись сразу на диске, падение запуска не теряет кэш
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " key TEXT PRIMARY KEY,"
+            " found INTEGER NOT NULL,"
+            " lat REAL NOT NULL,"
+            " lon REAL NOT NULL,"
+            " in_pt INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def forward_key(location: str) -> str:
+        return "fwd:" + " ".join(location.lower().split())
+
+    def reverse_key(self, lat: float, lon: float) -> str:
+        precision = self.coord_precision
+        return f"rev:{lat:.{precision}f},{lon:.{precision}f}"
+
+    def get(self, key: str) -> CachedGeocode | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT found, lat, lon, in_pt, stored_at FROM geocode WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            found, lat, lon, in_pt, stored_at = row
+            ttl = self.ttl_sec if found else self.negative_ttl_sec
+            if now - stored_at > ttl:
+                self._conn.execute("DELETE FROM geocode WHERE key = ?", (key,))
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE geocode SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.stats.hits += 1
+            if not found:
+                self.stats.negative_hits += 1
+        return CachedGeocode(bool(found), lat, lon, bool(in_pt))
+
+    def put(self, key: str, found: bool, lat: float, lon: float, in_pt: bool) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode"
+                " (key, found, lat, lon, in_pt, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, int(found), lat, lon, int(in_pt), now, now),
+            )
+            self.stats.writes += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+    def evict(self) -> int:
+        """Удаляет просроченные записи и самые старые сверх max_entries."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM geocode WHERE"
+                " (found = 1 AND stored_at < ?) OR (found = 0 AND stored_at < ?)",
+                (now - self.ttl_sec, now - self.negative_ttl_sec),
+            )
+            removed = cursor.rowcount
+            if self.max_entries > 0:
+                cursor = self._conn.execute(
+                    "DELETE FROM geocode WHERE key IN ("
+                    " SELECT key FROM geocode ORDER BY accessed_at DESC"
+                    " LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                removed += cursor.rowcount
+            self.stats.evicted += removed
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
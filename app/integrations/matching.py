@@ -9,19 +9,31 @@
   ведущим языковым сегментом (/pt, /en, ...).
 
 - уровень B (кросс-платформенно): одно событие на разных сайтах/поддоменах,
-  опознаётся по совпадению slug события (последний значимый сегмент пути,
-  с годом). Применяется осторожно: slug должен быть достаточно длинным,
-  содержать буквы и не входить в стоп-лист общих слов; каждое совпадение
-  логируется для аудита. Включается флагом cross_platform_match.
+  опознаётся по токенам slug события (последний значимый сегмент пути, с годом):
+  сходство — коэффициент Жаккара значимых токенов (без артиклей и слов
+  суб-страниц), годы обязаны совпадать. Применяется осторожно: slug должен
+  быть достаточно длинным, содержать буквы и не входить в стоп-лист общих
+  слов; каждое решение логируется со сходством для аудита. Включается флагом
+  cross_platform_match.
+
+- уровень F (нечёткое совпадение названия): перестановка слов, пропущенные
+  артикли, спонсорская приставка или опечатка. Сходство — коэффициент Дайса
+  по триграммам слов, кандидаты ищутся по инвертированному индексу триграмм.
+  Год и прочие числа (дистанции), а также слова формата (meia, ultra, ...)
+  обязаны совпадать точно. Включается флагом name_fuzzy_match.
 
 Категория C (новая редакция года — это новая трасса) соблюдается автоматически:
 год нигде не вырезается, поэтому `race-2025` и `race-2026` различаются и в пути
 (A), и в slug (B), и НЕ схлопываются.
 """
 
+import logging
+import math
 import re
 import unicodedata
+from collections.abc import Iterable
 from dataclasses import dataclass, field
+from functools import lru_cache
 from urllib.parse import urlsplit
 
 from app.integrations.url_normalize import normalize_url
@@ -58,12 +70,40 @@ DEFAULT_SLUG_STOPLIST = (
 )
 # Минимальная длина slug для кросс-платформенного совпадения.
 DEFAULT_CROSS_PLATFORM_MIN_SLUG_LEN = 6
+# Уровень B: минимальное сходство токенов slug (коэффициент Жаккара).
+DEFAULT_CROSS_PLATFORM_MIN_SCORE = 0.8
+# Уровень F: минимальное сходство названий (коэффициент Дайса по триграммам).
+DEFAULT_NAME_FUZZY_THRESHOLD = 0.85
 
 # Минимальное число общих значимых токенов, чтобы считать дочерний сегмент
 # тем же событием, что и родительский slug.
 _MIN_TOKEN_OVERLAP = 2
 # Токены короче этого порога считаем шумом ("s", "de", "do" ...).
 _MIN_TOKEN_LEN = 2
+# Сколько разобранных URL держать в памяти: RACES плюс кандидаты одного запуска.
+_PARSED_URL_CACHE_SIZE = 32768
+# Уровни B и F: служебные слова slug и названия, не влияющие на сходство.
+_STOPWORDS = frozenset(("de", "do", "da", "dos", "das", "e", "a", "o", "em", "the", "of"))
+# Слова формата забега: «Meia Maratona» и «Maratona», «Ultra Trail» и «Trail» —
+# разные трассы при почти одинаковых триграммах, поэтому эти слова (как и числа)
+# должны совпадать точно.
+_NAME_FORMAT_WORDS = frozenset(
+    (
+        "meia",
+        "mini",
+        "ultra",
+        "half",
+        "kids",
+        "infantil",
+        "juvenil",
+        "caminhada",
+        "noturno",
+        "noturna",
+        "nocturno",
+        "night",
+        "estafetas",
+    )
+)
 
 
 @dataclass(frozen=True)
@@ -76,19 +116,41 @@ class MatchConfig:
     block_generic_forms: bool = True
     cross_platform_match: bool = True
     cross_platform_min_slug_len: int = DEFAULT_CROSS_PLATFORM_MIN_SLUG_LEN
+    cross_platform_min_score: float = DEFAULT_CROSS_PLATFORM_MIN_SCORE
     slug_stoplist: tuple[str, ...] = DEFAULT_SLUG_STOPLIST
     name_match: bool = True
+    name_fuzzy_match: bool = True
+    name_fuzzy_threshold: float = DEFAULT_NAME_FUZZY_THRESHOLD
+
+
+class ParsedUrl:
+    """URL, разобранный один раз: нормализованная строка, host, сегменты пути
+    (как есть и без языкового префикса), query и slug события.
+
+    Slug — последний значимый сегмент пути как сигнатура события (с годом). Год
+    НЕ вырезается, поэтому `race-2025` и `race-2026` дают разные slug —
+    категория C соблюдается.
+    """
+
+    __slots__ = ("normalized", "host", "segments", "path", "query", "slug")
+
+    def __init__(self, url: str, lang_prefixes: tuple[str, ...]) -> None:
+        self.normalized = normalize_url(url)  # "//host/path?query"
+        parts = urlsplit("https:" + self.normalized)
+        self.host = parts.netloc
+        self.segments = tuple(seg for seg in parts.path.split("/") if seg)
+        self.path = _strip_lang(self.segments, lang_prefixes)
+        self.query = parts.query
+        self.slug = self.segments[-1].lower().replace("_", "-") if self.segments else None
 
 
-def _split(url: str) -> tuple[str, list[str], str]:
-    """Возвращает (host, [сегменты пути], query) из нормализованного URL."""
-    norm = normalize_url(url)  # "//host/path?query"
-    parts = urlsplit("https:" + norm)
-    segments = [seg for seg in parts.path.split("/") if seg]
-    return parts.netloc, segments, parts.query
+@lru_cache(maxsize=_PARSED_URL_CACHE_SIZE)
+def parse_url(url: str, lang_prefixes: tuple[str, ...] = DEFAULT_LANG_PREFIXES) -> ParsedUrl:
+    """Разобранный URL; повторные вызовы (источник, затем main) берутся из кэша."""
+    return ParsedUrl(url, lang_prefixes)
 
 
-def _strip_lang(segments: list[str], lang_prefixes: tuple[str, ...]) -> list[str]:
+def _strip_lang(segments: tuple[str, ...], lang_prefixes: tuple[str, ...]) -> tuple[str, ...]:
     if segments and segments[0].lower() in lang_prefixes:
         return segments[1:]
     return segments
@@ -99,18 +161,6 @@ def _tokens(segment: str) -> set[str]:
     return {tok for tok in raw if len(tok) >= _MIN_TOKEN_LEN}
 
 
-def _event_slug(url: str) -> str | None:
-    """Последний значимый сегмент пути как сигнатура события (с годом).
-
-    Год НЕ вырезается, поэтому `race-2025` и `race-2026` дают разные slug —
-    категория C соблюдается.
-    """
-    _, segments, _ = _split(url)
-    if not segments:
-        return None
-    return segments[-1].lower().replace("_", "-")
-
-
 def _slug_is_usable(slug: str, config: MatchConfig) -> bool:
     if len(slug) < config.cross_platform_min_slug_len:
         return False
@@ -120,6 +170,16 @@ def _slug_is_usable(slug: str, config: MatchConfig) -> bool:
     return any(ch.isalpha() for ch in slug)
 
 
+def _slug_tokens(slug: str, config: MatchConfig) -> frozenset[str]:
+    """Значимые токены slug: без артиклей, слов суб-страниц и стоп-листа.
+
+    trail-da-serra-2026-inscricoes → {trail, serra, 2026}. Год остаётся
+    токеном — категория C.
+    """
+    noise = _STOPWORDS.union(config.subpage_segments, config.slug_stoplist)
+    return frozenset(token for token in _tokens(slug) if token not in noise)
+
+
 def normalize_event_name(name: str) -> str:
     """Нормализация названия события для сравнения.
 
@@ -138,21 +198,175 @@ def _name_has_year(normalized_name: str) -> bool:
     return bool(_YEAR_RE.search(normalized_name))
 
 
+def _name_signature(normalized_name: str) -> tuple[frozenset[str], frozenset[str]] | None:
+    """(точный ключ, триграммы) нормализованного названия для уровня F.
+
+    Ключ — числа (год, дистанции) и слова формата; триграммы строятся по
+    каждому значимому слову отдельно, поэтому перестановка слов их не меняет.
+    """
+    key: set[str] = set()
+    grams: set[str] = set()
+    for token in normalized_name.split():
+        if any(ch.isdigit() for ch in token) or token in _NAME_FORMAT_WORDS:
+            key.add(token)
+        elif token not in _STOPWORDS:
+            padded = f" {token} "
+            grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    if not grams:
+        return None
+    return frozenset(key), frozenset(grams)
+
+
+class FuzzyNameIndex:
+    """Инвертированный индекс триграмм названий с годом (уровень F).
+
+    Постинги разбиты по точному ключу (год, числа, слова формата), так что
+    кандидаты другого года не рассматриваются вовсе — категория C. Поиск
+    обходит только самые редкие триграммы запроса (префиксный фильтр): если
+    сходство не ниже порога, хотя бы одна из них обязательно общая.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._names: list[str] = []
+        self._grams: list[frozenset[str]] = []
+        self._postings: dict[tuple[frozenset[str], str], list[int]] = {}
+        self._seen: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str) -> None:
+        norm = normalize_event_name(name)
+        if not norm or not _name_has_year(norm) or norm in self._seen:
+            return
+        signature = _name_signature(norm)
+        if signature is None:
+            return
+        self._seen.add(norm)
+        key, grams = signature
+        position = len(self._names)
+        self._names.append(name.strip())
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings.setdefault((key, gram), []).append(position)
+
+    def lookup(self, name: str) -> tuple[str, float] | None:
+        """Самое похожее известное название и его сходство (0..1) или None."""
+        norm = normalize_event_name(name)
+        if not norm or not _name_has_year(norm):
+            return None
+        signature = _name_signature(norm)
+        if signature is None:
+            return None
+        key, grams = signature
+        size = len(grams)
+        threshold = self.threshold
+        # Дайс 2·o/(|A|+|B|) ≥ t при o ≤ |B| требует o ≥ t·|A|/(2−t).
+        min_overlap = max(1, math.ceil(threshold * size / (2 - threshold) - 1e-9))
+        postings = sorted(
+            (self._postings.get((key, gram), ()) for gram in grams), key=len
+        )
+        candidates: set[int] = set()
+        for posting in postings[: size - min_overlap + 1]:
+            candidates.update(posting)
+
+        # Дайс не ниже t возможен, только если |B| в пределах [t/(2−t), (2−t)/t]·|A|.
+        min_size = threshold * size / (2 - threshold)
+        max_size = size * (2 - threshold) / threshold
+        best: tuple[float, int] | None = None
+        for position in candidates:
+            other = self._grams[position]
+            if not min_size <= len(other) <= max_size:
+                continue
+            score = 2 * len(grams & other) / (size + len(other))
+            # при равном сходстве — самое раннее название в RACES
+            if score >= threshold and (
+                best is None or score > best[0] or (score == best[0] and position < best[1])
+            ):
+                best = (score, position)
+        if best is None:
+            return None
+        return self._names[best[1]], best[0]
+
+
+class SlugTokenIndex:
+    """Инвертированный индекс токенов slug → известные URL (уровень B).
+
+    Поиск обходит только самые редкие токены запроса (префиксный фильтр по
+    порогу Жаккара), кандидаты с другим набором годов отбрасываются.
+    lookup возвращает лучшего найденного кандидата даже ниже порога — решение
+    и запись в лог остаются за вызывающим.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._urls: list[str] = []
+        self._tokens: list[frozenset[str]] = []
+        self._postings: dict[str, list[int]] = {}
+        self._seen: set[frozenset[str]] = set()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def add(self, tokens: frozenset[str], url: str) -> None:
+        # первый встретившийся известный URL для этого набора токенов
+        if not tokens or tokens in self._seen:
+            return
+        self._seen.add(tokens)
+        position = len(self._urls)
+        self._urls.append(url)
+        self._tokens.append(tokens)
+        for token in tokens:
+            self._postings.setdefault(token, []).append(position)
+
+    def lookup(self, tokens: frozenset[str]) -> tuple[str, float, float] | None:
+        """(известный URL, Жаккар, вхождение меньшего набора) лучшего кандидата."""
+        if not tokens:
+            return None
+        size = len(tokens)
+        # Жаккар o/|A∪B| ≥ t требует o ≥ t·|A|.
+        min_overlap = max(1, math.ceil(self.threshold * size - 1e-9))
+        postings = sorted((self._postings.get(token, ()) for token in tokens), key=len)
+        candidates: set[int] = set()
+        for posting in postings[: size - min_overlap + 1]:
+            candidates.update(posting)
+
+        years = {token for token in tokens if _YEAR_RE.fullmatch(token)}
+        best: tuple[float, float, int] | None = None
+        for position in candidates:
+            other = self._tokens[position]
+            if years != {token for token in other if _YEAR_RE.fullmatch(token)}:
+                continue  # категория C: другой год — другое событие
+            overlap = len(tokens & other)
+            jaccard = overlap / len(tokens | other)
+            containment = overlap / min(size, len(other))
+            if best is None or (jaccard, containment, -position) > (best[0], best[1], -best[2]):
+                best = (jaccard, containment, position)
+        if best is None:
+            return None
+        return self._urls[best[2]], best[0], best[1]
+
+
 def is_service_page(url: str, config: MatchConfig) -> bool:
     """Категория D: служебные/индексные страницы, не относящиеся к гонкам."""
-    host, segments, query = _split(url)
+    parsed = parse_url(url, config.lang_prefixes)
 
     # Домашняя страница: нет пути и нет query (timerspeed.com/?tribe_events=...
     # сюда НЕ попадает, т.к. содержит query — это реальное событие).
-    if config.block_homepage and not segments and not query:
+    if config.block_homepage and not parsed.segments and not parsed.query:
         return True
 
     # Generic Google Forms.
-    if config.block_generic_forms and host == "docs.google.com" and segments[:1] == ["forms"]:
+    if (
+        config.block_generic_forms
+        and parsed.host == "docs.google.com"
+        and parsed.segments[:1] == ("forms",)
+    ):
         return True
 
     # Служебные страницы по списку подстрок пути.
-    path_lower = "/".join(segments).lower()
+    path_lower = "/".join(parsed.segments).lower()
     for token in config.service_blocklist:
         if token and token in path_lower:
             return True
@@ -160,6 +374,48 @@ def is_service_page(url: str, config: MatchConfig) -> bool:
     return False
 
 
+def _child_shares_event(parent: str, child: str) -> bool:
+    """Один лишний сегмент, разделяющий значимые токены с родителем
+    (corrida-s-joao ≡ corrida-s-joao/corrida-de-s-joao)."""
+    # Защита категории C: не схлопывать «безгодовый» родитель с годовым
+    # ребёнком — иначе можно спрятать новую годовую редакцию. Матч
+    # допускается только если год ребёнка уже присутствует у родителя
+    # (или года нет вовсе).
+    child_years = set(_YEAR_RE.findall(child))
+    parent_years = set(_YEAR_RE.findall(parent))
+    if child_years and not child_years <= parent_years:
+        return False
+    return len(_tokens(parent) & _tokens(child)) >= _MIN_TOKEN_OVERLAP
+
+
+class _PathNode:
+    """Узел дерева сегментов пути одного host.
+
+    first — порядковый номер первого известного URL, путь которого (после
+    срезания языкового префикса) заканчивается в этом узле; None — узел
+    промежуточный. Номер нужен, чтобы из нескольких подходящих путей вернуть
+    тот же, что и прежний линейный обход (самый ранний в RACES).
+    """
+
+    __slots__ = ("children", "first")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _PathNode] = {}
+        self.first: int | None = None
+
+
+# Категории пакетного сопоставления: D — служебная страница, new — трасса новая.
+MATCH_CATEGORIES = ("D", "exact", "A", "B", "N", "F", "new")
+
+
+@dataclass
+class MatchReport:
+    """Результат match_many: по кандидату (в исходном порядке) и счётчики категорий."""
+
+    results: list[tuple[str, str] | None] = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(MATCH_CATEGORIES, 0))
+
+
 @dataclass
 class KnownIndex:
     """Индекс известных трасс из колонки WEBSITE листа RACES."""
@@ -168,24 +424,32 @@ class KnownIndex:
     config: MatchConfig = field(default_factory=MatchConfig)
     names: list[str] = field(default_factory=list)
     exact: set[str] = field(init=False, default_factory=set)
-    by_host: dict[str, list[list[str]]] = field(init=False, default_factory=dict)
-    by_slug: dict[str, str] = field(init=False, default_factory=dict)
+    # Уровень A: дерево сегментов пути на каждый host — поиск родителя/ребёнка
+    # идёт по глубине пути, а не по всем известным URL этого host.
+    by_host: dict[str, _PathNode] = field(init=False, default_factory=dict)
+    slugs: SlugTokenIndex | None = field(init=False, default=None)
     by_name: dict[str, str] = field(init=False, default_factory=dict)
+    fuzzy_names: FuzzyNameIndex | None = field(init=False, default=None)
 
     def __post_init__(self) -> None:
-        for raw in self.websites:
+        if self.config.cross_platform_match:
+            self.slugs = SlugTokenIndex(self.config.cross_platform_min_score)
+        for position, raw in enumerate(self.websites):
             if not raw or not raw.strip():
                 continue
-            self.exact.add(normalize_url(raw))
-            host, segments, _ = _split(raw)
-            segments = _strip_lang(segments, self.config.lang_prefixes)
-            self.by_host.setdefault(host, []).append(segments)
-
-            if self.config.cross_platform_match:
-                slug = _event_slug(raw)
+            parsed = parse_url(raw, self.config.lang_prefixes)
+            self.exact.add(parsed.normalized)
+            if parsed.path:  # уровень домашней страницы не сопоставляется
+                node = self.by_host.setdefault(parsed.host, _PathNode())
+                for segment in parsed.path:
+                    node = node.children.setdefault(segment, _PathNode())
+                if node.first is None:
+                    node.first = position
+
+            if self.slugs is not None:
+                slug = parsed.slug
                 if slug and _slug_is_usable(slug, self.config):
-                    # первый встретившийся известный URL для этого slug
-                    self.by_slug.setdefault(slug, raw)
+                    self.slugs.add(_slug_tokens(slug, self.config), raw)
 
         # Индекс названий (RACE NAME + RACE NAME (PT)). Только названия с годом —
         # это обеспечивает «имя + год строго» и исключает общие названия без года.
@@ -196,40 +460,82 @@ class KnownIndex:
                 norm = normalize_event_name(name)
                 if norm and _name_has_year(norm):
                     self.by_name.setdefault(norm, name.strip())
-
-    def match(self, url: str, name: str | None = None) -> tuple[str, str] | None:
+            if self.config.name_fuzzy_match:
+                self.fuzzy_names = FuzzyNameIndex(self.config.name_fuzzy_threshold)
+                for name in self.names:
+                    if name and name.strip():
+                        self.fuzzy_names.add(name)
+
+    def match(
+        self, url: str, name: str | None = None, logger: logging.Logger | None = None
+    ) -> tuple[str, str] | None:
         """Возвращает (категория, с_чем_совпало) или None, если трасса новая.
 
         Если передано name — дополнительно проверяется совпадение по названию
-        (имя + год строго), уровень N.
+        (имя + год строго), уровень N. В logger пишутся решения уровня B.
         """
-        norm = normalize_url(url)
-        if norm in self.exact:
-            return ("exact", norm)
-
-        host, segments, _ = _split(url)
-        segments = _strip_lang(segments, self.config.lang_prefixes)
-
-        for known_segments in self.by_host.get(host, []):
-            if self._is_parent_child(segments, known_segments):
-                return ("A", host + "/" + "/".join(known_segments))
-
-        # Уровень B: кросс-платформенно по slug события (с годом).
-        if self.config.cross_platform_match:
-            slug = _event_slug(url)
+        parsed = parse_url(url, self.config.lang_prefixes)
+        if parsed.normalized in self.exact:
+            return ("exact", parsed.normalized)
+
+        root = self.by_host.get(parsed.host)
+        if root is not None and parsed.path:
+            known_segments = self._match_path(root, parsed.path)
+            if known_segments is not None:
+                return ("A", parsed.host + "/" + "/".join(known_segments))
+
+        # Уровень B: кросс-платформенно по токенам slug события (с годом).
+        if self.slugs is not None:
+            slug = parsed.slug
             if slug and _slug_is_usable(slug, self.config):
-                known_url = self.by_slug.get(slug)
-                if known_url is not None:
-                    return ("B", known_url)
+                slug_match = self.slugs.lookup(_slug_tokens(slug, self.config))
+                if slug_match is not None:
+                    known_url, jaccard, containment = slug_match
+                    accepted = jaccard >= self.config.cross_platform_min_score
+                    if logger is not None:
+                        logger.info(
+                            "Уровень B: %s ~ %s жаккар=%.2f вхождение=%.2f → %s",
+                            url,
+                            known_url,
+                            jaccard,
+                            containment,
+                            "дубль" if accepted else "отклонено",
+                        )
+                    if accepted:
+                        return ("B", f"{known_url} (сходство {jaccard:.2f})")
 
         # Уровень N: совпадение по названию + год (кросс-платформенно).
         if name is not None:
             name_match = self.match_name(name)
             if name_match is not None:
                 return ("N", name_match)
+            fuzzy_match = self.match_name_fuzzy(name)
+            if fuzzy_match is not None:
+                known_name, score = fuzzy_match
+                return ("F", f"{known_name} (сходство {score:.2f})")
 
         return None
 
+    def match_many(
+        self,
+        candidates: Iterable[tuple[str, str | None]],
+        logger: logging.Logger | None = None,
+    ) -> MatchReport:
+        """Пакетное сопоставление пар (url, название) из всех источников.
+
+        Служебные страницы (категория D) отсеиваются до сопоставления и
+        возвращаются как ("D", url); для новой трассы результат — None.
+        """
+        report = MatchReport()
+        for url, name in candidates:
+            if is_service_page(url, self.config):
+                result: tuple[str, str] | None = ("D", url)
+            else:
+                result = self.match(url, name or None, logger)
+            report.results.append(result)
+            report.counts[result[0] if result is not None else "new"] += 1
+        return report
+
     def match_name(self, name: str) -> str | None:
         """Совпадение по нормализованному названию (имя + год строго)."""
         if not self.config.name_match or not name:
@@ -239,43 +545,72 @@ class KnownIndex:
             return None
         return self.by_name.get(norm)
 
-    def _is_parent_child(self, a: list[str], b: list[str]) -> bool:
-        # Совпадение после срезания языкового префикса (/pt/ ≡ без префикса).
-        if a == b:
-            return bool(a)
-
-        shorter, longer = (a, b) if len(a) < len(b) else (b, a)
-        if not shorter:
-            return False  # уровень домашней страницы — слишком широко
-
-        # Короткий путь должен быть префиксом длинного.
-        if longer[: len(shorter)] != shorter:
-            return False
-
-        # Защита: короткий путь не должен заканчиваться «контейнерным» сегментом
-        # (eventos/event/...), иначе листинг схлопнет все вложенные события.
-        if shorter[-1].lower() in self.config.container_segments:
-            return False
-
-        extra = longer[len(shorter):]
-
-        # Случай 1: лишний хвост — это суб-страница (/inscritos, /resultados, ...).
-        if all(seg.lower() in self.config.subpage_segments for seg in extra):
-            return True
+    def match_name_fuzzy(self, name: str) -> tuple[str, float] | None:
+        """Уровень F: ближайшее известное название того же года и сходство."""
+        if self.fuzzy_names is None or not name:
+            return None
+        return self.fuzzy_names.lookup(name)
 
-        # Случай 2: один лишний сегмент, разделяющий значимые токены с родителем
-        # (corrida-s-joao ≡ corrida-s-joao/corrida-de-s-joao-2026).
-        if len(extra) == 1:
-            # Защита категории C: не схлопывать «безгодовый» родитель с годовым
-            # ребёнком — иначе можно спрятать новую годовую редакцию. Матч
-            # допускается только если год ребёнка уже присутствует у родителя
-            # (или года нет вовсе).
-            child_years = set(_YEAR_RE.findall(extra[0]))
-            parent_years = set(_YEAR_RE.findall(shorter[-1]))
-            if child_years and not child_years <= parent_years:
-                return False
-            overlap = _tokens(shorter[-1]) & _tokens(extra[0])
-            if len(overlap) >= _MIN_TOKEN_OVERLAP:
-                return True
+    def _match_path(self, root: _PathNode, segments: tuple[str, ...]) -> tuple[str, ...] | None:
+        """Уровень A: самый ранний известный путь, «вложенный» в segments или наоборот.
 
-        return False
+        Проверяются только узлы ветки segments: предки (известный путь короче),
+        сам узел (совпадение после срезания языкового префикса) и поддерево под
+        ним (известный путь длиннее).
+        """
+        config = self.config
+        # subpage_tail[i] — все сегменты segments[i:] являются суб-страницами.
+        subpage_tail = [True] * (len(segments) + 1)
+        for i in range(len(segments) - 1, -1, -1):
+            subpage_tail[i] = subpage_tail[i + 1] and segments[i].lower() in config.subpage_segments
+
+        best: tuple[int, tuple[str, ...]] | None = None
+
+        def _offer(position: int | None, path: tuple[str, ...]) -> None:
+            nonlocal best
+            if position is not None and (best is None or position < best[0]):
+                best = (position, path)
+
+        # Известный путь короче: предок на ветке segments. Короткий путь не должен
+        # заканчиваться «контейнерным» сегментом (eventos/event/...), иначе
+        # листинг схлопнет все вложенные события.
+        node = root
+        for depth, segment in enumerate(segments):
+            if depth and node.first is not None and (
+                segments[depth - 1].lower() not in config.container_segments
+            ):
+                # лишний хвост — суб-страница (/inscritos, /resultados, ...)
+                # или один сегмент того же события
+                if subpage_tail[depth] or (
+                    depth == len(segments) - 1
+                    and _child_shares_event(segments[depth - 1], segment)
+                ):
+                    _offer(node.first, segments[:depth])
+            node = node.children.get(segment)
+            if node is None:
+                break
+        else:
+            # Совпадение после срезания языкового префикса (/pt/ ≡ без префикса).
+            _offer(node.first, segments)
+
+            # Известный путь длиннее: поддерево под segments.
+            if segments[-1].lower() not in config.container_segments:
+                for child_segment, child in node.children.items():
+                    if child.first is not None and _child_shares_event(segments[-1], child_segment):
+                        _offer(child.first, (*segments, child_segment))
+                # Хвост только из суб-страниц — обходим лишь такие ветки.
+                stack = [
+                    (child, (child_segment,))
+                    for child_segment, child in node.children.items()
+                    if child_segment.lower() in config.subpage_segments
+                ]
+                while stack:
+                    current, extra = stack.pop()
+                    _offer(current.first, segments + extra)
+                    stack.extend(
+                        (child, (*extra, child_segment))
+                        for child_segment, child in current.children.items()
+                        if child_segment.lower() in config.subpage_segments
+                    )
+
+        return best[1] if best is not None else None
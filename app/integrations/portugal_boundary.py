@@ -0,0 +1,233 @@
+"""Офлайн-проверка «точка в Португалии» (point-in-polygon).
+
+Встроенная упрощённая геометрия: материк (сухопутная граница с Испанией +
+замыкание по океану), Азорские острова, Мадейра/Порту-Санту и Селваженш.
+Океанские стороны полигонов проведены с запасом в море — спорных точек там нет.
+Сухопутная граница оцифрована вручную по ключевым точкам (погрешность — единицы
+километров), поэтому для точек ближе border_fallback_km к ней классификатор
+возвращает NEAR_BORDER, и вызывающий код делает сетевую проверку (OpenCage).
+
+Для скорости используется сетка: для каждой ячейки заранее известно, лежит ли
+она целиком внутри/снаружи полигона и далеко ли от границы; точный расчёт нужен
+только для ячеек, через которые проходит граница.
+"""
+
+import math
+from functools import lru_cache
+
+
+INSIDE = "inside"
+OUTSIDE = "outside"
+NEAR_BORDER = "near_border"
+
+_MIXED = "mixed"
+
+# Сухопутная граница Португалия—Испания (lat, lon): от устья Миньо на севере
+# по часовой стрелке до устья Гвадианы на юге.
+_PT_ES_BORDER: tuple[tuple[float, float], ...] = (
+    (41.868, -8.870),  # устье Миньо (Caminha)
+    (41.940, -8.750),
+    (42.030, -8.645),  # Valença
+    (42.080, -8.480),  # Monção
+    (42.120, -8.260),  # Melgaço
+    (42.154, -8.199),  # Cevide — самая северная точка
+    (42.090, -8.170),
+    (42.040, -8.090),
+    (41.930, -8.080),
+    (41.870, -8.140),
+    (41.810, -8.130),  # Portela do Homem
+    (41.850, -7.980),
+    (41.930, -7.800),  # Tourém
+    (41.880, -7.700),
+    (41.860, -7.580),
+    (41.880, -7.450),
+    (41.920, -7.200),
+    (41.990, -6.900),
+    (41.970, -6.710),  # Portelo
+    (41.940, -6.600),  # Rio de Onor
+    (41.830, -6.550),  # Quintanilha
+    (41.670, -6.300),
+    (41.570, -6.190),
+    (41.500, -6.260),  # Miranda do Douro
+    (41.330, -6.440),
+    (41.170, -6.650),
+    (41.060, -6.780),
+    (41.020, -6.930),  # Barca d'Alva
+    (40.880, -6.860),
+    (40.610, -6.800),  # Vilar Formoso
+    (40.450, -6.800),
+    (40.330, -6.860),
+    (40.200, -6.950),
+    (39.950, -6.920),
+    (39.830, -6.970),  # Segura
+    (39.660, -7.000),
+    (39.650, -7.530),  # устье Севера (Tejo)
+    (39.550, -7.400),
+    (39.400, -7.300),  # Marvão
+    (39.200, -7.060),
+    (39.050, -6.960),  # Ouguela
+    (38.850, -7.050),  # устье Кайи
+    (38.750, -7.200),  # Juromenha
+    (38.600, -7.290),
+    (38.420, -7.330),
+    (38.330, -7.180),
+    (38.220, -6.950),
+    (38.170, -6.930),  # Barrancos
+    (38.050, -6.990),
+    (37.980, -7.100),
+    (37.950, -7.250),  # Vila Verde de Ficalho
+    (37.820, -7.300),
+    (37.700, -7.420),
+    (37.560, -7.520),  # Pomarão
+    (37.450, -7.465),  # Alcoutim
+    (37.300, -7.430),
+    (37.170, -7.400),  # устье Гвадианы
+)
+
+# Замыкание материка по океану (с запасом в море).
+_MAINLAND_SEA: tuple[tuple[float, float], ...] = (
+    (36.600, -7.400),
+    (36.600, -10.000),
+    (41.868, -10.000),
+)
+
+_MAINLAND = _PT_ES_BORDER + _MAINLAND_SEA
+_AZORES = ((36.800, -31.500), (39.900, -31.500), (39.900, -24.900), (36.800, -24.900))
+_MADEIRA = ((32.350, -17.350), (33.200, -17.350), (33.200, -16.150), (32.350, -16.150))
+_SELVAGENS = ((29.950, -16.150), (30.250, -16.150), (30.250, -15.800), (29.950, -15.800))
+
+_KM_PER_DEG_LAT = 110.57
+_KM_PER_DEG_LON_EQUATOR = 111.32
+
+
+def _point_in_polygon(lat: float, lon: float, polygon: tuple[tuple[float, float], ...]) -> bool:
+    inside = False
+    count = len(polygon)
+    for idx in range(count):
+        lat1, lon1 = polygon[idx]
+        lat2, lon2 = polygon[idx - 1]
+        if (lat1 > lat) != (lat2 > lat):
+            cross_lon = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+            if lon < cross_lon:
+                inside = not inside
+    return inside
+
+
+def _segment_distance_km(
+    lat: float,
+    lon: float,
+    start: tuple[float, float],
+    end: tuple[float, float],
+) -> float:
+    # Локальная равнопромежуточная проекция вокруг точки — на масштабе десятков
+    # километров погрешность пренебрежима.
+    kx = _KM_PER_DEG_LON_EQUATOR * math.cos(math.radians(lat))
+    ax, ay = (start[1] - lon) * kx, (start[0] - lat) * _KM_PER_DEG_LAT
+    bx, by = (end[1] - lon) * kx, (end[0] - lat) * _KM_PER_DEG_LAT
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length_sq))
+    return math.hypot(ax + t * dx, ay + t * dy)
+
+
+def _polyline_distance_km(lat: float, lon: float, points: tuple[tuple[float, float], ...]) -> float:
+    return min(
+        _segment_distance_km(lat, lon, points[idx - 1], points[idx])
+        for idx in range(1, len(points))
+    )
+
+
+def _ring_distance_km(lat: float, lon: float, polygon: tuple[tuple[float, float], ...]) -> float:
+    return min(
+        _segment_distance_km(lat, lon, polygon[idx - 1], polygon[idx])
+        for idx in range(len(polygon))
+    )
+
+
+class _Region:
+    """Полигон с bbox и сеткой предрасчитанных состояний ячеек."""
+
+    def __init__(
+        self,
+        polygon: tuple[tuple[float, float], ...],
+        land_border: tuple[tuple[float, float], ...] | None,
+        border_fallback_km: float,
+        cell_deg: float,
+    ) -> None:
+        self.polygon = polygon
+        self.land_border = land_border
+        self.border_fallback_km = border_fallback_km
+        self.cell_deg = cell_deg
+        # bbox расширяем на буфер, чтобы ячейки у границы снаружи полигона
+        # тоже попадали в сетку (для них нужен NEAR_BORDER).
+        pad = border_fallback_km / _KM_PER_DEG_LAT + cell_deg if land_border else 0.0
+        lats = [lat for lat, _ in polygon]
+        lons = [lon for _, lon in polygon]
+        self.min_lat, self.max_lat = min(lats) - pad, max(lats) + pad
+        self.min_lon, self.max_lon = min(lons) - pad * 1.4, max(lons) + pad * 1.4
+        self.rows = max(1, math.ceil((self.max_lat - self.min_lat) / cell_deg))
+        self.cols = max(1, math.ceil((self.max_lon - self.min_lon) / cell_deg))
+        self.grid = [self._classify_cell(row, col) for row in range(self.rows) for col in range(self.cols)]
+
+    def _classify_cell(self, row: int, col: int) -> str:
+        center_lat = self.min_lat + (row + 0.5) * self.cell_deg
+        center_lon = self.min_lon + (col + 0.5) * self.cell_deg
+        # радиус ячейки (половина диагонали) в километрах
+        half_x = self.cell_deg / 2 * _KM_PER_DEG_LON_EQUATOR * math.cos(math.radians(center_lat))
+        half_y = self.cell_deg / 2 * _KM_PER_DEG_LAT
+        radius = math.hypot(half_x, half_y)
+
+        if self.land_border is not None and self.border_fallback_km > 0:
+            border_km = _polyline_distance_km(center_lat, center_lon, self.land_border)
+            if border_km + radius < self.border_fallback_km:
+                return NEAR_BORDER
+            if border_km - radius < self.border_fallback_km:
+                return _MIXED
+
+        if _ring_distance_km(center_lat, center_lon, self.polygon) <= radius:
+            return _MIXED
+        return INSIDE if _point_in_polygon(center_lat, center_lon, self.polygon) else OUTSIDE
+
+    def classify(self, lat: float, lon: float) -> str | None:
+        """INSIDE/NEAR_BORDER для точек региона, OUTSIDE — вне, None — вне bbox."""
+        if not (self.min_lat <= lat < self.max_lat and self.min_lon <= lon < self.max_lon):
+            return None
+        row = int((lat - self.min_lat) / self.cell_deg)
+        col = int((lon - self.min_lon) / self.cell_deg)
+        state = self.grid[min(row, self.rows - 1) * self.cols + min(col, self.cols - 1)]
+        if state != _MIXED:
+            return state
+        if self.land_border is not None and self.border_fallback_km > 0:
+            if _polyline_distance_km(lat, lon, self.land_border) < self.border_fallback_km:
+                return NEAR_BORDER
+        return INSIDE if _point_in_polygon(lat, lon, self.polygon) else OUTSIDE
+
+
+class PortugalBoundary:
+    """Классификатор точки: INSIDE, OUTSIDE или NEAR_BORDER (нужна сетевая проверка)."""
+
+    def __init__(self, border_fallback_km: float, cell_deg: float = 0.1) -> None:
+        self.border_fallback_km = border_fallback_km
+        self._regions = [
+            _Region(_MAINLAND, _PT_ES_BORDER, border_fallback_km, cell_deg),
+            _Region(_AZORES, None, 0.0, cell_deg),
+            _Region(_MADEIRA, None, 0.0, cell_deg),
+            _Region(_SELVAGENS, None, 0.0, cell_deg),
+        ]
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Точный point-in-polygon без учёта буфера границы."""
+        return any(_point_in_polygon(lat, lon, region.polygon) for region in self._regions)
+
+    def classify(self, lat: float, lon: float) -> str:
+        for region in self._regions:
+            state = region.classify(lat, lon)
+            if state is not None and state != OUTSIDE:
+                return state
+        return OUTSIDE
+
+
+@lru_cache(maxsize=4)
+def portugal_boundary(border_fallback_km: float) -> PortugalBoundary:
+    """Общий классификатор на процесс: сетка строится один раз, а не на каждый запуск."""
+    return PortugalBoundary(border_fallback_km)
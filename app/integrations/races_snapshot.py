@@ -0,0 +1,69 @@
+"""Локальный снимок листа RACES вместе с построенным KnownIndex.
+
+Снимок хранит modifiedTime таблицы (Drive API) на момент чтения: если таблицу
+с тех пор не меняли, колонки не скачиваются и индекс не строится заново. При
+недоступности Google Sheets запуск продолжается по снимку.
+
+Отпечаток учитывает таблицу, лист, колонки, MatchConfig и версию формата
+индекса: при их изменении снимок считается недействительным.
+"""
+
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.integrations.matching import KnownIndex, MatchConfig
+
+# Увеличивать при изменении внутренних структур KnownIndex.
+SNAPSHOT_VERSION = 4
+
+
+@dataclass
+class RacesSnapshot:
+    fingerprint: str
+    modified_time: str
+    saved_at: str
+    index: KnownIndex
+
+
+def snapshot_fingerprint(
+    sheet_id: str,
+    worksheet_name: str,
+    url_column: str,
+    name_columns: tuple[str, ...],
+    match_config: MatchConfig,
+) -> str:
+    source = repr(
+        (SNAPSHOT_VERSION, sheet_id, worksheet_name, url_column, name_columns, match_config)
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def load_snapshot(path: str, fingerprint: str) -> RacesSnapshot | None:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as handle:
+            snapshot = pickle.load(handle)
+    except Exception:  # noqa: BLE001
+        return None
+    if not isinstance(snapshot, RacesSnapshot) or snapshot.fingerprint != fingerprint:
+        return None
+    return snapshot
+
+
+def save_snapshot(path: str, snapshot: RacesSnapshot) -> None:
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        pickle.dump(snapshot, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def snapshot_age_hours(snapshot: RacesSnapshot, now: datetime | None = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    return (now - datetime.fromisoformat(snapshot.saved_at)).total_seconds() / 3600
@@ -1,11 +1,42 @@
+import json
 import logging
-from typing import cast
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, TypeVar
 
 import gspread
 from google.oauth2.service_account import Credentials
+from gspread.utils import absolute_range_name, rowcol_to_a1
 
+from app.integrations.url_normalize import normalize_url
 from app.utils.retry import run_with_retries
 
+T = TypeVar("T")
+
+MISSING_RACES_HEADER = ("Источник", "Ссылка", "Координаты")
+# Ограничения на один запрос записи: тело append_rows и число deleteDimension.
+_APPEND_CHUNK_BYTES = 256 * 1024
+_DELETE_CHUNK_REQUESTS = 200
+_BACKOFF_ATTEMPTS = 5
+_BACKOFF_BASE_SEC = 2.0
+
+
+@lru_cache(maxsize=4)
+def _client(credentials_path: str) -> gspread.Client:
+    # Один авторизованный клиент на процесс: токен обновляется самим gspread,
+    # поэтому демон не авторизуется заново при каждом запуске. Drive (только
+    # метаданные) — для modifiedTime таблицы.
+    credentials = Credentials.from_service_account_file(
+        credentials_path,
+        scopes=[
+            "https://www.googleapis.com/auth/spreadsheets",
+            "https://www.googleapis.com/auth/drive.metadata.readonly",
+        ],
+    )
+    return gspread.authorize(credentials)
+
 
 def _get_column_index(header: list[str], column_name: str) -> int:
     for idx, value in enumerate(header, start=1):
@@ -26,119 +57,268 @@ def _get_or_create_worksheet(
         return spreadsheet.add_worksheet(title=worksheet_name, rows=1, cols=2)
 
 
-def write_missing_races(
-    sheet_id: str,
-    worksheet_name: str,
-    rows: list[tuple[str, str, str]],
-    credentials_path: str,
-    logger: logging.Logger,
-) -> int:
-    def _action() -> int:
-        credentials = Credentials.from_service_account_file(
-            credentials_path,
-            scopes=["https://www.googleapis.com/auth/spreadsheets"],
-        )
-        client = gspread.authorize(credentials)
-        spreadsheet = client.open_by_key(sheet_id)
-        worksheet = _get_or_create_worksheet(spreadsheet, worksheet_name, logger)
+def _column_letter(index: int) -> str:
+    return rowcol_to_a1(1, index).rstrip("0123456789")
 
-        worksheet.clear()
-        if not rows:
-            logger.info("Лист Missing races очищен, новых ссылок нет")
-            return worksheet.id
 
-        values = [["Источник", "Ссылка", "Координаты"]]
-        values.extend([[source, url, coords] for source, url, coords in rows])
-        worksheet.update(values, value_input_option="RAW")
-        return worksheet.id
+def _column_values(value_range: dict) -> list[str]:
+    # Пустые ячейки в конце строки API не возвращает: строка может быть [].
+    values = [row[0].strip() if row else "" for row in value_range.get("values", [])]
+    return [value for value in values if value]
 
-    return run_with_retries(_action, logger=logger, action_name="запись Missing races")
 
+@dataclass
+class MissingRacesDiff:
+    delete_rows: list[int] = field(default_factory=list)  # номера строк листа (с 1)
+    append_rows: list[list[str]] = field(default_factory=list)
+    kept: int = 0
+    needs_header: bool = False
 
-def fetch_known_websites(
-    sheet_id: str,
-    worksheet_name: str,
-    url_column: str,
-    credentials_path: str,
-    logger: logging.Logger,
-) -> list[str]:
-    """Возвращает сырые значения колонки WEBSITE (без заголовка, без пустых).
 
-    Сырые URL нужны для построения индекса сопоставления (host/path), а не
-    только множества нормализованных строк.
+@dataclass
+class WriteStats:
+    requests: int = 0
+    bytes_sent: int = 0
+
+
+def diff_missing_races(
+    existing: list[list[str]], rows: list[tuple[str, str, str]]
+) -> MissingRacesDiff:
+    """Разница между листом (значения A:C с заголовком) и нужным списком строк.
+
+    Ключ — нормализованная ссылка (колонка B). Строки без ссылки не трогаются,
+    повторы одной ссылки на листе удаляются.
     """
+    wanted: dict[str, tuple[str, str, str]] = {}
+    for row in rows:
+        wanted.setdefault(normalize_url(row[1]), row)
+
+    diff = MissingRacesDiff(needs_header=not existing)
+    present: set[str] = set()
+    for number, values in enumerate(existing[1:], start=2):
+        url = values[1].strip() if len(values) > 1 else ""
+        if not url:
+            continue
+        key = normalize_url(url)
+        if key in wanted and key not in present:
+            present.add(key)
+        else:
+            diff.delete_rows.append(number)
+    diff.kept = len(present)
+    diff.append_rows = [list(row) for key, row in wanted.items() if key not in present]
+    return diff
 
-    def _action() -> list[str]:
-        credentials = Credentials.from_service_account_file(
-            credentials_path,
-            scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"],
-        )
-        client = gspread.authorize(credentials)
-        worksheet = client.open_by_key(sheet_id).worksheet(worksheet_name)
 
-        column_index: int
-        if url_column.isdigit():
-            column_index = int(url_column)
+def _delete_requests(sheet_id: int, row_numbers: list[int]) -> list[dict]:
+    """deleteDimension по непрерывным диапазонам, снизу вверх — индексы не сдвигаются."""
+    ranges: list[list[int]] = []
+    for number in sorted(row_numbers):
+        if ranges and ranges[-1][1] == number - 1:
+            ranges[-1][1] = number
         else:
-            header = worksheet.row_values(1)
-            column_index = _get_column_index(header, url_column)
+            ranges.append([number, number])
+    return [
+        {
+            "deleteDimension": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "dimension": "ROWS",
+                    "startIndex": first - 1,
+                    "endIndex": last,
+                }
+            }
+        }
+        for first, last in reversed(ranges)
+    ]
 
-        values = worksheet.col_values(column_index)
-        if values:
-            values = values[1:]
 
-        websites = [value.strip() for value in values if value and value.strip()]
-        return cast(list[str], websites)
+def _chunk_rows(rows: list[list[str]], max_bytes: int) -> list[list[list[str]]]:
+    chunks: list[list[list[str]]] = []
+    current: list[list[str]] = []
+    size = 0
+    for row in rows:
+        row_size = len(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+        if current and size + row_size > max_bytes:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(row)
+        size += row_size
+    if current:
+        chunks.append(current)
+    return chunks
 
-    return run_with_retries(_action, logger=logger, action_name="чтение Google Sheets")
 
+def _with_backoff(action: Callable[[], T], logger: logging.Logger, action_name: str) -> T:
+    # 429 (лимит запросов Sheets API в минуту) — экспоненциальная пауза и повтор.
+    for attempt in range(_BACKOFF_ATTEMPTS):
+        try:
+            return action()
+        except gspread.exceptions.APIError as exc:
+            if exc.response.status_code != 429 or attempt == _BACKOFF_ATTEMPTS - 1:
+                raise
+            delay = _BACKOFF_BASE_SEC * (2**attempt)
+            logger.warning("Google Sheets 429 (%s), пауза %.0f с", action_name, delay)
+            time.sleep(delay)
+    raise AssertionError("unreachable")
 
-def fetch_known_names(
-    sheet_id: str,
-    worksheet_name: str,
-    name_columns: tuple[str, ...],
-    credentials_path: str,
-    logger: logging.Logger,
-) -> list[str]:
-    """Возвращает названия трасс из указанных колонок (RACE NAME, RACE NAME (PT))."""
 
-    def _action() -> list[str]:
-        credentials = Credentials.from_service_account_file(
-            credentials_path,
-            scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"],
+class SheetsSession:
+    """Открытая таблица на один запуск.
+
+    Авторизация (_client) — одна на процесс, open_by_key (при первом обращении)
+    и метаданные листов — одни на сессию; листы строятся из закэшированных
+    метаданных, без повторного запроса на каждый worksheet(). Все вызовы
+    синхронные (gspread).
+    """
+
+    def __init__(self, sheet_id: str, credentials_path: str, logger: logging.Logger) -> None:
+        self.sheet_id = sheet_id
+        self.credentials_path = credentials_path
+        self.logger = logger
+        self._spreadsheet: gspread.Spreadsheet | None = None
+        self._sheets: dict[str, dict] | None = None
+
+    @property
+    def spreadsheet(self) -> gspread.Spreadsheet:
+        if self._spreadsheet is None:
+            self._spreadsheet = run_with_retries(
+                lambda: _client(self.credentials_path).open_by_key(self.sheet_id),
+                logger=self.logger,
+                action_name="открытие Google Sheets",
+            )
+        return self._spreadsheet
+
+    def modified_time(self) -> str:
+        """Время последнего изменения таблицы (Drive API) — один лёгкий запрос."""
+        metadata = _client(self.credentials_path).http_client.get_file_drive_metadata(
+            self.sheet_id
         )
-        client = gspread.authorize(credentials)
-        worksheet = client.open_by_key(sheet_id).worksheet(worksheet_name)
-        header = worksheet.row_values(1)
-
-        names: list[str] = []
-        for column_name in name_columns:
-            try:
-                column_index = _get_column_index(header, column_name)
-            except ValueError:
-                logger.warning("Колонка названия '%s' не найдена, пропуск", column_name)
-                continue
-            values = worksheet.col_values(column_index)[1:]
-            names.extend(value.strip() for value in values if value and value.strip())
-        return cast(list[str], names)
-
-    return run_with_retries(_action, logger=logger, action_name="чтение названий RACES")
-
-
-def fetch_worksheet_gid(
-    sheet_id: str,
-    worksheet_name: str,
-    credentials_path: str,
-    logger: logging.Logger,
-) -> int:
-    def _action() -> int:
-        credentials = Credentials.from_service_account_file(
-            credentials_path,
-            scopes=["https://www.googleapis.com/auth/spreadsheets"],
+        return str(metadata.get("modifiedTime", ""))
+
+    def _sheet_properties(self) -> dict[str, dict]:
+        if self._sheets is None:
+            metadata = self.spreadsheet.fetch_sheet_metadata()
+            self._sheets = {
+                sheet["properties"]["title"]: sheet["properties"] for sheet in metadata["sheets"]
+            }
+        return self._sheets
+
+    def worksheet(self, title: str, create: bool = False) -> gspread.Worksheet:
+        properties = self._sheet_properties().get(title)
+        if properties is not None:
+            return gspread.Worksheet(
+                self.spreadsheet, properties, self.spreadsheet.id, self.spreadsheet.client
+            )
+        if not create:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        worksheet = _get_or_create_worksheet(self.spreadsheet, title, self.logger)
+        self._sheet_properties()[title] = worksheet._properties
+        return worksheet
+
+    def read_known_races(
+        self,
+        worksheet_name: str,
+        url_column: str,
+        name_columns: tuple[str, ...],
+    ) -> tuple[list[str], list[str]]:
+        """Сырые URL колонки WEBSITE и названия трасс (RACE NAME, RACE NAME (PT)).
+
+        Заголовок читается одним запросом, все нужные колонки — одним
+        values_batch_get по диапазонам, найденным по заголовку. Сырые URL нужны
+        для построения индекса сопоставления (host/path).
+        """
+
+        def _action() -> tuple[list[str], list[str]]:
+            header: list[str] = []
+            if name_columns or not url_column.isdigit():
+                rows = self.spreadsheet.values_get(absolute_range_name(worksheet_name, "1:1"))
+                header = (rows.get("values") or [[]])[0]
+
+            url_index = (
+                int(url_column) if url_column.isdigit() else _get_column_index(header, url_column)
+            )
+            name_indexes: list[int] = []
+            for column_name in name_columns:
+                try:
+                    name_indexes.append(_get_column_index(header, column_name))
+                except ValueError:
+                    self.logger.warning("Колонка названия '%s' не найдена, пропуск", column_name)
+
+            ranges = [
+                absolute_range_name(worksheet_name, f"{letter}2:{letter}")
+                for letter in map(_column_letter, [url_index, *name_indexes])
+            ]
+            response = self.spreadsheet.values_batch_get(ranges)
+            value_ranges = response.get("valueRanges", [])
+            websites = _column_values(value_ranges[0]) if value_ranges else []
+            names = [name for value_range in value_ranges[1:] for name in _column_values(value_range)]
+            return websites, names
+
+        return run_with_retries(_action, logger=self.logger, action_name="чтение Google Sheets")
+
+    def worksheet_gid(self, worksheet_name: str) -> int:
+        return run_with_retries(
+            lambda: self.worksheet(worksheet_name, create=True).id,
+            logger=self.logger,
+            action_name="чтение gid листа",
         )
-        client = gspread.authorize(credentials)
-        spreadsheet = client.open_by_key(sheet_id)
-        worksheet = _get_or_create_worksheet(spreadsheet, worksheet_name, logger)
-        return worksheet.id
 
-    return run_with_retries(_action, logger=logger, action_name="чтение gid листа")
+    def _send(
+        self, stats: WriteStats, action_name: str, action: Callable[[], Any], payload: Any
+    ) -> None:
+        _with_backoff(action, self.logger, action_name)
+        stats.requests += 1
+        stats.bytes_sent += len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def write_missing_races(self, worksheet_name: str, rows: list[tuple[str, str, str]]) -> int:
+        """Приводит лист к списку rows по разнице, не переписывая весь лист.
+
+        Строки, которые уже есть (по нормализованной ссылке), не трогаются вместе
+        с заметками в соседних колонках; удаляются только исчезнувшие, новые
+        дописываются в конец. Повтор после сбоя безопасен: разница считается
+        заново по текущему состоянию листа.
+        """
+
+        def _action() -> int:
+            worksheet = self.worksheet(worksheet_name, create=True)
+            existing = _with_backoff(
+                lambda: self.spreadsheet.values_get(
+                    absolute_range_name(worksheet_name, "A:C")
+                ).get("values", []),
+                self.logger,
+                "чтение Missing races",
+            )
+            diff = diff_missing_races(existing, rows)
+            stats = WriteStats()
+
+            requests = _delete_requests(worksheet.id, diff.delete_rows)
+            for start in range(0, len(requests), _DELETE_CHUNK_REQUESTS):
+                body = {"requests": requests[start : start + _DELETE_CHUNK_REQUESTS]}
+                self._send(
+                    stats,
+                    "удаление строк Missing races",
+                    lambda: self.spreadsheet.batch_update(body),
+                    body,
+                )
+
+            values = ([list(MISSING_RACES_HEADER)] if diff.needs_header else []) + diff.append_rows
+            for chunk in _chunk_rows(values, _APPEND_CHUNK_BYTES):
+                self._send(
+                    stats,
+                    "добавление строк Missing races",
+                    lambda: worksheet.append_rows(chunk, value_input_option="RAW", table_range="A1"),
+                    chunk,
+                )
+
+            self.logger.info(
+                "Missing races: удалено=%s добавлено=%s без изменений=%s запросов=%s "
+                "отправлено=%.1f КБ",
+                len(diff.delete_rows),
+                len(diff.append_rows),
+                diff.kept,
+                stats.requests,
+                stats.bytes_sent / 1024,
+            )
+            return worksheet.id
+
+        return run_with_retries(_action, logger=self.logger, action_name="запись Missing races")
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import os
 from collections.abc import Iterable
@@ -7,7 +6,7 @@ from telethon import TelegramClient
 from telethon.sessions import StringSession
 from telethon.tl.types import PeerChannel, PeerChat
 
-from app.utils.retry import run_with_retries
+from app.utils.retry import run_with_retries_async
 
 
 def chunk_lines(lines: Iterable[str], max_chars: int) -> list[str]:
@@ -36,50 +35,75 @@ def chunk_lines(lines: Iterable[str], max_chars: int) -> list[str]:
     return chunks
 
 
-def send_message(
-    api_id: int,
-    api_hash: str,
-    session_path: str,
-    session_string: str | None,
-    target: str,
-    text: str,
-    logger: logging.Logger,
-) -> None:
-    def _resolve_target() -> PeerChat | PeerChannel | str:
-        if not target:
-            return target
-        if target.startswith("@"):
-            return target
-        if target.lstrip("-").isdigit():
-            chat_id = int(target)
-            if str(chat_id).startswith("-100"):
-                return PeerChannel(abs(chat_id))
-            return PeerChat(abs(chat_id))
+def _resolve_target(target: str) -> PeerChat | PeerChannel | str:
+    if not target:
         return target
+    if target.startswith("@"):
+        return target
+    if target.lstrip("-").isdigit():
+        chat_id = int(target)
+        if str(chat_id).startswith("-100"):
+            return PeerChannel(abs(chat_id))
+        return PeerChat(abs(chat_id))
+    return target
+
+
+class TelegramSender:
+    """Клиент Telethon, подключаемый при первой отправке и живущий до close().
 
-    async def _send() -> None:
-        if session_string:
-            client = TelegramClient(StringSession(session_string), api_id, api_hash)
-        else:
-            client = TelegramClient(session_path, api_id, api_hash)
+    В режиме демона один отправитель переиспользуется между запусками; при
+    обрыве соединения клиент подключается заново.
+    """
 
-        await client.connect()
-        try:
+    def __init__(
+        self,
+        api_id: int,
+        api_hash: str,
+        session_path: str,
+        session_string: str | None,
+        target: str,
+        logger: logging.Logger,
+    ) -> None:
+        self.api_id = api_id
+        self.api_hash = api_hash
+        self.session_path = session_path
+        self.session_string = session_string
+        self.target = target
+        self.logger = logger
+        self._client: TelegramClient | None = None
+
+    async def _connected(self) -> TelegramClient:
+        if self._client is None:
+            if self.session_string:
+                session: StringSession | str = StringSession(self.session_string)
+            else:
+                session = self.session_path
+            self._client = TelegramClient(session, self.api_id, self.api_hash)
+        client = self._client
+        if not client.is_connected():
+            await run_with_retries_async(
+                client.connect, logger=self.logger, action_name="подключение Telegram"
+            )
             if not await client.is_user_authorized():
                 raise RuntimeError(
                     "Сессия Telegram не авторизована. Сначала выполните локальный вход и перенесите файл/строку сессии."
                 )
-            await client.send_message(
-                _resolve_target(),
-                text,
-                link_preview=False,
-                parse_mode="html",
+        return client
+
+    async def send(self, texts: Iterable[str]) -> None:
+        """Все части сообщения через одно подключение; повторяется отправка каждой части."""
+        client = await self._connected()
+        peer = _resolve_target(self.target)
+        for text in texts:
+            await run_with_retries_async(
+                lambda: client.send_message(peer, text, link_preview=False, parse_mode="html"),
+                logger=self.logger,
+                action_name="отправка Telegram",
             )
-        finally:
-            await client.disconnect()
+            self.logger.info("Сообщение отправлено через Telethon")
 
-    def _action() -> None:
-        asyncio.run(_send())
-        logger.info("Сообщение отправлено через Telethon")
+    async def close(self) -> None:
+        if self._client is not None and self._client.is_connected():
+            await self._client.disconnect()
+        self._client = None
 
-    run_with_retries(_action, logger=logger, action_name="отправка Telegram")
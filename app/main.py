@@ -1,20 +1,30 @@
+import asyncio
 import logging
-from datetime import datetime
 import sys
-
-from playwright.sync_api import sync_playwright
-
-from app.config import load_config
-from app.integrations.matching import KnownIndex, MatchConfig, is_service_page
-from app.integrations.sheets import (
-    fetch_known_names,
-    fetch_known_websites,
-    fetch_worksheet_gid,
-    write_missing_races,
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.config import Config, load_config
+from app.integrations.geocode_cache import GeocodeCache, GeocodeCacheStats
+from app.integrations.matching import KnownIndex, MatchConfig
+from app.integrations.races_snapshot import (
+    RacesSnapshot,
+    load_snapshot,
+    save_snapshot,
+    snapshot_age_hours,
+    snapshot_fingerprint,
 )
+from app.integrations.sheets import SheetsSession
 from app.integrations.state import add_notified, get_notified_set, load_state, prune_known, save_state
-from app.integrations.telegram import chunk_lines, send_message
+from app.integrations.telegram import TelegramSender, chunk_lines
 from app.logging_setup import setup_logging
+from app.utils.browser import LazyBrowser, SharedBrowser
+from app.utils.http import HttpClient, configure_http, log_http_stats
+from app.utils.rate_limit import QuotaLedger, RateLimiter, TokenBucket
+from app.utils.resource_blocker import ResourceBlocker
+from app.utils.run_lock import run_lock
 from app.sources.source1_portugalruncalendar import scrape_source1
 from app.sources.source2_portugalrunning import scrape_source2
 
@@ -30,28 +40,354 @@ def _log_config(logger: logging.Logger, config) -> None:
     logger.info("DRY_RUN=%s RUN_HEADLESS=%s", config.dry_run, config.run_headless)
 
 
+def _open_geocode_cache(config: Config) -> GeocodeCache | None:
+    if not config.geocode_cache_path:
+        return None
+    return GeocodeCache(
+        config.geocode_cache_path,
+        config.geocode_cache_ttl_days,
+        config.geocode_cache_negative_ttl_days,
+        config.geocode_cache_max_entries,
+    )
+
+
+def _build_geocode_limiter(config: Config) -> RateLimiter:
+    rate = 1.0 / config.opencage_delay_sec if config.opencage_delay_sec > 0 else 0.0
+    ledger = QuotaLedger(
+        config.opencage_ledger_path,
+        config.opencage_daily_quota,
+        config.opencage_quota_reserve,
+    )
+    return RateLimiter(TokenBucket(rate, config.opencage_burst), ledger)
+
+
+def _log_geocode_cache(logger: logging.Logger, cache: GeocodeCache) -> None:
+    stats = cache.stats
+    logger.info(
+        "Кэш геокодинга: попаданий=%s (негативных=%s) промахов=%s "
+        "просрочено=%s записано=%s вытеснено=%s записей=%s",
+        stats.hits,
+        stats.negative_hits,
+        stats.misses,
+        stats.expired,
+        stats.writes,
+        stats.evicted,
+        len(cache),
+    )
+
+
+def _log_resource_blocker(
+    logger: logging.Logger, source_name: str, blocker: ResourceBlocker
+) -> None:
+    stats = blocker.stats
+    by_type = ", ".join(
+        f"{resource_type}={count}" for resource_type, count in sorted(stats.blocked_by_type.items())
+    )
+    logger.info(
+        "Блокировка ресурсов %s: заблокировано=%s (%s) пропущено=%s ≈сэкономлено=%.1f МБ",
+        source_name,
+        stats.blocked,
+        by_type or "-",
+        stats.allowed,
+        stats.estimated_bytes_saved / 1_000_000,
+    )
+
+
+SourceRunner = Callable[[LazyBrowser], Awaitable[dict[str, tuple[str, str, str]]]]
+
+
+def _build_sources(
+    config: Config,
+    geocode_cache: GeocodeCache | None,
+    geocode_limiter: RateLimiter,
+    known_index: KnownIndex,
+    logger: logging.Logger,
+) -> dict[str, SourceRunner]:
+    """Включённые источники: имя -> корутина сбора, получающая свой контекст браузера."""
+    sources: dict[str, SourceRunner] = {}
+    if config.source1_enabled:
+
+        async def _source1(browser: LazyBrowser) -> dict[str, tuple[str, str, str]]:
+            return await scrape_source1(
+                await browser.context(),
+                config.source1_url,
+                config.source1_event_links,
+                config.source1_next_button_selector,
+                config.source1_coords_selector,
+                config.source1_detail_links,
+                config.timeout_ms,
+                config.max_pagination_pages,
+                config.opencage_base_url,
+                config.opencage_api_key,
+                config.opencage_delay_sec,
+                geocode_cache,
+                geocode_limiter,
+                config.border_fallback_km,
+                config.source1_detail_concurrency,
+                config.source1_measure_waits,
+                config.source1_mode,
+                known_index,
+                logger,
+            )
+
+        sources["portugalruncalendar.com"] = _source1
+    if config.source2_enabled:
+        sources["portugalrunning.com"] = lambda browser: scrape_source2(
+            browser,
+            config.source2_ical_url,
+            config.source2_ical_key,
+            config.source2_url,
+            config.source2_feed_cache_path,
+            config.source2_event_store_path,
+            config.source2_months_ahead,
+            config.source2_event_links,
+            config.timeout_ms,
+            config.source2_card_workers,
+            config.source2_card_per_host,
+            config.opencage_base_url,
+            config.opencage_api_key,
+            config.opencage_delay_sec,
+            geocode_cache,
+            geocode_limiter,
+            config.geocode_workers,
+            known_index,
+            logger,
+        )
+    return sources
+
+
+@dataclass
+class _SourceRun:
+    name: str
+    results: dict[str, tuple[str, str, str]] | None
+    elapsed: float
+    blocker: ResourceBlocker | None
+    browser_used: bool
+
+
+async def _run_source(
+    name: str,
+    runner: SourceRunner,
+    shared_browser: SharedBrowser,
+    config: Config,
+    logger: logging.Logger,
+) -> _SourceRun:
+    # Источники работают конкурентно в одном цикле событий: Chromium общий, а
+    # контекст (и блокировщик ресурсов) у каждого свой. Браузер стартует только
+    # при первом обращении (source1 или запасной путь карточек source2).
+    blocker: ResourceBlocker | None = None
+    if config.block_resources:
+        blocker = ResourceBlocker(
+            config.block_resource_types,
+            config.block_domains,
+            config.allow_domains,
+        )
+    browser = LazyBrowser(shared_browser, config.user_agent, blocker)
+    started = time.monotonic()
+    results = None
+    try:
+        results = await runner(browser)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Ошибка источника %s: %s", name, exc)
+    finally:
+        browser_used = browser.started
+        await browser.close()
+    return _SourceRun(name, results, time.monotonic() - started, blocker, browser_used)
+
+
+async def _run_sources(
+    sources: dict[str, SourceRunner],
+    shared_browser: SharedBrowser,
+    config: Config,
+    logger: logging.Logger,
+) -> tuple[dict[str, dict[str, tuple[str, str, str]]], list[str]]:
+    """Результаты успешных источников и имена упавших; сбой одного не мешает другим."""
+    source_errors: list[str] = []
+    source_results: dict[str, dict[str, tuple[str, str, str]]] = {}
+    started = time.monotonic()
+    runs = await asyncio.gather(
+        *(_run_source(name, runner, shared_browser, config, logger) for name, runner in sources.items())
+    )
+    wall = time.monotonic() - started
+
+    for run in runs:
+        if run.results is None:
+            source_errors.append(run.name)
+        else:
+            source_results[run.name] = run.results
+        logger.info(
+            "Источник %s: время=%.1f с браузер=%s",
+            run.name,
+            run.elapsed,
+            "запускался" if run.browser_used else "не нужен",
+        )
+        if run.blocker is not None and run.browser_used:
+            _log_resource_blocker(logger, run.name, run.blocker)
+    if runs:
+        logger.info(
+            "Источники конкурентно: общее время=%.1f с (последовательно было бы ≈%.1f с)",
+            wall,
+            sum(run.elapsed for run in runs),
+        )
+    return source_results, source_errors
+
+
+@dataclass
+class Resources:
+    """Ресурсы, общие для запусков: в режиме демона живут между ними."""
+
+    http: HttpClient
+    browser: SharedBrowser
+    geocode_cache: GeocodeCache | None
+    geocode_limiter: RateLimiter
+    telegram: TelegramSender
+
+
+def open_resources(config: Config, logger: logging.Logger) -> Resources:
+    http = configure_http(
+        user_agent=config.user_agent,
+        timeout_sec=config.http_timeout_sec,
+        retries=config.http_retries,
+        max_connections=config.http_max_connections,
+        http2=config.http2,
+    )
+    telegram = TelegramSender(
+        config.telegram_api_id,
+        config.telegram_api_hash,
+        config.telegram_session_path,
+        config.telegram_session_string,
+        config.telegram_target,
+        logger,
+    )
+    return Resources(
+        http,
+        SharedBrowser(config.run_headless, logger),
+        _open_geocode_cache(config),
+        _build_geocode_limiter(config),
+        telegram,
+    )
+
+
+async def close_resources(resources: Resources) -> None:
+    await resources.browser.close()
+    await resources.telegram.close()
+    await resources.http.aclose()
+    if resources.geocode_cache is not None:
+        resources.geocode_cache.close()
+    if resources.geocode_limiter.ledger is not None:
+        resources.geocode_limiter.ledger.flush()
+
+
+def _log_run_stats(logger: logging.Logger, resources: Resources) -> None:
+    # Счётчики — за один запуск: в режиме демона после вывода они обнуляются.
+    log_http_stats(logger, resources.http)
+    resources.http.stats.clear()
+    geocode_cache = resources.geocode_cache
+    if geocode_cache is not None:
+        geocode_cache.evict()
+        _log_geocode_cache(logger, geocode_cache)
+        geocode_cache.stats = GeocodeCacheStats()
+    ledger = resources.geocode_limiter.ledger
+    if ledger is not None:
+        ledger.flush()
+        logger.info(
+            "OpenCage: запросов за сутки (UTC)=%s остаток квоты=%s",
+            ledger.calls,
+            ledger.remaining,
+        )
+
+
+async def run_once(config: Config, logger: logging.Logger, resources: Resources) -> int:
+    with run_lock(config.run_lock_path) as acquired:
+        if not acquired:
+            logger.warning("Предыдущий запуск ещё выполняется (%s), пропуск", config.run_lock_path)
+            return 1
+        try:
+            return await _run(config, logger, resources)
+        finally:
+            _log_run_stats(logger, resources)
+
+
 def main() -> int:
+    # Синхронная точка входа: весь конвейер выполняется в одном цикле событий.
+    return asyncio.run(main_async())
+
+
+async def main_async() -> int:
     config = load_config()
     setup_logging(config.log_level)
     logger = logging.getLogger("race_monitor")
     _log_config(logger, config)
 
-    known_websites = fetch_known_websites(
-        config.sheet_id,
-        config.worksheet_name,
-        config.url_column,
-        config.google_credentials_path,
-        logger,
+    resources = open_resources(config, logger)
+    try:
+        return await run_once(config, logger, resources)
+    finally:
+        await close_resources(resources)
+
+
+async def _load_known_index(
+    config: Config,
+    logger: logging.Logger,
+    sheets: SheetsSession,
+    match_config: MatchConfig,
+) -> KnownIndex:
+    """KnownIndex из снимка RACES, если таблица не менялась, иначе из Google Sheets.
+
+    gspread синхронный — вызовы Sheets уходят в потоки, не блокируя цикл событий.
+    """
+    name_columns = config.race_name_columns if config.name_match else ()
+    fingerprint = snapshot_fingerprint(
+        config.sheet_id, config.worksheet_name, config.url_column, name_columns, match_config
     )
-    known_names: list[str] = []
-    if config.name_match:
-        known_names = fetch_known_names(
-            config.sheet_id,
-            config.worksheet_name,
-            config.race_name_columns,
-            config.google_credentials_path,
-            logger,
+    snapshot = load_snapshot(config.races_snapshot_path, fingerprint)
+
+    try:
+        modified_time = await asyncio.to_thread(sheets.modified_time)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Не удалось получить время изменения таблицы: %s", exc)
+        modified_time = ""
+    if snapshot is not None and modified_time and snapshot.modified_time == modified_time:
+        logger.info(
+            "RACES не изменялся с %s: используется снимок (%.1f ч)",
+            modified_time,
+            snapshot_age_hours(snapshot),
         )
+        return snapshot.index
+
+    try:
+        known_websites, known_names = await asyncio.to_thread(
+            sheets.read_known_races, config.worksheet_name, config.url_column, name_columns
+        )
+    except Exception as exc:  # noqa: BLE001
+        if snapshot is None:
+            raise
+        logger.warning(
+            "Google Sheets недоступен (%s): используется снимок RACES возрастом %.1f ч",
+            exc,
+            snapshot_age_hours(snapshot),
+        )
+        return snapshot.index
+
+    known_index = KnownIndex(known_websites, match_config, names=known_names)
+    save_snapshot(
+        config.races_snapshot_path,
+        RacesSnapshot(
+            fingerprint,
+            modified_time,
+            datetime.now(timezone.utc).isoformat(),
+            known_index,
+        ),
+    )
+    return known_index
+
+
+async def _run(
+    config: Config,
+    logger: logging.Logger,
+    resources: Resources,
+) -> int:
+    sheets = SheetsSession(config.sheet_id, config.google_credentials_path, logger)
     match_config = MatchConfig(
         lang_prefixes=config.canonical_lang_prefixes,
         subpage_segments=config.subpage_segments,
@@ -61,14 +397,17 @@ def main() -> int:
         block_generic_forms=config.block_generic_forms,
         cross_platform_match=config.cross_platform_match,
         cross_platform_min_slug_len=config.cross_platform_min_slug_len,
+        cross_platform_min_score=config.cross_platform_min_score,
         slug_stoplist=config.slug_stoplist,
         name_match=config.name_match,
+        name_fuzzy_match=config.name_fuzzy_match,
+        name_fuzzy_threshold=config.name_fuzzy_threshold,
     )
-    known_index = KnownIndex(known_websites, match_config, names=known_names)
+    known_index = await _load_known_index(config, logger, sheets, match_config)
     known_urls = known_index.exact
     logger.info(
         "Загружено известных: URL=%s уникальных(норм.)=%s названий(с годом)=%s",
-        len(known_websites),
+        len(known_index.websites),
         len(known_urls),
         len(known_index.by_name),
     )
@@ -76,55 +415,10 @@ def main() -> int:
     state = load_state(config.state_path)
     notified_set = get_notified_set(state)
 
-    source_errors: list[str] = []
-    source_results: dict[str, dict[str, tuple[str, str, str]]] = {}
-
-    with sync_playwright() as playwright:
-        browser = playwright.chromium.launch(headless=config.run_headless)
-        context = browser.new_context(user_agent=config.user_agent)
-
-        if config.source1_enabled:
-            try:
-                source_results["portugalruncalendar.com"] = scrape_source1(
-                    context,
-                    config.source1_url,
-                    config.source1_event_links,
-                    config.source1_next_button_selector,
-                    config.source1_coords_selector,
-                    config.source1_detail_links,
-                    config.timeout_ms,
-                    config.max_pagination_pages,
-                    config.opencage_base_url,
-                    config.opencage_api_key,
-                    config.opencage_delay_sec,
-                    logger,
-                )
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("Ошибка источника portugalruncalendar.com: %s", exc)
-                source_errors.append("portugalruncalendar.com")
-
-        if config.source2_enabled:
-            try:
-                source_results["portugalrunning.com"] = scrape_source2(
-                    context,
-                    config.source2_ical_url,
-                    config.source2_ical_key,
-                    config.source2_url,
-                    config.source2_months_ahead,
-                    config.source2_event_links,
-                    config.timeout_ms,
-                    config.opencage_base_url,
-                    config.opencage_api_key,
-                    config.opencage_delay_sec,
-                    known_index,
-                    logger,
-                )
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("Ошибка источника portugalrunning.com: %s", exc)
-                source_errors.append("portugalrunning.com")
-
-        context.close()
-        browser.close()
+    sources = _build_sources(
+        config, resources.geocode_cache, resources.geocode_limiter, known_index, logger
+    )
+    source_results, source_errors = await _run_sources(sources, resources.browser, config, logger)
 
     if not source_results:
         logger.error("Не удалось получить данные ни с одного источника")
@@ -135,38 +429,46 @@ def main() -> int:
 
     missing_candidates: list[tuple[str, str, str]] = []
 
-    for source_name, url_map in source_results.items():
-        scraped_set = set(url_map.keys())
-        new_candidates: set[str] = set()
-        skipped_service = 0
-        skipped_duplicate = 0
-
-        for normalized in scraped_set:
-            url, _, name = url_map[normalized]
-
-            if is_service_page(url, match_config):
-                skipped_service += 1
-                logger.info("Отфильтровано (служебная страница, D): %s", url)
-                continue
-
-            match = known_index.match(url, name or None)
-            if match is not None:
-                skipped_duplicate += 1
-                category, matched = match
-                logger.info("Дубль (%s): %s ~ %s", category, url, matched)
-                continue
+    # Все источники сопоставляются одной пачкой: URL, уже разобранные источниками
+    # при отсеве известных, берутся из кэша parse_url.
+    candidates = [
+        (source_name, normalized, url_map[normalized])
+        for source_name, url_map in source_results.items()
+        for normalized in url_map
+    ]
+    report = known_index.match_many(
+        ((url, name) for _, _, (url, _, name) in candidates), logger
+    )
+    logger.info(
+        "Сопоставление: %s",
+        " ".join(f"{category}={count}" for category, count in report.counts.items()),
+    )
 
-            new_candidates.add(normalized)
+    new_by_source: dict[str, set[str]] = {name: set() for name in source_results}
+    skipped_by_source: dict[str, dict[str, int]] = {
+        name: {"service": 0, "duplicate": 0} for name in source_results
+    }
+    for (source_name, normalized, (url, _, _)), match in zip(candidates, report.results):
+        if match is None:
+            new_by_source[source_name].add(normalized)
+        elif match[0] == "D":
+            skipped_by_source[source_name]["service"] += 1
+            logger.info("Отфильтровано (служебная страница, D): %s", url)
+        else:
+            skipped_by_source[source_name]["duplicate"] += 1
+            category, matched = match
+            logger.info("Дубль (%s): %s ~ %s", category, url, matched)
 
-        to_notify = new_candidates
-        to_notify_map[source_name] = to_notify
+    for source_name, url_map in source_results.items():
+        new_candidates = new_by_source[source_name]
+        to_notify_map[source_name] = new_candidates
 
         logger.info(
             "Источник %s: всего=%s служебных=%s дублей=%s новых=%s",
             source_name,
-            len(scraped_set),
-            skipped_service,
-            skipped_duplicate,
+            len(url_map),
+            skipped_by_source[source_name]["service"],
+            skipped_by_source[source_name]["duplicate"],
             len(new_candidates),
         )
 
@@ -176,20 +478,11 @@ def main() -> int:
             missing_rows.append((source_name, url, coords))
 
     if not config.dry_run:
-        missing_gid = write_missing_races(
-            config.sheet_id,
-            config.missing_worksheet_name,
-            missing_candidates,
-            config.google_credentials_path,
-            logger,
+        missing_gid = await asyncio.to_thread(
+            sheets.write_missing_races, config.missing_worksheet_name, missing_candidates
         )
     else:
-        missing_gid = fetch_worksheet_gid(
-            config.sheet_id,
-            config.missing_worksheet_name,
-            config.google_credentials_path,
-            logger,
-        )
+        missing_gid = await asyncio.to_thread(sheets.worksheet_gid, config.missing_worksheet_name)
 
     if all(not urls for urls in to_notify_map.values()):
         logger.info("Новых ссылок нет, уведомления не отправляются")
@@ -217,16 +510,7 @@ def main() -> int:
             logger.info("Сообщение:\n%s", chunk)
         return 1 if source_errors else 0
 
-    for chunk in chunks:
-        send_message(
-            config.telegram_api_id,
-            config.telegram_api_hash,
-            config.telegram_session_path,
-            config.telegram_session_string,
-            config.telegram_target,
-            chunk,
-            logger,
-        )
+    await resources.telegram.send(chunks)
 
     for source_name, to_notify in to_notify_map.items():
         if to_notify:
@@ -0,0 +1,169 @@
+"""Разбор данных листинга portugalruncalendar.com из JSON, а не из DOM.
+
+Сайт рендерит список на клиенте, поэтому те же данные приходят в JSON-ответах
+(XHR/fetch) или лежат во встроенных данных гидратации (`__NEXT_DATA__`,
+`application/ld+json`). Структура заранее неизвестна, поэтому разбор обобщённый:
+событием считается любой объект, у которого есть название, ссылка и координаты
+(в нём самом или во вложенных geo/location/coordinates).
+
+Для пагинации без кликов по URL запроса листинга ищется параметр страницы
+(page/p/pagina) или смещения (offset/skip/start).
+"""
+
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+
+_NAME_KEYS = ("name", "title", "nome", "titulo", "event_name", "eventName")
+_URL_KEYS = (
+    "registration_url",
+    "registrationUrl",
+    "website",
+    "site",
+    "url",
+    "link",
+    "href",
+    "permalink",
+)
+_LAT_KEYS = ("lat", "latitude")
+_LON_KEYS = ("lng", "lon", "long", "longitude")
+_NESTED_COORD_KEYS = ("geo", "location", "coordinates", "coords", "position", "local", "place")
+_PAGE_PARAMS = ("page", "p", "pagina")
+_OFFSET_PARAMS = ("offset", "skip", "start")
+
+_JSON_SCRIPT_RE = re.compile(
+    r"<script[^>]*type=[\"']application/(?:ld\+)?json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@dataclass(frozen=True)
+class PayloadEvent:
+    url: str
+    name: str
+    lat: float
+    lon: float
+
+
+def _walk(obj: Any) -> Iterator[dict[str, Any]]:
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _own_coords(obj: dict[str, Any]) -> tuple[float, float] | None:
+    lat = next((_to_float(obj[key]) for key in _LAT_KEYS if key in obj), None)
+    lon = next((_to_float(obj[key]) for key in _LON_KEYS if key in obj), None)
+    if lat is None or lon is None:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def _coords(obj: dict[str, Any], depth: int = 2) -> tuple[float, float] | None:
+    own = _own_coords(obj)
+    if own is not None or depth == 0:
+        return own
+    for key in _NESTED_COORD_KEYS:
+        nested = obj.get(key)
+        if isinstance(nested, dict):
+            found = _coords(nested, depth - 1)
+            if found is not None:
+                return found
+    return None
+
+
+def _pick_url(obj: dict[str, Any], base_url: str) -> str | None:
+    """Внешняя (регистрационная) ссылка приоритетнее внутренней страницы сайта."""
+    base_host = urlsplit(base_url).netloc.lower().removeprefix("www.")
+    internal: str | None = None
+    for key in _URL_KEYS:
+        value = obj.get(key)
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if not (value.startswith("http") or value.startswith("/")):
+            continue
+        absolute = urljoin(base_url, value)
+        host = urlsplit(absolute).netloc.lower().removeprefix("www.")
+        if host and host != base_host:
+            return absolute
+        internal = internal or absolute
+    return internal
+
+
+def events_from_payload(payload: Any, base_url: str) -> list[PayloadEvent]:
+    events: list[PayloadEvent] = []
+    seen: set[str] = set()
+    for obj in _walk(payload):
+        name = next(
+            (obj[key].strip() for key in _NAME_KEYS if isinstance(obj.get(key), str)), ""
+        )
+        if not name:
+            continue
+        url = _pick_url(obj, base_url)
+        if not url or url in seen:
+            continue
+        coords = _coords(obj)
+        if coords is None:
+            continue
+        seen.add(url)
+        events.append(PayloadEvent(url, name, coords[0], coords[1]))
+    return events
+
+
+def events_from_html(html: str, base_url: str) -> list[PayloadEvent]:
+    """События из встроенных JSON-блоков страницы (гидратация, JSON-LD)."""
+    events: list[PayloadEvent] = []
+    for raw in _JSON_SCRIPT_RE.findall(html):
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            continue
+        events.extend(events_from_payload(payload, base_url))
+    return events
+
+
+def next_page_url(url: str, page_size: int) -> str | None:
+    """URL следующей страницы листинга или None, если параметр пагинации не найден."""
+    parts = urlsplit(url)
+    pairs = parse_qsl(parts.query, keep_blank_values=True)
+    for idx, (key, value) in enumerate(pairs):
+        key_lower = key.lower()
+        if not value.isdigit():
+            continue
+        if key_lower in _PAGE_PARAMS:
+            pairs[idx] = (key, str(int(value) + 1))
+        elif key_lower in _OFFSET_PARAMS and page_size > 0:
+            pairs[idx] = (key, str(int(value) + page_size))
+        else:
+            continue
+        return urlunsplit(parts._replace(query=urlencode(pairs)))
+    return None
+
+
+def same_endpoint(url: str, listing_url: str) -> bool:
+    """Тот же запрос листинга (схема, host, путь), параметры запроса не важны."""
+    a, b = urlsplit(url), urlsplit(listing_url)
+    return (a.scheme, a.netloc.lower(), a.path.rstrip("/")) == (
+        b.scheme,
+        b.netloc.lower(),
+        b.path.rstrip("/"),
+    )
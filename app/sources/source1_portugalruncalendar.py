@@ -1,37 +1,121 @@
+import asyncio
 import logging
 import re
 import time
+from collections import deque
+from dataclasses import dataclass
 from urllib.parse import urljoin
 
-from playwright.sync_api import BrowserContext, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 
 from app.integrations.geocode import (
     format_coordinates,
     parse_coordinates,
     reverse_geocode_portugal,
 )
+from app.integrations.geocode_cache import GeocodeCache
+from app.integrations.matching import KnownIndex, is_service_page
+from app.integrations.portugal_boundary import INSIDE, NEAR_BORDER, portugal_boundary
 from app.integrations.url_normalize import normalize_url
-from app.utils.retry import run_with_retries
+from app.sources.source1_payload import (
+    PayloadEvent,
+    events_from_html,
+    events_from_payload,
+    next_page_url,
+    same_endpoint,
+)
+from app.utils.rate_limit import QuotaExhausted, RateLimiter
+from app.utils.retry import run_with_retries_async
+
+
+# Один вызов в браузер вместо count() + nth(idx).get_attribute() на каждый элемент.
+_HREFS_JS = "(nodes) => nodes.map((node) => node.getAttribute('href'))"
+# Заголовок карточки листинга — название события (для дедупа до перехода).
+_NAME_SELECTOR = "h1, h2, h3, h4"
+_LISTING_JS = """
+(nodes, [detailSelector, nameSelector]) => nodes.map((node) => {
+    const detail = node.querySelector(detailSelector);
+    const heading = node.querySelector(nameSelector);
+    return {
+        href: node.getAttribute("href"),
+        detail: detail ? detail.getAttribute("href") : null,
+        name: heading ? heading.textContent.trim() : "",
+    };
+})
+"""
 
 
-def _extract_links_by_selector(page, selector: str) -> list[str]:
+async def _extract_links_by_selector(page, selector: str) -> list[str]:
+    try:
+        hrefs = await page.eval_on_selector_all(selector, _HREFS_JS)
+        return [href for href in hrefs if href]
+    except Exception:  # noqa: BLE001
+        pass
     locator = page.locator(selector)
     links: list[str] = []
-    for idx in range(locator.count()):
-        href = locator.nth(idx).get_attribute("href")
+    for idx in range(await locator.count()):
+        href = await locator.nth(idx).get_attribute("href")
         if href:
             links.append(href)
     return links
 
 
-def _extract_event_links(page, selector_primary: str) -> list[str]:
-    selectors = [
+async def _extract_listing_slow(
+    page, event_selector: str, detail_selector: str
+) -> list[tuple[str, str | None, str]]:
+    """Поэлементный путь через локаторы (запасной для _extract_listing)."""
+    listing_locator = page.locator(event_selector)
+    total = await listing_locator.count()
+    items: list[tuple[str, str | None, str]] = []
+    for idx in range(total):
+        item = listing_locator.nth(idx)
+        href = await item.get_attribute("href")
+        if not href:
+            continue
+        detail_href = None
+        detail_locator = item.locator(detail_selector)
+        if await detail_locator.count() > 0:
+            detail_href = await detail_locator.first.get_attribute("href") or None
+        name = ""
+        name_locator = item.locator(_NAME_SELECTOR)
+        if await name_locator.count() > 0:
+            name = (await name_locator.first.text_content() or "").strip()
+        items.append((href, detail_href, name))
+    return items
+
+
+async def _extract_listing(
+    page,
+    event_selector: str,
+    detail_selector: str,
+    logger: logging.Logger,
+) -> list[tuple[str, str | None, str]]:
+    """(href карточки, href вложенной ссылки, название) всего листинга за один вызов."""
+    try:
+        rows = await page.eval_on_selector_all(
+            event_selector, _LISTING_JS, [detail_selector, _NAME_SELECTOR]
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Пакетное извлечение листинга не удалось, поэлементный путь: %s", exc)
+        return await _extract_listing_slow(page, event_selector, detail_selector)
+    return [
+        (row["href"], row.get("detail") or None, (row.get("name") or "").strip())
+        for row in rows
+        if row.get("href")
+    ]
+
+
+def _event_link_selectors(selector_primary: str) -> list[str]:
+    return [
         selector_primary,
         "div.space-y-6 a[href]",
         "div.space-y-6 a",
     ]
-    for selector in selectors:
-        links = _extract_links_by_selector(page, selector)
+
+
+async def _extract_event_links(page, selector_primary: str) -> list[str]:
+    for selector in _event_link_selectors(selector_primary):
+        links = await _extract_links_by_selector(page, selector)
         if links:
             return links
     return []
@@ -42,12 +126,192 @@ def _to_relative_selector(selector: str) -> str:
     return parts[-1] if parts else selector.strip()
 
 
-def _get_first_event_marker(page, selector_primary: str) -> str:
-    links = _extract_event_links(page, selector_primary)
+async def _get_first_event_marker(page, selector_primary: str) -> str:
+    links = await _extract_event_links(page, selector_primary)
     return links[0] if links else ""
 
 
-def scrape_source1(
+# Первый href списка событий (по тем же селекторам, что _get_first_event_marker),
+# отличающийся от before. Используется в wait_for_function вместо polling.
+_FIRST_MARKER_CHANGED_JS = """
+([selectors, before]) => {
+    for (const selector of selectors) {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(selector);
+        } catch (e) {
+            continue;
+        }
+        for (const node of nodes) {
+            const href = node.getAttribute("href");
+            if (href) {
+                return href !== before;
+            }
+        }
+    }
+    return false;
+}
+"""
+
+_DETAIL_ATTEMPTS = 3
+_PAGINATION_WAIT_MS = 10000
+
+
+def _is_json_response(response) -> bool:
+    if response.request.resource_type not in ("xhr", "fetch"):
+        return False
+    return "json" in (response.headers.get("content-type") or "")
+
+
+@dataclass
+class _WaitStats:
+    """Время ожиданий по событиям и (в режиме замера) — сколько ещё ждал бы networkidle."""
+
+    measure: bool
+    waits: int = 0
+    waited: float = 0.0
+    measured: int = 0
+    saved: float = 0.0
+
+    async def record(self, page: Page, label: str, started: float, logger: logging.Logger) -> None:
+        waited = time.monotonic() - started
+        self.waits += 1
+        self.waited += waited
+        if not self.measure:
+            logger.debug("%s: ожидание по событию %.2f с", label, waited)
+            return
+        idle_started = time.monotonic()
+        try:
+            await page.wait_for_load_state("networkidle")
+        except PlaywrightTimeoutError:
+            pass
+        saved = time.monotonic() - idle_started
+        self.measured += 1
+        self.saved += saved
+        logger.info(
+            "%s: ожидание по событию %.2f с, networkidle потребовал бы ещё %.2f с",
+            label,
+            waited,
+            saved,
+        )
+
+
+@dataclass
+class _DetailCard:
+    url: str
+    coords_text: str = ""
+    title: str = ""
+    error: str | None = None
+    elapsed: float = 0.0
+    attempts: int = 0
+
+
+class _DetailPool:
+    """Пул из N вкладок для карточек событий.
+
+    Каждая вкладка — отдельная корутина, забирающая карточки из общей очереди,
+    поэтому Chromium грузит до N карточек одновременно. Результаты возвращаются
+    в порядке входного списка, сбой одной карточки (после _DETAIL_ATTEMPTS
+    попыток) не влияет на остальные.
+    """
+
+    def __init__(
+        self,
+        pages: list[Page],
+        coords_selector: str,
+        wait_stats: _WaitStats,
+        logger: logging.Logger,
+    ) -> None:
+        self.coords_selector = coords_selector
+        self.wait_stats = wait_stats
+        self.logger = logger
+        self.pages = pages
+        self.loaded = 0
+        self.failed = 0
+        self.total_elapsed = 0.0
+
+    @classmethod
+    async def open(
+        cls,
+        context: BrowserContext,
+        size: int,
+        timeout_ms: int,
+        coords_selector: str,
+        wait_stats: _WaitStats,
+        logger: logging.Logger,
+    ) -> "_DetailPool":
+        pages: list[Page] = []
+        for _ in range(max(1, size)):
+            detail_page = await context.new_page()
+            detail_page.set_default_timeout(timeout_ms)
+            pages.append(detail_page)
+        return cls(pages, coords_selector, wait_stats, logger)
+
+    async def _read(self, detail_page: Page, card: _DetailCard, started: float) -> None:
+        # Ждём появления блока координат, а не тишины в сети (networkidle).
+        coords_locator = detail_page.locator(self.coords_selector)
+        try:
+            await coords_locator.first.wait_for(state="attached")
+        except PlaywrightTimeoutError:
+            self.logger.debug("Блок координат не появился: %s", card.url)
+            return
+        await self.wait_stats.record(detail_page, "Карточка", started, self.logger)
+        card.coords_text = (await coords_locator.first.inner_text()).strip()
+        try:
+            card.title = await detail_page.title()
+        except Exception:  # noqa: BLE001
+            card.title = ""
+
+    async def load(self, urls: list[str]) -> list[_DetailCard]:
+        cards = [_DetailCard(url) for url in urls]
+        pending = deque(range(len(cards)))
+
+        def _failed(idx: int, exc: Exception) -> None:
+            card = cards[idx]
+            self.logger.warning(
+                "Сбой карточки %s (попытка %s/%s): %s",
+                card.url,
+                card.attempts,
+                _DETAIL_ATTEMPTS,
+                exc,
+            )
+            if card.attempts < _DETAIL_ATTEMPTS:
+                pending.append(idx)
+            else:
+                card.error = str(exc)
+                self.failed += 1
+
+        async def _worker(detail_page: Page) -> None:
+            while pending:
+                idx = pending.popleft()
+                card = cards[idx]
+                card.attempts += 1
+                started = time.monotonic()
+                try:
+                    await detail_page.goto(card.url, wait_until="commit")
+                    await self._read(detail_page, card, started)
+                except Exception as exc:  # noqa: BLE001
+                    _failed(idx, exc)
+                    continue
+                card.elapsed = time.monotonic() - started
+                self.loaded += 1
+                self.total_elapsed += card.elapsed
+                self.logger.debug(
+                    "Карточка загружена за %.2f с (попытка %s): %s",
+                    card.elapsed,
+                    card.attempts,
+                    card.url,
+                )
+
+        await asyncio.gather(*(_worker(detail_page) for detail_page in self.pages))
+        return cards
+
+    async def close(self) -> None:
+        for detail_page in self.pages:
+            await detail_page.close()
+
+
+async def scrape_source1(
     context: BrowserContext,
     base_url: str,
     event_selector: str,
@@ -59,115 +323,266 @@ def scrape_source1(
     opencage_base_url: str,
     opencage_api_key: str,
     opencage_delay_sec: float,
+    geocode_cache: GeocodeCache | None,
+    geocode_limiter: RateLimiter | None,
+    border_fallback_km: float,
+    detail_concurrency: int,
+    measure_waits: bool,
+    mode: str,
+    known_index: KnownIndex | None,
     logger: logging.Logger,
 ) -> dict[str, tuple[str, str]]:
-    page = context.new_page()
+    # Офлайн-проверка страны; OpenCage — только для точек у сухопутной границы.
+    # Первое построение сетки (~0.5 с CPU) — вне цикла событий, дальше из кэша.
+    boundary = await asyncio.to_thread(portugal_boundary, border_fallback_km)
+    boundary_stats = {"offline": 0, "fallback": 0, "quota": 0}
+    # Известные и служебные события отсеиваем до карточек и OpenCage:
+    # иначе их всё равно выбросит main(), но уже после дорогой работы.
+    prefilter_stats = {"service": 0, "known": 0}
+
+    page = await context.new_page()
     page.set_default_timeout(timeout_ms)
 
     results: dict[str, tuple[str, str, str]] = {}
-    detail_page = context.new_page()
-    detail_page.set_default_timeout(timeout_ms)
+    wait_stats = _WaitStats(measure_waits)
+    detail_pool = await _DetailPool.open(
+        context, detail_concurrency, timeout_ms, coords_selector, wait_stats, logger
+    )
+    listing_selectors = _event_link_selectors(event_selector)
 
-    def _goto(url: str) -> None:
-        page.goto(url, wait_until="networkidle")
+    # Режимы: dom — карточки событий; json — данные из XHR/гидратации листинга;
+    # auto — json, а для страниц без данных в JSON — dom.
+    payload_mode = mode in ("auto", "json")
+    payload_stats = {"json": 0, "dom": 0, "replayed": 0}
+    captured: list = []
+    listing_api: dict[str, str | int] = {}
+    # Нормализованные URL всех событий из JSON (принятых и отсеянных): по ним
+    # видно, что API вернул уже полученную страницу.
+    payload_seen: set[str] = set()
 
-    use_button_pagination = bool(next_button_selector.strip())
+    def _capture(response) -> None:
+        # В обработчике только запоминаем ответ: тело читаем позже, в основном потоке.
+        # Когда запрос листинга определён, прочие JSON-ответы не нужны.
+        if not _is_json_response(response):
+            return
+        if listing_api and not same_endpoint(response.url, str(listing_api["url"])):
+            return
+        captured.append(response)
 
-    def _collect_links() -> tuple[int, int]:
-        listing_locator = page.locator(event_selector)
-        listing_links: list[str] = []
-        for idx in range(listing_locator.count()):
-            href = listing_locator.nth(idx).get_attribute("href")
-            if href:
-                listing_links.append(href)
-        if not listing_links:
-            logger.warning("Не найдены ссылки событий на странице %s", page.url)
-        detail_selector = _to_relative_selector(detail_links_selector)
-        added = 0
-        for idx, href in enumerate(listing_links):
-            coords_absolute = urljoin(page.url, href)
-            table_href = None
-            detail_href = None
-            if idx < listing_locator.count():
-                detail_locator = listing_locator.nth(idx).locator(detail_selector)
-                if detail_locator.count() > 0:
-                    candidate = detail_locator.first.get_attribute("href")
-                    if candidate:
-                        detail_href = candidate
-            if detail_href:
-                table_href = detail_href
-            else:
-                table_href = href
-            absolute = urljoin(page.url, table_href)
-            normalized = normalize_url(absolute)
-            if normalized not in results:
-                def _open_detail() -> None:
-                    detail_page.goto(coords_absolute, wait_until="networkidle")
+    if payload_mode:
+        page.on("response", _capture)
 
-                run_with_retries(_open_detail, logger=logger, action_name="загрузка карточки")
+    async def _goto(url: str) -> None:
+        # Листинг рендерится на клиенте: ждём первую ссылку события, а не networkidle.
+        started = time.monotonic()
+        await page.goto(url, wait_until="domcontentloaded")
+        try:
+            await page.wait_for_function(_FIRST_MARKER_CHANGED_JS, arg=[listing_selectors, ""])
+        except PlaywrightTimeoutError:
+            # Пустой листинг (фильтр без событий, межсезонье) — не ошибка загрузки.
+            logger.warning("Ссылки событий не появились, листинг считается пустым: %s", url)
+            return
+        await wait_stats.record(page, "Листинг, страница 1", started, logger)
 
-                coords_text = ""
-                coords_locator = detail_page.locator(coords_selector)
-                if coords_locator.count() > 0:
-                    coords_text = coords_locator.first.inner_text().strip()
+    use_button_pagination = bool(next_button_selector.strip())
 
-                coords = parse_coordinates(coords_text)
-                if not coords:
-                    logger.warning("Не найдены координаты для события %s", coords_absolute)
-                    continue
+    def _is_known(absolute: str, name: str) -> bool:
+        if known_index is None:
+            return False
+        if is_service_page(absolute, known_index.config):
+            prefilter_stats["service"] += 1
+            logger.debug("Предфильтр (служебная страница): %s", absolute)
+            return True
+        match = known_index.match(absolute, name or None, logger)
+        if match is not None:
+            prefilter_stats["known"] += 1
+            logger.debug("Предфильтр (%s): %s ~ %s", match[0], absolute, match[1])
+            return True
+        return False
 
-                lat, lon = coords
-                in_portugal = reverse_geocode_portugal(
+    async def _accept(normalized: str, absolute: str, lat: float, lon: float, name: str) -> bool:
+        verdict = boundary.classify(lat, lon)
+        if verdict == NEAR_BORDER:
+            boundary_stats["fallback"] += 1
+            try:
+                in_portugal = await reverse_geocode_portugal(
                     lat,
                     lon,
                     opencage_base_url,
                     opencage_api_key,
                     opencage_delay_sec,
                     logger,
+                    cache=geocode_cache,
+                    limiter=geocode_limiter,
                 )
-                if not in_portugal:
-                    logger.debug("Событие вне Португалии: %s", absolute)
-                    continue
-
-                # Название события из <title> страницы (до разделителя),
-                # напр. "EDP Meia Maratona de Lisboa 2027 - Lisboa | ...".
-                name = ""
-                try:
-                    raw_title = detail_page.title()
-                    name = re.split(r"\s[-|]\s", raw_title)[0].strip()
-                except Exception:  # noqa: BLE001
-                    name = ""
+            except QuotaExhausted:
+                # Режим «только кэш»: решаем по встроенной геометрии.
+                boundary_stats["quota"] += 1
+                in_portugal = boundary.contains(lat, lon)
+        else:
+            boundary_stats["offline"] += 1
+            in_portugal = verdict == INSIDE
+        if not in_portugal:
+            logger.debug("Событие вне Португалии: %s", absolute)
+            return False
+        results[normalized] = (absolute, format_coordinates(lat, lon), name)
+        return True
 
-                coord_str = format_coordinates(lat, lon)
-                results[normalized] = (absolute, coord_str, name)
+    async def _add_payload_events(events: list[PayloadEvent]) -> int:
+        added = 0
+        for event in events:
+            normalized = normalize_url(event.url)
+            payload_seen.add(normalized)
+            if normalized in results:
+                logger.debug("Дубликат после нормализации: %s", event.url)
+                continue
+            if _is_known(event.url, event.name):
+                continue
+            if await _accept(normalized, event.url, event.lat, event.lon, event.name):
                 added += 1
-            else:
+        return added
+
+    async def _collect_from_payload(first_page: bool) -> tuple[int, int] | None:
+        """События страницы из JSON листинга; None — данных нет или их меньше, чем в DOM.
+
+        Пока запрос листинга не определён, им считается ответ с наибольшим числом
+        событий (виджеты и прочие XHR дают единицы); дальше учитываются только
+        ответы того же адреса.
+        """
+        best_url = ""
+        events: list[PayloadEvent] = []
+        for response in captured:
+            try:
+                found = events_from_payload(await response.json(), page.url)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("JSON-ответ не разобран (%s): %s", response.url, exc)
+                continue
+            if len(found) > len(events):
+                best_url, events = response.url, found
+        captured.clear()
+        if first_page and not events:
+            events = events_from_html(await page.content(), page.url)
+        if not events:
+            return None
+        if mode == "auto":
+            # Обобщённый разбор принимает любой объект с названием, ссылкой и
+            # координатами: случайный JSON-LD или виджет не должен заменять листинг.
+            listing_count = len(set(await _extract_links_by_selector(page, event_selector)))
+            if len(events) < listing_count:
+                logger.info(
+                    "JSON: событий=%s меньше, чем ссылок в листинге DOM=%s — страница %s из DOM",
+                    len(events),
+                    listing_count,
+                    page.url,
+                )
+                return None
+        if best_url and not listing_api:
+            listing_api.update(url=best_url, size=len(events))
+            logger.debug("Запрос листинга: %s", best_url)
+        payload_stats["json"] += 1
+        return len(events), await _add_payload_events(events)
+
+    async def _replay_pages(pages_left: int) -> None:
+        """Следующие страницы листинга прямыми запросами к API, без кликов.
+
+        Останавливается, когда следующей страницы нет, ответ пуст или все его
+        события уже приходили раньше. Страница, где ничего не добавлено (все
+        события известны или вне Португалии), — обычный случай и не повод
+        останавливаться.
+        """
+        url = str(listing_api["url"])
+        for _ in range(pages_left):
+            next_url = next_page_url(url, int(listing_api["size"]))
+            if next_url is None:
+                return
+            response = await context.request.get(next_url, timeout=timeout_ms)
+            if not response.ok:
+                logger.warning("Запрос листинга %s: HTTP %s", next_url, response.status)
+                return
+            events = events_from_payload(await response.json(), base_url)
+            if not events:
+                return
+            if {normalize_url(event.url) for event in events} <= payload_seen:
+                logger.debug("Страница API %s повторяет полученные события, остановка", next_url)
+                return
+            added = await _add_payload_events(events)
+            payload_stats["replayed"] += 1
+            logger.debug("Страница API %s: событий=%s добавлено=%s", next_url, len(events), added)
+            url = next_url
+
+    async def _collect_links() -> tuple[int, int]:
+        detail_selector = _to_relative_selector(detail_links_selector)
+        listing = await _extract_listing(page, event_selector, detail_selector, logger)
+        if not listing:
+            logger.warning("Не найдены ссылки событий на странице %s", page.url)
+        # Сначала собираем новые карточки страницы, затем грузим их пулом.
+        items: list[tuple[str, str, str]] = []
+        queued: set[str] = set()
+        for href, detail_href, listing_name in listing:
+            coords_absolute = urljoin(page.url, href)
+            table_href = detail_href or href
+            absolute = urljoin(page.url, table_href)
+            normalized = normalize_url(absolute)
+            if normalized in results or normalized in queued:
                 logger.debug("Дубликат после нормализации: %s", absolute)
-        return len(listing_links), added
+                continue
+            queued.add(normalized)
+            if _is_known(absolute, listing_name):
+                continue
+            items.append((coords_absolute, absolute, normalized))
+
+        cards = await detail_pool.load([coords_absolute for coords_absolute, _, _ in items])
+        added = 0
+        for (coords_absolute, absolute, normalized), card in zip(items, cards):
+            if card.error is not None:
+                logger.warning("Карточка пропущена после ошибок: %s", coords_absolute)
+                continue
+
+            coords = parse_coordinates(card.coords_text)
+            if not coords:
+                logger.warning("Не найдены координаты для события %s", coords_absolute)
+                continue
+
+            lat, lon = coords
+            # Название события из <title> страницы (до разделителя),
+            # напр. "EDP Meia Maratona de Lisboa 2027 - Lisboa | ...".
+            name = re.split(r"\s[-|]\s", card.title)[0].strip() if card.title else ""
+            if await _accept(normalized, absolute, lat, lon, name):
+                added += 1
+        return len(listing), added
 
     if not use_button_pagination:
         logger.error("SOURCE1_NEXT_BUTTON_SELECTOR не задан, пагинация недоступна")
-        page.close()
-        detail_page.close()
+        await page.close()
+        await detail_pool.close()
         return results
 
     try:
-        run_with_retries(lambda: _goto(base_url), logger=logger, action_name="загрузка страницы")
+        await run_with_retries_async(
+            lambda: _goto(base_url), logger=logger, action_name="загрузка страницы"
+        )
     except PlaywrightTimeoutError as exc:
         logger.error("Таймаут при загрузке %s: %s", base_url, exc)
-        page.close()
-        detail_page.close()
+        await page.close()
+        await detail_pool.close()
         return results
 
     last_marker = ""
     for page_index in range(1, max_pages + 1):
-        marker_before = _get_first_event_marker(page, event_selector)
+        marker_before = await _get_first_event_marker(page, event_selector)
         if marker_before and marker_before == last_marker:
             logger.debug("Маркер списка не изменился, остановка пагинации")
             break
         last_marker = marker_before
         logger.debug("Страница %s, маркер списка до клика: %s", page_index, marker_before)
-        raw_count, added_count = _collect_links()
+        collected = await _collect_from_payload(page_index == 1) if payload_mode else None
+        if collected is None and mode == "json":
+            logger.warning("В JSON нет событий для страницы %s (SOURCE1_MODE=json)", page.url)
+            collected = (0, 0)
+        if collected is None:
+            payload_stats["dom"] += 1
+            collected = await _collect_links()
+        raw_count, added_count = collected
         logger.debug(
             "Страница %s, ссылок в DOM: %s, добавлено уникальных: %s",
             page_index,
@@ -175,34 +590,82 @@ def scrape_source1(
             added_count,
         )
 
+        if listing_api and next_page_url(str(listing_api["url"]), int(listing_api["size"])):
+            await _replay_pages(max_pages - page_index)
+            break
+
         next_button = page.locator(next_button_selector)
-        count = next_button.count()
+        count = await next_button.count()
         if count == 0:
             logger.debug("Кнопка Próxima не найдена на странице: %s", page.url)
             break
-        if next_button.first.is_disabled():
+        if await next_button.first.is_disabled():
             logger.debug("Кнопка Próxima отключена на странице: %s", page.url)
             break
 
-        def _click_next() -> None:
-            next_button.first.click()
+        async def _click_next() -> None:
+            await next_button.first.click()
 
-        run_with_retries(_click_next, logger=logger, action_name="клик Próxima")
+        clicked_at = time.monotonic()
+        await run_with_retries_async(_click_next, logger=logger, action_name="клик Próxima")
 
-        deadline = time.monotonic() + 10
-        while time.monotonic() < deadline:
-            marker_after = _get_first_event_marker(page, event_selector)
-            if marker_after and marker_after != marker_before:
-                logger.debug("Маркер списка после клика: %s", marker_after)
-                break
-            page.wait_for_timeout(500)
-        else:
+        try:
+            await page.wait_for_function(
+                _FIRST_MARKER_CHANGED_JS,
+                arg=[listing_selectors, marker_before],
+                timeout=_PAGINATION_WAIT_MS,
+            )
+        except PlaywrightTimeoutError:
             logger.warning("Не удалось дождаться смены списка после Próxima")
             break
+        await wait_stats.record(page, f"Листинг, страница {page_index + 1}", clicked_at, logger)
 
     if max_pages <= 0:
         logger.warning("MAX_PAGINATION_PAGES задан неверно: %s", max_pages)
 
-    page.close()
-    detail_page.close()
+    logger.info(
+        "Режим source1=%s: страниц из JSON=%s из DOM=%s запросами к API без кликов=%s",
+        mode,
+        payload_stats["json"],
+        payload_stats["dom"],
+        payload_stats["replayed"],
+    )
+
+    logger.info(
+        "Предфильтр source1 (до карточек и OpenCage): служебных=%s известных=%s "
+        "избежано дорогих проверок=%s",
+        prefilter_stats["service"],
+        prefilter_stats["known"],
+        prefilter_stats["service"] + prefilter_stats["known"],
+    )
+
+    logger.info(
+        "Проверка страны source1: офлайн=%s у границы (OpenCage)=%s из них без квоты=%s",
+        boundary_stats["offline"],
+        boundary_stats["fallback"],
+        boundary_stats["quota"],
+    )
+
+    logger.info(
+        "Карточки source1: загружено=%s ошибок=%s параллельно=%s среднее время=%.2f с",
+        detail_pool.loaded,
+        detail_pool.failed,
+        len(detail_pool.pages),
+        detail_pool.total_elapsed / detail_pool.loaded if detail_pool.loaded else 0.0,
+    )
+
+    logger.info(
+        "Ожидания source1: по событиям=%s суммарно=%.1f с%s",
+        wait_stats.waits,
+        wait_stats.waited,
+        (
+            f", замерено={wait_stats.measured} экономия vs networkidle={wait_stats.saved:.1f} с"
+            f" (≈{wait_stats.saved / wait_stats.measured:.2f} с на страницу)"
+            if wait_stats.measured
+            else ""
+        ),
+    )
+
+    await page.close()
+    await detail_pool.close()
     return results
@@ -10,25 +10,62 @@
 локацией (LOCATION), датой (DTSTART) и канонической ссылкой (URL).
 
 Логика:
-1) Получить key (из .env или со страницы календаря).
-2) Скачать iCal, распарсить, отобрать будущие события.
-3) Дедуп по названию (имя + год) через known_index — чтобы НЕ открывать
+1) Получить key (из .env, из кэша фида или со страницы календаря — последнее
+   только если ключа нет или фид ответил 500/403).
+2) Скачать iCal условным запросом (ETag/Last-Modified, gzip); при 304 или
+   неизменном sha256 взять разобранные события из кэша, иначе распарсить.
+   Отобрать будущие события.
+3) Дешёвые фильтры первыми: название (имя + год) и канонический URL фида
+   (exact/A/B, служебные страницы) через known_index — чтобы НЕ открывать
    страницы уже известных трасс.
-4) Для новых: открыть карточку события, взять внешнюю регистрационную ссылку
-   (как делал прежний скрипт), геокодировать локацию (OpenCage, Португалия).
+4) Для оставшихся: взять внешнюю регистрационную ссылку с карточки события
+   (как делал прежний скрипт) и проверить её так же. Карточка читается обычным
+   HTTP-запросом; браузер открывается, только если селектор не найден в HTML.
+5) Только для действительно новых — геокодировать локацию (OpenCage, Португалия).
+Шаги 4–5 для событий, чей UID и версия (SEQUENCE/LAST-MODIFIED/содержимое) уже
+есть в хранилище событий, не выполняются — берётся сохранённый результат.
 """
 
+import asyncio
 import datetime
+import hashlib
 import logging
+import os
 import re
+import tempfile
 import time
-
-import requests
-from playwright.sync_api import BrowserContext
-
-from app.integrations.geocode import format_coordinates, geocode_location_portugal
+from collections.abc import Iterable, Iterator
+
+import httpx
+from playwright.async_api import Page
+
+from app.integrations.geocode import format_coordinates, geocode_locations_portugal
+from app.integrations.event_store import (
+    OUTCOME_OUTSIDE,
+    OUTCOME_PORTUGAL,
+    event_fingerprint,
+    event_uid,
+    is_known_uid,
+    load_event_store,
+    lookup_event,
+    prune_past_events,
+    remember_event,
+    save_event_store,
+)
+from app.integrations.feed_cache import (
+    FeedCacheEntry,
+    feed_body_path,
+    load_feed_cache,
+    save_feed_cache,
+)
+from app.integrations.geocode_cache import GeocodeCache
+from app.integrations.matching import is_service_page
 from app.integrations.url_normalize import normalize_url
-from app.utils.retry import run_with_retries
+from app.utils.browser import LazyBrowser
+from app.utils.card_fetcher import CardFetcher
+from app.utils.http import http_client
+from app.utils.rate_limit import RateLimiter
+from app.utils.retry import run_with_retries_async
 
 
 # Ключ берём из пер-событийных ссылок экспорта (export-events/<id>_0/?key=...),
@@ -37,38 +74,219 @@ from app.utils.retry import run_with_retries
 _KEY_RE = re.compile(r"export-events/\d+_0/\?key=([a-f0-9]+)")
 
 
-def _resolve_key(page_url: str, logger) -> str | None:
-    response = requests.get(page_url, params={"nocache": str(int(time.time()))}, timeout=60)
+async def _resolve_key(page_url: str, logger) -> str | None:
+    response = await http_client().get(page_url, params={"nocache": str(int(time.time()))}, timeout=60)
     response.raise_for_status()
     match = _KEY_RE.search(response.text)
     return match.group(1) if match else None
 
 
-def _parse_ical(text: str) -> list[dict[str, str]]:
-    # Развёртка свёрнутых строк (RFC 5545: продолжение начинается с пробела/таба).
-    lines: list[str] = []
-    for raw in text.split("\n"):
-        if raw[:1] in (" ", "\t") and lines:
-            lines[-1] += raw[1:]
-        else:
-            lines.append(raw.rstrip("\r"))
+_ICAL_ESCAPE_RE = re.compile(r"\\([\\;,nN])")
+_ICAL_UNESCAPED = {"n": "\n", "N": "\n", "\\": "\\", ";": ";", ",": ","}
+
+
+def _unescape(value: str) -> str:
+    # RFC 5545, 3.3.11: \\ \; \, \n \N — за один проход, чтобы «\\n» не стал переводом строки.
+    if "\\" not in value:
+        return value
+    return _ICAL_ESCAPE_RE.sub(lambda match: _ICAL_UNESCAPED[match.group(1)], value)
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    # Развёртка свёрнутых строк на лету (RFC 5545: продолжение начинается с пробела/таба).
+    pending: str | None = None
+    for raw in lines:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and pending is not None:
+            pending += raw[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = raw
+    if pending is not None:
+        yield pending
+
 
-    events: list[dict[str, str]] = []
+def _iter_ical_events(
+    lines: Iterable[str], since: datetime.date | None = None
+) -> Iterator[dict[str, str]]:
+    """Потоковый разбор VEVENT; события с DTSTART раньше since отбрасываются сразу.
+
+    Остаток прошедшего события до END:VEVENT пропускается без разбора свойств.
+    """
+    since_text = since.strftime("%Y%m%d") if since else ""
     current: dict[str, str] | None = None
-    for line in lines:
+    skipping = False
+    for line in _unfold(lines):
+        if skipping:
+            if line == "END:VEVENT":
+                skipping = False
+            continue
         if line == "BEGIN:VEVENT":
             current = {}
         elif line == "END:VEVENT":
             if current is not None:
-                events.append(current)
+                yield current
             current = None
         elif current is not None and ":" in line:
             key, value = line.split(":", 1)
             key = key.split(";")[0]
-            current[key] = value.replace("\\,", ",").replace("\\;", ";").strip()
+            # Даты iCal (YYYYMMDD...) сравниваются как строки.
+            if key == "DTSTART" and since_text and value[:8].isdigit() and value[:8] < since_text:
+                current = None
+                skipping = True
+                continue
+            current[key] = _unescape(value).strip()
+
+
+# Протухший ключ EventON отдаёт 500 (иногда 403) — только тогда ищем новый.
+_STALE_KEY_STATUSES = (403, 500)
+_CHUNK_SIZE = 64 * 1024
+
+
+def _conditional_headers(key: str, cache: FeedCacheEntry) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    # Условный запрос возможен только для того же ключа (иначе это другой URL).
+    if key == cache.key:
+        if cache.etag:
+            headers["If-None-Match"] = cache.etag
+        if cache.last_modified:
+            headers["If-Modified-Since"] = cache.last_modified
+    return headers
+
+
+async def _stream_to_file(response: httpx.Response, path: str) -> tuple[str, int]:
+    """Пишет тело ответа на диск по частям; возвращает (sha256, размер)."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as handle:
+        async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            handle.write(chunk)
+    return digest.hexdigest(), size
+
+
+def _read_events(path: str, since: datetime.date) -> list[dict[str, str]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as handle:
+        return list(_iter_ical_events(handle, since))
+
+
+async def _fetch_feed(
+    ical_url: str,
+    key: str,
+    cache: FeedCacheEntry,
+    cache_path: str,
+    stale_ok: bool,
+    logger: logging.Logger,
+) -> list[dict[str, str]] | None:
+    """Один запрос фида; None — ключ устарел (только при stale_ok)."""
+    today = datetime.date.today()
+    body_path = feed_body_path(cache_path) if cache_path else ""
+    async with http_client().stream(
+        ical_url, params={"key": key}, headers=_conditional_headers(key, cache), timeout=60
+    ) as response:
+        if stale_ok and response.status_code in _STALE_KEY_STATUSES:
+            logger.info("iCal: HTTP %s, ключ устарел — повторное получение ключа", response.status_code)
+            return None
+
+        if response.status_code == 304:
+            logger.info("iCal: фид не изменился (304), используется кэш")
+            events = cache.events or (
+                await asyncio.to_thread(_read_events, body_path, today) if body_path else []
+            )
+            cache.key = key
+            save_feed_cache(cache_path, cache)
+            return events
+
+        response.raise_for_status()
+        if body_path:
+            os.makedirs(os.path.dirname(body_path) or ".", exist_ok=True)
+            tmp_path = body_path + ".part"
+        else:
+            handle, tmp_path = tempfile.mkstemp(suffix=".ics")
+            os.close(handle)
+        try:
+            digest, size = await _stream_to_file(response, tmp_path)
+            logger.info(
+                "iCal: загружено %.1f КБ (%s, %s)",
+                size / 1024,
+                response.http_version,
+                response.headers.get("Content-Encoding") or "без сжатия",
+            )
+            if digest == cache.sha256 and cache.events:
+                logger.info("iCal: содержимое не изменилось (sha256), разбор пропущен")
+                events = cache.events
+            else:
+                # Разбор — в отдельном потоке, чтобы не держать цикл событий.
+                events = await asyncio.to_thread(_read_events, tmp_path, today)
+                if body_path:
+                    os.replace(tmp_path, body_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    save_feed_cache(
+        cache_path,
+        FeedCacheEntry(
+            key=key,
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+            sha256=digest,
+            fetched_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            events=events,
+        ),
+    )
     return events
 
 
+async def _download_feed(
+    ical_url: str,
+    key: str,
+    page_url: str,
+    cache_path: str,
+    logger: logging.Logger,
+) -> list[dict[str, str]] | None:
+    """События фида (от сегодняшней даты) с учётом кэша; None — фид получить не удалось.
+
+    Тело пишется на диск потоково, с подсчётом sha256, и разбирается построчно
+    из файла — в памяти не держится ни тело, ни список прошедших событий.
+    """
+    cache = load_feed_cache(cache_path)
+    # Ключ из кэша уже сработал (возможно, после повторного получения) — он первый,
+    # настроенный ICAL_KEY остаётся запасным.
+    keys = [k for k in dict.fromkeys((cache.key, key)) if k]
+    if cache.key and key and cache.key != key:
+        logger.info("iCal: используется рабочий ключ из кэша, настроенный ICAL_KEY — запасной")
+    if not keys:
+        resolved = await _resolve_key(page_url, logger)
+        if not resolved:
+            logger.error("Не удалось получить ключ iCal со страницы %s", page_url)
+            return None
+        logger.info("Ключ iCal получен со страницы (cache-bust)")
+        keys = [resolved]
+
+    for candidate in keys:
+        try:
+            events = await _fetch_feed(ical_url, candidate, cache, cache_path, True, logger)
+        except httpx.HTTPStatusError as exc:
+            # Любая ошибка на одном ключе — повод попробовать следующий.
+            logger.warning("iCal: HTTP %s с ключом, пробуется следующий", exc.response.status_code)
+            continue
+        if events is not None:
+            return events
+    fresh_key = await _resolve_key(page_url, logger)
+    if not fresh_key:
+        logger.error("Не удалось получить ключ iCal со страницы %s", page_url)
+        return None
+    if fresh_key in keys:
+        logger.error("iCal: ключ со страницы %s уже опробован и не работает", page_url)
+        return None
+    return await _fetch_feed(ical_url, fresh_key, cache, cache_path, False, logger)
+
+
 def _event_date(event: dict[str, str]) -> datetime.date | None:
     value = event.get("DTSTART", "")[:8]
     try:
@@ -87,45 +305,66 @@ def _clean_location(location: str) -> str:
     return loc
 
 
-def scrape_source2(
-    context: BrowserContext,
+async def scrape_source2(
+    browser: LazyBrowser,
     ical_url: str,
     ical_key: str,
     page_url: str,
+    feed_cache_path: str,
+    event_store_path: str,
     months_ahead: int,
     reg_link_selector: str,
     timeout_ms: int,
+    card_workers: int,
+    card_per_host: int,
     opencage_base_url: str,
     opencage_api_key: str,
     opencage_delay_sec: float,
+    geocode_cache: GeocodeCache | None,
+    geocode_limiter: RateLimiter | None,
+    geocode_workers: int,
     known_index,
     logger: logging.Logger,
 ) -> dict[str, tuple[str, str, str]]:
     results: dict[str, tuple[str, str, str]] = {}
 
-    key = ical_key.strip() if ical_key else ""
-    if not key:
-        key = _resolve_key(page_url, logger) or ""
-        if not key:
-            logger.error("Не удалось получить ключ iCal со страницы %s", page_url)
-            return results
-        logger.info("Ключ iCal получен со страницы (cache-bust)")
-
-    response = requests.get(
-        ical_url, params={"key": key, "nocache": str(int(time.time()))}, timeout=60
+    events = await _download_feed(
+        ical_url, ical_key.strip() if ical_key else "", page_url, feed_cache_path, logger
     )
-    response.raise_for_status()
-    events = _parse_ical(response.text)
-    logger.info("iCal: всего событий в фиде=%s", len(events))
+    if events is None:
+        return results
+    logger.info("iCal: событий с сегодняшней даты в фиде=%s", len(events))
 
     today = datetime.date.today()
     cutoff = today + datetime.timedelta(days=months_ahead * 31) if months_ahead > 0 else None
-
-    detail_page = context.new_page()
-    detail_page.set_default_timeout(timeout_ms)
+    event_store = load_event_store(event_store_path)
+
+    def _known(url: str, name: str) -> str | None:
+        """Категория отсева ('D' — служебная, иначе уровень совпадения) или None."""
+        if known_index is None or not url:
+            return None
+        if is_service_page(url, known_index.config):
+            return "D"
+        match = known_index.match(url, name or None, logger)
+        return match[0] if match is not None else None
+
+    detail_page: Page | None = None
+
+    async def _detail_page() -> Page:
+        # Браузер нужен только как запасной путь — открываем его по требованию.
+        nonlocal detail_page
+        if detail_page is None:
+            detail_page = await (await browser.context()).new_page()
+            detail_page.set_default_timeout(timeout_ms)
+        return detail_page
+
+    card_fetcher = CardFetcher(timeout_ms / 1000, card_workers, card_per_host, logger)
     try:
         future = 0
         skipped_known = 0
+        skipped_canon = 0
+        skipped_reg = 0
+        candidates: list[tuple[dict[str, str], str, str, str]] = []
         for event in events:
             event_date = _event_date(event)
             if not event_date or event_date < today:
@@ -138,55 +377,173 @@ def scrape_source2(
             canon_url = event.get("URL", "").strip()
             location = _clean_location(event.get("LOCATION", ""))
 
-            # Дедуп по названию (имя + год) — не открываем страницы известных трасс.
-            if name and known_index is not None and known_index.match_name(name):
-                skipped_known += 1
+            # Дедуп по названию (имя + год, точно или нечётко) — не открываем
+            # страницы известных трасс.
+            if name and known_index is not None:
+                if known_index.match_name(name):
+                    skipped_known += 1
+                    continue
+                fuzzy = known_index.match_name_fuzzy(name)
+                if fuzzy is not None:
+                    skipped_known += 1
+                    logger.info("Дубль по названию (F): %s ~ %s (%.2f)", name, *fuzzy)
+                    continue
+
+            # Каноническая ссылка фида: exact/A/B и служебные страницы — до
+            # геокодинга и загрузки карточки.
+            category = _known(canon_url, "")
+            if category is not None:
+                skipped_canon += 1
+                logger.debug("Отсеяно по URL фида (%s): %s", category, canon_url)
                 continue
 
             if not location:
                 logger.warning("Нет локации для события %s", name or canon_url)
                 continue
 
-            coords = geocode_location_portugal(
-                location,
-                opencage_base_url,
-                opencage_api_key,
-                opencage_delay_sec,
-                logger,
-            )
-            if not coords:
-                logger.debug("Событие вне Португалии: %s (%s)", name, location)
-                continue
+            candidates.append((event, name, canon_url, location))
+
+        # Внешняя регистрационная ссылка со страницы события (как раньше) и
+        # повторная проверка уже по ней — до геокодинга. Неизменённые события
+        # берут ссылку и итог проверки страны из хранилища.
+        store_stats = {"reused": 0, "refreshed": 0, "new": 0}
+        probed: list[tuple[str, str, str, str, str, str, bool]] = []
+        keyed = []
+        for event, name, canon_url, location in candidates:
+            uid = event_uid(event)
+            fingerprint = event_fingerprint(event)
+            record = lookup_event(event_store, uid, fingerprint) if uid else None
+            if record is not None:
+                store_stats["reused"] += 1
+            elif uid and is_known_uid(event_store, uid):
+                store_stats["refreshed"] += 1
+            else:
+                store_stats["new"] += 1
+            keyed.append((event, name, canon_url, location, uid, fingerprint, record))
+
+        # Карточки — сначала обычным HTTP (серверный HTML) параллельно.
+        to_fetch = sorted(
+            {canon_url for _, _, canon_url, _, _, _, record in keyed if record is None and canon_url}
+        )
+        cards = {
+            card.url: card for card in await card_fetcher.fetch_many(to_fetch, reg_link_selector)
+        }
 
-            # Внешняя регистрационная ссылка со страницы события (как раньше).
+        opened = 0
+        for event, name, canon_url, location, uid, fingerprint, record in keyed:
             table_url = canon_url
-            if canon_url:
+            probe_ok = False
+            if record is not None:
+                table_url = record["reg_url"] or canon_url
+            elif canon_url and cards[canon_url].found:
+                table_url = cards[canon_url].href or canon_url
+                probe_ok = True
+            elif canon_url:
+                # Селектор не найден в HTML или запрос не удался — через браузер.
+                opened += 1
                 try:
-                    run_with_retries(
-                        lambda: detail_page.goto(canon_url, wait_until="domcontentloaded"),
+                    page = await _detail_page()
+                    await run_with_retries_async(
+                        lambda: page.goto(canon_url, wait_until="domcontentloaded"),
                         logger=logger,
                         action_name="загрузка карточки события",
                     )
-                    link = detail_page.locator(reg_link_selector)
-                    if link.count() > 0:
-                        href = link.first.get_attribute("href")
+                    link = page.locator(reg_link_selector)
+                    if await link.count() > 0:
+                        href = await link.first.get_attribute("href")
                         if href:
                             table_url = href
+                    probe_ok = True
                 except Exception as exc:  # noqa: BLE001
                     logger.warning("Не удалось открыть карточку %s: %s", canon_url, exc)
 
-            lat, lon = coords
+            if table_url != canon_url:
+                category = _known(table_url, name)
+                if category is not None:
+                    skipped_reg += 1
+                    logger.debug("Отсеяно по регистрационной ссылке (%s): %s", category, table_url)
+                    continue
+
+            if record is not None:
+                if record["outcome"] == OUTCOME_PORTUGAL:
+                    normalized = normalize_url(table_url)
+                    if normalized not in results:
+                        results[normalized] = (table_url, record["coords"], name)
+                continue
+            # Неудачную загрузку карточки не запоминаем — повторим в следующий раз.
+            probed.append(
+                (name, table_url, location, uid, fingerprint, event.get("DTSTART", ""), probe_ok)
+            )
+
+        # Геокодинг пачкой: несколько запросов параллельно в пределах лимитера.
+        geocoded = await geocode_locations_portugal(
+            [location for _, _, location, *_ in probed],
+            opencage_base_url,
+            opencage_api_key,
+            opencage_delay_sec,
+            logger,
+            workers=geocode_workers,
+            cache=geocode_cache,
+            limiter=geocode_limiter,
+        )
+
+        skipped_quota = 0
+        for name, table_url, location, uid, fingerprint, dtstart, probe_ok in probed:
+            if location not in geocoded:
+                skipped_quota += 1
+                continue
+            coords = geocoded[location]
+            coord_str = format_coordinates(*coords) if coords else ""
+            if uid and probe_ok:
+                remember_event(
+                    event_store,
+                    uid,
+                    fingerprint,
+                    dtstart,
+                    table_url,
+                    coord_str,
+                    OUTCOME_PORTUGAL if coords else OUTCOME_OUTSIDE,
+                )
+            if not coords:
+                logger.debug("Событие вне Португалии: %s (%s)", name, location)
+                continue
+
             normalized = normalize_url(table_url)
             if normalized not in results:
-                results[normalized] = (table_url, format_coordinates(lat, lon), name)
+                results[normalized] = (table_url, coord_str, name)
 
+        pruned = prune_past_events(event_store, today)
+        save_event_store(event_store_path, event_store)
         logger.info(
-            "iCal: будущих=%s пропущено_известных_по_имени=%s к проверке=%s",
+            "Хранилище событий source2: повторно использовано=%s обновлено=%s новых=%s "
+            "удалено прошедших=%s",
+            store_stats["reused"],
+            store_stats["refreshed"],
+            store_stats["new"],
+            pruned,
+        )
+
+        logger.info(
+            "iCal: будущих=%s пропущено_известных_по_имени=%s по_URL_фида=%s "
+            "по_рег_ссылке=%s карточек_в_браузере=%s геокодировано_локаций=%s "
+            "без_геокодинга(квота)=%s к проверке=%s",
             future,
             skipped_known,
+            skipped_canon,
+            skipped_reg,
+            opened,
+            len(geocoded),
+            skipped_quota,
             len(results),
         )
+        logger.info(
+            "Карточки source2 по HTTP: прочитано=%s селектор не найден=%s ошибок=%s",
+            card_fetcher.fetched,
+            card_fetcher.not_found,
+            card_fetcher.failed,
+        )
     finally:
-        detail_page.close()
+        if detail_page is not None:
+            await detail_page.close()
 
     return results
@@ -0,0 +1,112 @@
+"""Ленивый запуск Chromium: браузер стартует при первом обращении к context().
+
+Один процесс Chromium (SharedBrowser) делится между источниками, у каждого
+источника — свой контекст (LazyBrowser) со своим блокировщиком ресурсов. Если
+ни одному источнику браузер не понадобился (source1 выключен, а карточки
+source2 прочитаны по HTTP), Playwright не запускается вовсе.
+
+В режиме демона браузер живёт между запусками; child_rss_mb() оценивает память
+дочерних процессов (драйвер Playwright и Chromium) для перезапуска по порогу.
+"""
+
+import asyncio
+import logging
+import os
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from app.utils.resource_blocker import ResourceBlocker
+
+
+def child_rss_mb(root_pid: int | None = None) -> float:
+    """Суммарный RSS всех потомков процесса (по /proc); 0 — если /proc недоступен."""
+    root_pid = root_pid or os.getpid()
+    parents: dict[int, int] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return 0.0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as handle:
+                # Поле comm может содержать пробелы — ppid идёт после закрывающей скобки.
+                parents[int(entry)] = int(handle.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    descendants: set[int] = set()
+    frontier = [root_pid]
+    while frontier:
+        parent = frontier.pop()
+        for pid, ppid in parents.items():
+            if ppid == parent and pid not in descendants:
+                descendants.add(pid)
+                frontier.append(pid)
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in descendants:
+        try:
+            with open(f"/proc/{pid}/statm", "r", encoding="utf-8") as handle:
+                total += int(handle.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / (1024 * 1024)
+
+
+class SharedBrowser:
+    def __init__(self, headless: bool, logger: logging.Logger) -> None:
+        self.headless = headless
+        self.logger = logger
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None
+
+    async def new_context(self, user_agent: str | None) -> BrowserContext:
+        # Источники могут запросить браузер одновременно — запускаем его один раз.
+        async with self._lock:
+            if self._browser is None:
+                self.logger.info("Запуск браузера Chromium (headless=%s)", self.headless)
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        return await self._browser.new_context(user_agent=user_agent)
+
+    async def close(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = self._browser = None
+
+
+class LazyBrowser:
+    def __init__(
+        self,
+        shared: SharedBrowser,
+        user_agent: str | None,
+        blocker: ResourceBlocker | None,
+    ) -> None:
+        self.shared = shared
+        self.user_agent = user_agent
+        self.blocker = blocker
+        self._context: BrowserContext | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._context is not None
+
+    async def context(self) -> BrowserContext:
+        if self._context is None:
+            self._context = await self.shared.new_context(self.user_agent)
+            if self.blocker is not None:
+                await self.blocker.install(self._context)
+        return self._context
+
+    async def close(self) -> None:
+        if self._context is not None:
+            await self._context.close()
+        self._context = None
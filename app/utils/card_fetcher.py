@@ -0,0 +1,84 @@
+"""Чтение ссылки из серверного HTML карточки без браузера.
+
+Карточка события EventON рендерится на сервере, поэтому нужный атрибут
+достаётся обычным GET и CSS-селектором (selectolax/lexbor). Запросы идут
+конкурентно через общий HTTP-клиент (app/utils/http.py), с ограничением
+одновременных запросов на один хост. Если селектор не найден (или запрос не удался), вызывающий код
+переходит на Playwright.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlsplit
+
+from selectolax.lexbor import LexborHTMLParser
+
+from app.utils.http import http_client
+
+
+@dataclass
+class CardResult:
+    url: str
+    found: bool = False
+    href: str | None = None
+    error: str | None = None
+
+
+def extract_attribute(
+    html: str, selector: str, base_url: str, attribute: str = "href"
+) -> tuple[bool, str | None]:
+    """(найден ли селектор, абсолютное значение атрибута первого совпадения)."""
+    node = LexborHTMLParser(html).css_first(selector)
+    if node is None:
+        return False, None
+    value = (node.attributes.get(attribute) or "").strip()
+    return True, urljoin(base_url, value) if value else None
+
+
+class CardFetcher:
+    def __init__(
+        self,
+        timeout_sec: float,
+        workers: int,
+        per_host: int,
+        logger: logging.Logger,
+    ) -> None:
+        self.timeout_sec = timeout_sec
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.logger = logger
+        self._slots = asyncio.Semaphore(self.workers)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self.fetched = 0
+        self.not_found = 0
+        self.failed = 0
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self._host_slots[host]
+
+    async def fetch(self, url: str, selector: str) -> CardResult:
+        result = CardResult(url)
+        try:
+            async with self._slots, self._host_slot(url):
+                response = await http_client().get(url, timeout=self.timeout_sec)
+            response.raise_for_status()
+            result.found, result.href = extract_attribute(
+                response.text, selector, str(response.url)
+            )
+        except Exception as exc:  # noqa: BLE001
+            result.error = str(exc)
+        if result.error is not None:
+            self.failed += 1
+        elif result.found:
+            self.fetched += 1
+        else:
+            self.not_found += 1
+        return result
+
+    async def fetch_many(self, urls: list[str], selector: str) -> list[CardResult]:
+        """Результаты в порядке входного списка."""
+        return list(await asyncio.gather(*(self.fetch(url, selector) for url in urls)))
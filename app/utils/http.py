@@ -0,0 +1,191 @@
+"""Общий асинхронный HTTP-клиент для всех небраузерных запросов (OpenCage, iCal, карточки).
+
+Один httpx.AsyncClient на цикл событий: пул соединений (по origin) с keep-alive, HTTP/2
+там, где сервер его поддерживает (пакет h2), gzip и таймауты. Идемпотентные GET
+повторяются при сетевых ошибках и ответах 502/503/504 с экспоненциальной
+паузой; 429 не повторяется здесь — его обрабатывает вызывающий код (лимитер
+OpenCage). Запросы к OpenCage идут с retries=0: каждая попытка должна пройти
+через лимитер и журнал квоты, поэтому повторяет их сам геокодер. По каждому
+хосту ведутся счётчики запросов, повторов и ошибок и гистограмма задержек
+(время до получения заголовков ответа).
+
+Клиент настраивается один раз в main_async() через configure_http(); до этого
+http_client() создаёт клиент с настройками по умолчанию. Соединения привязаны
+к циклу событий, поэтому клиент закрывается (aclose) до завершения цикла.
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+
+_RETRY_STATUSES = (502, 503, 504)
+_RETRY_EXCEPTIONS = (httpx.TransportError,)
+# Границы корзин гистограммы задержек, мс (последняя корзина — «больше»).
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    total_sec: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def histogram(self) -> str:
+        labels = [f"≤{bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return " ".join(f"{label}:{count}" for label, count in zip(labels, self.buckets) if count)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpClient:
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        timeout_sec: float = 30.0,
+        retries: int = 2,
+        backoff_sec: float = 0.5,
+        max_connections: int = 20,
+        http2: bool = True,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.retries = max(0, retries)
+        self.backoff_sec = backoff_sec
+        self.http2 = http2 and _http2_available()
+        headers = {"Accept-Encoding": "gzip"}
+        if user_agent:
+            headers["User-Agent"] = user_agent
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            headers=headers,
+            timeout=httpx.Timeout(timeout_sec, connect=min(timeout_sec, 10.0)),
+            # Соединения пулятся по origin; лимит — на весь пул.
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            follow_redirects=True,
+            transport=transport,
+        )
+        self._lock = threading.Lock()
+        self.stats: dict[str, HostStats] = {}
+
+    def _record(self, url: str, elapsed: float, retried: bool, failed: bool) -> None:
+        host = urlsplit(url).hostname or "-"
+        with self._lock:
+            stats = self.stats.setdefault(host, HostStats())
+            stats.requests += 1
+            stats.retries += int(retried)
+            stats.errors += int(failed)
+            stats.total_sec += elapsed
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+
+    async def _send(
+        self, url: str, stream: bool, retries: int | None, **kwargs: Any
+    ) -> httpx.Response:
+        retries = self.retries if retries is None else max(0, retries)
+        for attempt in range(retries + 1):
+            started = time.monotonic()
+            retried = attempt > 0
+            try:
+                request = self._client.build_request("GET", url, **kwargs)
+                response = await self._client.send(request, stream=stream)
+            except _RETRY_EXCEPTIONS:
+                self._record(url, time.monotonic() - started, retried, True)
+                if attempt == retries:
+                    raise
+            else:
+                failed = response.status_code in _RETRY_STATUSES
+                self._record(url, time.monotonic() - started, retried, failed)
+                if not failed or attempt == retries:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self.backoff_sec * (2**attempt))
+        raise AssertionError("unreachable")
+
+    async def get(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        retries: int | None = None,
+    ) -> httpx.Response:
+        """GET; retries — число повторов вместо настроенного в клиенте."""
+        kwargs: dict[str, Any] = {"params": params, "headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await self._send(url, False, retries, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """GET без чтения тела: тело читается по частям через aiter_bytes()."""
+        kwargs: dict[str, Any] = {"params": params, "headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        response = await self._send(url, True, None, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_CLIENT: HttpClient | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def configure_http(**kwargs: Any) -> HttpClient:
+    """Новый общий клиент; прежний (если был) должен быть закрыт вызывающим кодом."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = HttpClient(**kwargs)
+        return _CLIENT
+
+
+def http_client() -> HttpClient:
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = HttpClient()
+        return _CLIENT
+
+
+def log_http_stats(logger: logging.Logger, client: HttpClient) -> None:
+    for host, stats in sorted(client.stats.items()):
+        logger.info(
+            "HTTP %s: запросов=%s повторов=%s ошибок=%s среднее=%.0f мс [%s]",
+            host,
+            stats.requests,
+            stats.retries,
+            stats.errors,
+            stats.total_sec / stats.requests * 1000 if stats.requests else 0.0,
+            stats.histogram(),
+        )
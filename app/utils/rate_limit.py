@@ -0,0 +1,200 @@
+"""Ограничение частоты запросов к внешним API.
+
+- TokenBucket: потокобезопасный token bucket с поддержкой всплесков (burst) и
+  паузы по Retry-After; ожидание доступно и из потоков (acquire), и из asyncio
+  (acquire_async). Блокировка берётся только на расчёт, сон — вне её.
+- QuotaLedger: суточный журнал вызовов на диске (JSON) + остаток квоты, который
+  сообщает сам сервис (OpenCage: rate.remaining/rate.reset). Когда до лимита
+  остаётся reserve запросов, включается режим «только кэш». Файл пишется не
+  на каждый вызов, а раз в flush_every изменений и в flush() в конце запуска
+  (атомарной заменой), чтобы не блокировать цикл событий диском.
+- RateLimiter: связка bucket + ledger, которой пользуется клиент API.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+
+class QuotaExhausted(RuntimeError):
+    """Суточная квота почти исчерпана — сетевые вызовы запрещены до сброса."""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: int = 1) -> None:
+        self.rate_per_sec = rate_per_sec
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Забирает токен и возвращает 0, либо возвращает сколько ждать."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self.rate_per_sec <= 0:
+                return 0.0
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_sec)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate_per_sec
+
+    def acquire(self) -> None:
+        while (wait := self._reserve()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Запрет запросов на seconds (Retry-After / 429), накопленные токены сгорают."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._blocked_until
+
+
+# Сколько изменений журнала копится в памяти до записи на диск.
+_FLUSH_EVERY = 20
+
+
+def _today_utc() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class QuotaLedger:
+    def __init__(
+        self, path: str, daily_quota: int, reserve: int, flush_every: int = _FLUSH_EVERY
+    ) -> None:
+        self.path = path
+        self.daily_quota = daily_quota
+        self.reserve = reserve
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._data = self._load()
+        self._unsaved = 0
+
+    def _load(self) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                data = {}
+        if data.get("date") != _today_utc():
+            data = {"date": _today_utc(), "calls": 0, "remaining": None, "reset": None}
+        return data
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self._data, handle)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+    def _changed(self) -> None:
+        self._unsaved += 1
+        if self._unsaved >= self.flush_every:
+            self._save()
+
+    def flush(self) -> None:
+        """Записывает накопленные изменения на диск (конец запуска, завершение)."""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _roll_day(self) -> None:
+        if self._data.get("date") != _today_utc():
+            self._data = {"date": _today_utc(), "calls": 0, "remaining": None, "reset": None}
+
+    @property
+    def calls(self) -> int:
+        with self._lock:
+            self._roll_day()
+            return int(self._data["calls"])
+
+    @property
+    def remaining(self) -> int | None:
+        """Остаток квоты: по данным сервиса, иначе по локальному счётчику."""
+        with self._lock:
+            self._roll_day()
+            return self._remaining_locked()
+
+    def _remaining_locked(self) -> int | None:
+        server_remaining = self._data.get("remaining")
+        reset = self._data.get("reset")
+        if server_remaining is not None and (reset is None or time.time() < reset):
+            return int(server_remaining)
+        if self.daily_quota > 0:
+            return max(0, self.daily_quota - int(self._data["calls"]))
+        return None
+
+    def cache_only(self) -> bool:
+        with self._lock:
+            self._roll_day()
+            remaining = self._remaining_locked()
+            return remaining is not None and remaining <= self.reserve
+
+    def record_call(self) -> None:
+        with self._lock:
+            self._roll_day()
+            self._data["calls"] = int(self._data["calls"]) + 1
+            if self._data.get("remaining") is not None:
+                self._data["remaining"] = max(0, int(self._data["remaining"]) - 1)
+            self._changed()
+
+    def update_from_server(self, remaining: int | None, reset: float | None) -> None:
+        with self._lock:
+            self._roll_day()
+            if remaining is not None:
+                self._data["remaining"] = int(remaining)
+            if reset is not None:
+                self._data["reset"] = float(reset)
+            self._changed()
+
+
+class RateLimiter:
+    def __init__(self, bucket: TokenBucket, ledger: QuotaLedger | None = None) -> None:
+        self.bucket = bucket
+        self.ledger = ledger
+
+    def _check_quota(self) -> None:
+        if self.ledger is not None and self.ledger.cache_only():
+            raise QuotaExhausted("суточная квота почти исчерпана, режим «только кэш»")
+
+    def acquire(self) -> None:
+        self._check_quota()
+        self.bucket.acquire()
+
+    async def acquire_async(self) -> None:
+        self._check_quota()
+        await self.bucket.acquire_async()
+
+    def record_call(self) -> None:
+        if self.ledger is not None:
+            self.ledger.record_call()
+
+    def retry_after(self, seconds: float) -> None:
+        self.bucket.pause(seconds)
+
+    def update_quota(self, remaining: int | None, reset: float | None) -> None:
+        # Исчерпанная квота дальше отсекается в _check_quota (cache_only).
+        if self.ledger is not None:
+            self.ledger.update_from_server(remaining, reset)
@@ -0,0 +1,98 @@
+"""Блокировка «тяжёлых» ресурсов в навигациях Playwright.
+
+Источники читают только href, текст с координатами и <title>, поэтому картинки,
+шрифты, медиа, тайлы карт, аналитика и реклама не нужны. Обработчик ставится на
+BrowserContext (context.route) и действует на все вкладки.
+
+Порядок правил: домен из allow-списка не блокируется никогда; затем
+блокируются домены из deny-списка и ресурсы перечисленных типов.
+
+Заблокированные ответы не скачиваются, поэтому их размер неизвестен — объём
+экономии оценивается по типичному размеру ресурса каждого типа.
+"""
+
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Route
+
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "tile.openstreetmap.org",
+    "maps.googleapis.com",
+    "maps.gstatic.com",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+)
+
+# Типичный размер ответа по типу ресурса (байт) — для оценки экономии.
+_ESTIMATED_BYTES = {
+    "image": 40_000,
+    "media": 300_000,
+    "font": 35_000,
+    "stylesheet": 25_000,
+    "script": 60_000,
+}
+_DEFAULT_ESTIMATED_BYTES = 15_000
+
+
+def _host_matches(host: str, domains: tuple[str, ...]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+@dataclass
+class BlockStats:
+    allowed: int = 0
+    blocked: int = 0
+    estimated_bytes_saved: int = 0
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+
+class ResourceBlocker:
+    def __init__(
+        self,
+        resource_types: tuple[str, ...] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        deny_domains: tuple[str, ...] = DEFAULT_BLOCKED_DOMAINS,
+        allow_domains: tuple[str, ...] = (),
+    ) -> None:
+        self.resource_types = frozenset(resource_types)
+        self.deny_domains = deny_domains
+        self.allow_domains = allow_domains
+        self.stats = BlockStats()
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if host and _host_matches(host, self.allow_domains):
+            return False
+        if host and _host_matches(host, self.deny_domains):
+            return True
+        return resource_type in self.resource_types
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        if self.should_block(resource_type, request.url):
+            self.stats.blocked += 1
+            self.stats.blocked_by_type[resource_type] = (
+                self.stats.blocked_by_type.get(resource_type, 0) + 1
+            )
+            self.stats.estimated_bytes_saved += _ESTIMATED_BYTES.get(
+                resource_type, _DEFAULT_ESTIMATED_BYTES
+            )
+            await route.abort()
+            return
+        self.stats.allowed += 1
+        await route.continue_()
+
+    async def install(self, context: BrowserContext) -> None:
+        await context.route("**/*", self._handle)
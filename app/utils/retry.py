@@ -1,6 +1,7 @@
+import asyncio
 import logging
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from typing import TypeVar
 
 T = TypeVar("T")
@@ -27,3 +28,26 @@ def run_with_retries(
     if last_exc:
         raise last_exc
     raise RuntimeError("Не удалось выполнить операцию")
+
+
+async def run_with_retries_async(
+    action: Callable[[], Awaitable[T]],
+    *,
+    retries: int = 3,
+    delays: tuple[float, ...] = (2.0, 5.0, 10.0),
+    logger: logging.Logger | None = None,
+    action_name: str = "операция",
+) -> T:
+    last_exc: Exception | None = None
+    for attempt in range(retries):
+        try:
+            return await action()
+        except Exception as exc:  # noqa: BLE001
+            last_exc = exc
+            if logger:
+                logger.warning("Сбой при выполнении '%s': %s", action_name, exc)
+            if attempt < retries - 1:
+                await asyncio.sleep(delays[min(attempt, len(delays) - 1)])
+    if last_exc:
+        raise last_exc
+    raise RuntimeError("Не удалось выполнить операцию")
@@ -0,0 +1,97 @@
+"""Расписание запусков в формате cron (5 полей: минута час день месяц день_недели).
+
+Поддерживаются *, списки (1,15), диапазоны (1-5) и шаг (*/30, 8-20/2); день
+недели 0–7 (0 и 7 — воскресенье). Если ограничены и день месяца, и день недели,
+подходит любой из них — как в cron. Несколько выражений разделяются «;».
+Время считается в переданном часовом поясе (Europe/Lisbon по умолчанию).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# Сколько дней вперёд искать ближайший запуск (30 февраля и т. п. — ошибка).
+_SEARCH_DAYS = 366 * 4
+_FIELDS = (
+    ("минута", 0, 59),
+    ("час", 0, 23),
+    ("день", 1, 31),
+    ("месяц", 1, 12),
+    ("день недели", 0, 7),
+)
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, end_text = base.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = end = int(base)
+            if step_text:
+                end = high
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Неверное поле «{name}» в расписании: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Расписание должно содержать 5 полей: {expression}")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, _FIELDS)
+        )
+        # 7 — тоже воскресенье; дальше дни недели как в cron: 0 — воскресенье.
+        weekdays = frozenset(day % 7 for day in weekdays)
+        return cls(minutes, hours, days, months, weekdays, parts[2] == "*", parts[4] == "*")
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Ближайшее время запуска строго позже moment (в его часовом поясе)."""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day = (day + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError("Расписание не срабатывает ни в одну дату")
+
+
+def parse_schedule(text: str) -> tuple[CronSchedule, ...]:
+    schedules = tuple(CronSchedule.parse(part) for part in text.split(";") if part.strip())
+    if not schedules:
+        raise ValueError("Пустое расписание")
+    return schedules
+
+
+def next_run_time(schedules: tuple[CronSchedule, ...], moment: datetime) -> datetime:
+    return min(schedule.next_after(moment) for schedule in schedules)
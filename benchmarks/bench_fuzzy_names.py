@@ -0,0 +1,127 @@
+"""Уровень F: полный перебор названий против индекса триграмм FuzzyNameIndex.
+
+Запуск: python -m benchmarks.bench_fuzzy_names [--names 50000] [--queries 300]
+
+Известные названия собираются из типичных слов португальских забегов с годом;
+запросы — те же названия с перестановкой слов, опечаткой или спонсорской
+приставкой, а также заведомо новые. Результаты обоих вариантов сверяются.
+"""
+
+import argparse
+import random
+import time
+
+from app.integrations.matching import (
+    DEFAULT_NAME_FUZZY_THRESHOLD,
+    FuzzyNameIndex,
+    _name_signature,
+    normalize_event_name,
+)
+
+_KINDS = ["Corrida", "Trail", "Maratona", "Caminhada", "Grande Prémio", "Duatlo", "Sunset Run"]
+_PLACES = [
+    "Lisboa", "Porto", "Braga", "Sintra", "Cascais", "Évora", "Faro", "Aveiro", "Viseu",
+    "Guimarães", "Coimbra", "Leiria", "Peniche", "Nazaré", "Tomar", "Óbidos", "Mafra",
+]
+_THEMES = [
+    "São João", "Natal", "Fogueiras", "Castelos", "Moinhos", "Vindimas", "Serra",
+    "Rio", "Mar", "Lagoa", "Capuchos", "Amendoeiras", "Cerejas", "Santos Populares",
+]
+
+
+def _toponym(rng: random.Random) -> str:
+    # Буквенное «название местности»: числа ушли бы в точный ключ индекса.
+    consonants = "bcdfglmnprstvxz"
+    vowels = "aeiou"
+    return "".join(
+        rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(3, 4))
+    ).capitalize()
+
+
+def _synthetic_names(count: int, rng: random.Random) -> list[str]:
+    return [
+        f"{rng.choice(_KINDS)} {rng.choice(_THEMES)} de {rng.choice(_PLACES)} "
+        f"{_toponym(rng)} {2025 + idx % 2}"
+        for idx in range(count)
+    ]
+
+
+def _queries(names: list[str], count: int, rng: random.Random) -> list[str]:
+    result: list[str] = []
+    for name in rng.sample(names, count):
+        words = name.split()
+        variant = rng.randrange(4)
+        if variant == 0:
+            rng.shuffle(words)
+            result.append(" ".join(words))
+        elif variant == 1:
+            pos = rng.randrange(len(words[0]))
+            words[0] = words[0][:pos] + words[0][pos] + words[0][pos:]
+            result.append(" ".join(words))
+        elif variant == 2:
+            result.append("EDP " + name)
+        else:
+            # другой год — новая трасса (категория C)
+            result.append(name.replace(words[-1], str(int(words[-1]) + 2)))
+    return result
+
+
+def _brute_force(
+    names: list[str],
+    signatures: list[tuple[frozenset[str], frozenset[str]] | None],
+    query: str,
+    threshold: float,
+) -> tuple[str, float] | None:
+    signature = _name_signature(normalize_event_name(query))
+    if signature is None:
+        return None
+    key, grams = signature
+    best: tuple[float, int] | None = None
+    for position, other in enumerate(signatures):
+        if other is None or other[0] != key:
+            continue
+        score = 2 * len(grams & other[1]) / (len(grams) + len(other[1]))
+        if score >= threshold and (best is None or score > best[0]):
+            best = (score, position)
+    return None if best is None else (names[best[1]], best[0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_NAME_FUZZY_THRESHOLD)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    names = _synthetic_names(args.names, rng)
+    queries = _queries(names, args.queries, rng)
+    print(f"Известных названий: {len(names)}, запросов: {len(queries)}")
+
+    # Сигнатуры для перебора считаются заранее — сравнивается только поиск.
+    signatures = [_name_signature(normalize_event_name(name)) for name in names]
+    started = time.perf_counter()
+    brute = [_brute_force(names, signatures, query, args.threshold) for query in queries]
+    brute_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = FuzzyNameIndex(args.threshold)
+    for name in names:
+        index.add(name)
+    build_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    indexed = [index.lookup(query) for query in queries]
+    lookup_elapsed = time.perf_counter() - started
+
+    mismatches = sum(1 for old, new in zip(brute, indexed) if old != new)
+    matched = sum(1 for value in indexed if value is not None)
+    print(f"перебор  поиск={brute_elapsed * 1000 / len(queries):9.3f} мс/запрос")
+    print(
+        f"индекс   построение={build_elapsed:6.2f} с "
+        f"поиск={lookup_elapsed * 1000 / len(queries):9.3f} мс/запрос"
+    )
+    print(f"совпадений F: {matched}, расхождений: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Сравнение прежнего и потокового парсера iCal на синтетическом фиде.
+
+Запуск: python -m benchmarks.bench_ical_parser [--events 100000] [--future-share 0.1]
+
+Прежний парсер получает весь текст фида в памяти (как response.text),
+потоковый читает тот же фид построчно из файла (как после загрузки на диск).
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.sources.source2_portugalrunning import _iter_ical_events
+
+
+def _legacy_parse_ical(text: str) -> list[dict[str, str]]:
+    # Копия прежнего _parse_ical (до потокового разбора).
+    lines: list[str] = []
+    for raw in text.split("\n"):
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        else:
+            lines.append(raw.rstrip("\r"))
+
+    events: list[dict[str, str]] = []
+    current: dict[str, str] | None = None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            current = {}
+        elif line == "END:VEVENT":
+            if current is not None:
+                events.append(current)
+            current = None
+        elif current is not None and ":" in line:
+            key, value = line.split(":", 1)
+            key = key.split(";")[0]
+            current[key] = value.replace("\\,", ",").replace("\\;", ";").strip()
+    return events
+
+
+def _synthetic_feed(count: int, future_share: float, today: datetime.date) -> str:
+    future_every = max(1, round(1 / future_share)) if future_share > 0 else 0
+    parts = ["BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"]
+    for idx in range(count):
+        if future_every and idx % future_every == 0:
+            day = today + datetime.timedelta(days=1 + idx % 300)
+        else:
+            day = today - datetime.timedelta(days=1 + idx % 3650)
+        parts.append(
+            "BEGIN:VEVENT\r\n"
+            f"UID:{idx}@portugalrunning.com\r\n"
+            f"DTSTART:{day:%Y%m%d}T090000\r\n"
+            f"SUMMARY:Corrida Sintética {idx} {day.year}\r\n"
+            f"LOCATION:Rua da Corrida {idx}\\, Lisboa\\, Portugal Rua da Corrida {idx}\\, \r\n"
+            " Lisboa\\, Portugal\r\n"
+            "DESCRIPTION:Prova de estrada com percursos de 5 km e 10 km\\nInscrições abertas \r\n"
+            " até à véspera\\, secretariado no local\r\n"
+            f"URL:https://www.portugalrunning.com/eventos/corrida-sintetica-{idx}/\r\n"
+            "END:VEVENT\r\n"
+        )
+    parts.append("END:VCALENDAR\r\n")
+    return "".join(parts)
+
+
+def _measure(label: str, func) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<12} событий={len(result):>7} время={elapsed:6.2f} с "
+        f"пик памяти={peak / 1_048_576:7.1f} МБ"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--future-share", type=float, default=0.1)
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    text = _synthetic_feed(args.events, args.future_share, today)
+    handle, path = tempfile.mkstemp(suffix=".ics")
+    with os.fdopen(handle, "w", encoding="utf-8", newline="") as feed:
+        feed.write(text)
+    print(f"Фид: {args.events} событий, {len(text.encode()) / 1_048_576:.1f} МБ")
+
+    try:
+        # Как в scrape_source2 до изменений: весь текст в памяти, затем фильтр по дате.
+        def _legacy() -> list[dict[str, str]]:
+            events = _legacy_parse_ical(open(path, encoding="utf-8", newline="").read())
+            return [event for event in events if event.get("DTSTART", "")[:8] >= f"{today:%Y%m%d}"]
+
+        def _streaming() -> list[dict[str, str]]:
+            with open(path, encoding="utf-8", newline="") as lines:
+                return list(_iter_ical_events(lines, today))
+
+        _measure("прежний", _legacy)
+        _measure("потоковый", _streaming)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Уровень A KnownIndex: прежний линейный обход путей host против дерева сегментов.
+
+Запуск: python -m benchmarks.bench_known_index [--urls 100000] [--hosts 5] [--candidates 500]
+
+Известные URL распределены по нескольким «агрегаторам» (хронометраж, продажа
+билетов) — как в RACES, где на одном host тысячи трасс. Кандидаты — смесь
+суб-страниц, родителей, детей и новых событий; результаты обоих вариантов
+сверяются.
+"""
+
+import argparse
+import random
+import time
+
+from app.integrations.matching import (
+    _MIN_TOKEN_OVERLAP,
+    _YEAR_RE,
+    KnownIndex,
+    MatchConfig,
+    ParsedUrl,
+    _tokens,
+    parse_url,
+)
+
+
+def _legacy_is_parent_child(
+    a: tuple[str, ...], b: tuple[str, ...], config: MatchConfig
+) -> bool:
+    # Копия прежнего KnownIndex._is_parent_child (до дерева сегментов).
+    if a == b:
+        return bool(a)
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    if not shorter:
+        return False
+    if longer[: len(shorter)] != shorter:
+        return False
+    if shorter[-1].lower() in config.container_segments:
+        return False
+    extra = longer[len(shorter):]
+    if all(seg.lower() in config.subpage_segments for seg in extra):
+        return True
+    if len(extra) == 1:
+        child_years = set(_YEAR_RE.findall(extra[0]))
+        parent_years = set(_YEAR_RE.findall(shorter[-1]))
+        if child_years and not child_years <= parent_years:
+            return False
+        if len(_tokens(shorter[-1]) & _tokens(extra[0])) >= _MIN_TOKEN_OVERLAP:
+            return True
+    return False
+
+
+def _legacy_match_a(
+    by_host: dict[str, list[tuple[str, ...]]], url: str, config: MatchConfig
+) -> str | None:
+    parsed = ParsedUrl(url, config.lang_prefixes)
+    for known_segments in by_host.get(parsed.host, []):
+        if _legacy_is_parent_child(parsed.path, known_segments, config):
+            return parsed.host + "/" + "/".join(known_segments)
+    return None
+
+
+def _synthetic_urls(count: int, hosts: int, rng: random.Random) -> list[str]:
+    words = ["corrida", "trail", "meia", "maratona", "sao", "joao", "noite", "serra", "rio", "mar"]
+    urls: list[str] = []
+    for idx in range(count):
+        host = f"timing{idx % hosts}.pt"
+        slug = f"{rng.choice(words)}-{rng.choice(words)}-{idx}-{2025 + idx % 2}"
+        tail = rng.choice(["", "/inscritos", "/resultados", f"/{slug}-10k"])
+        urls.append(f"https://{host}/pt/eventos/{slug}{tail}")
+    return urls
+
+
+def _candidates(urls: list[str], count: int, rng: random.Random) -> list[str]:
+    result: list[str] = []
+    for url in rng.sample(urls, count):
+        base = url.replace("/pt/", "/", 1)
+        variant = rng.randrange(4)
+        if variant == 0:
+            result.append(base + "/classificacao")
+        elif variant == 1:
+            result.append(base.rsplit("/", 1)[0] + "/nova-prova-2026")
+        elif variant == 2:
+            result.append(base + "/info")
+        else:
+            result.append(base.rsplit("/", 1)[0])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=100_000)
+    parser.add_argument("--hosts", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    config = MatchConfig(cross_platform_match=False, name_match=False)
+    urls = _synthetic_urls(args.urls, args.hosts, rng)
+    candidates = _candidates(urls, args.candidates, rng)
+    print(f"Известных URL: {len(urls)} на {args.hosts} host, кандидатов: {len(candidates)}")
+
+    started = time.perf_counter()
+    by_host: dict[str, list[tuple[str, ...]]] = {}
+    for raw in urls:
+        parsed = ParsedUrl(raw, config.lang_prefixes)
+        by_host.setdefault(parsed.host, []).append(parsed.path)
+    legacy_build = time.perf_counter() - started
+    started = time.perf_counter()
+    legacy = [_legacy_match_a(by_host, url, config) for url in candidates]
+    legacy_match = time.perf_counter() - started
+
+    parse_url.cache_clear()
+    started = time.perf_counter()
+    index = KnownIndex(urls, config)
+    trie_build = time.perf_counter() - started
+    started = time.perf_counter()
+    trie = []
+    for url in candidates:
+        result = index.match(url)
+        trie.append(result[1] if result is not None and result[0] == "A" else None)
+    trie_match = time.perf_counter() - started
+
+    mismatches = sum(1 for old, new in zip(legacy, trie) if old != new)
+    matched = sum(1 for value in trie if value is not None)
+    print(
+        f"прежний  построение={legacy_build:6.2f} с "
+        f"поиск={legacy_match * 1000 / len(candidates):9.3f} мс/URL"
+    )
+    print(
+        f"дерево   построение={trie_build:6.2f} с "
+        f"поиск={trie_match * 1000 / len(candidates):9.3f} мс/URL"
+    )
+    print(f"совпадений A: {matched}, расхождений: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from app.utils.card_fetcher import extract_attribute
+
+
+HTML = """
+<div class="eventon_list_event">
+  <a class="evcal_evdata_row" href="/go/inscricoes">Inscrições</a>
+  <a class="evcal_evdata_row" href="https://second.pt">Segunda</a>
+  <span class="empty-link"></span>
+</div>
+"""
+
+
+def test_extract_attribute_returns_first_absolute_href() -> None:
+    assert extract_attribute(HTML, "a.evcal_evdata_row", "https://www.portugalrunning.com/e/1/") == (
+        True,
+        "https://www.portugalrunning.com/go/inscricoes",
+    )
+
+
+def test_extract_attribute_reports_missing_selector_and_empty_value() -> None:
+    assert extract_attribute(HTML, "a.missing", "https://x.pt/") == (False, None)
+    assert extract_attribute(HTML, "span.empty-link", "https://x.pt/") == (True, None)
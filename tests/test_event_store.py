@@ -0,0 +1,46 @@
+import datetime
+
+from app.integrations.event_store import (
+    OUTCOME_PORTUGAL,
+    event_fingerprint,
+    event_uid,
+    is_known_uid,
+    load_event_store,
+    lookup_event,
+    prune_past_events,
+    remember_event,
+    save_event_store,
+)
+
+
+EVENT = {
+    "UID": "123@portugalrunning.com",
+    "SUMMARY": "Trail A 2099",
+    "DTSTART": "20990101",
+    "DTSTAMP": "20260101T000000Z",
+    "URL": "https://www.portugalrunning.com/eventos/trail-a-2099/",
+}
+
+
+def test_fingerprint_ignores_dtstamp_but_tracks_versions() -> None:
+    base = event_fingerprint(EVENT)
+    assert event_fingerprint({**EVENT, "DTSTAMP": "20261017T120000Z"}) == base
+    assert event_fingerprint({**EVENT, "SEQUENCE": "1"}) != base
+    assert event_fingerprint({**EVENT, "LOCATION": "Porto"}) != base
+    assert event_uid({"URL": "https://x.pt/e"}) == "https://x.pt/e"
+
+
+def test_event_store_roundtrip_and_prune(tmp_path) -> None:
+    path = str(tmp_path / "events.json")
+    store = load_event_store(path)
+    uid, fingerprint = event_uid(EVENT), event_fingerprint(EVENT)
+    remember_event(store, uid, fingerprint, "20990101", "https://a.pt", "38.7, -9.1", OUTCOME_PORTUGAL)
+    remember_event(store, "old", "x", "20200101", "", "", OUTCOME_PORTUGAL)
+    save_event_store(path, store)
+
+    loaded = load_event_store(path)
+    assert lookup_event(loaded, uid, fingerprint)["reg_url"] == "https://a.pt"
+    assert lookup_event(loaded, uid, "other") is None
+    assert is_known_uid(loaded, uid)
+    assert prune_past_events(loaded, datetime.date(2026, 10, 17)) == 1
+    assert not is_known_uid(loaded, "old")
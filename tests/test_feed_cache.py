@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.integrations.feed_cache import FeedCacheEntry, load_feed_cache, save_feed_cache
+from app.sources import source2_portugalrunning as source2
+
+
+FEED = (
+    b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Trail A 2099\r\n"
+    b"DTSTART:20990101\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+)
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, content: bytes = b"", headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(str(self.status_code), request=None, response=self)
+
+    http_version = "HTTP/1.1"
+
+    async def aiter_bytes(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+
+class _FakeClient:
+    def __init__(self, responses: list[_FakeResponse]) -> None:
+        self.responses = responses
+        self.calls: list[dict] = []
+
+    @asynccontextmanager
+    async def stream(self, url, params=None, headers=None, timeout=None):
+        self.calls.append({"key": params["key"], "headers": headers or {}})
+        yield self.responses.pop(0)
+
+
+def test_feed_cache_roundtrip(tmp_path) -> None:
+    path = str(tmp_path / "feed.json")
+    assert load_feed_cache(path) == FeedCacheEntry()
+    entry = FeedCacheEntry(key="abc", etag='"v1"', sha256="00", events=[{"SUMMARY": "X"}])
+    save_feed_cache(path, entry)
+    assert load_feed_cache(path) == entry
+
+
+def test_download_feed_revalidates_and_reresolves_stale_key(monkeypatch, tmp_path) -> None:
+    path = str(tmp_path / "feed.json")
+    client = _FakeClient(
+        [
+            _FakeResponse(200, FEED, {"ETag": '"v1"'}),
+            _FakeResponse(304),
+            _FakeResponse(500),
+            _FakeResponse(200, FEED, {"ETag": '"v1"'}),
+        ]
+    )
+    calls = client.calls
+    monkeypatch.setattr(source2, "http_client", lambda: client)
+
+    async def _resolve_key(page_url, logger):
+        return "fresh"
+
+    monkeypatch.setattr(source2, "_resolve_key", _resolve_key)
+    logger = logging.getLogger("test")
+
+    def _download(key: str):
+        return asyncio.run(source2._download_feed("https://feed", key, "https://page", path, logger))
+
+    first = _download("old")
+    assert first == [{"SUMMARY": "Trail A 2099", "DTSTART": "20990101"}]
+    assert (tmp_path / "feed.ics").read_bytes() == FEED
+
+    # Второй запуск: ключ и ETag из кэша, 304 — события из кэша.
+    assert _download("") == first
+    assert calls[1] == {"key": "old", "headers": {"If-None-Match": '"v1"'}}
+
+    # 500 — ключ получен заново, хэш тела не изменился.
+    assert _download("") == first
+    assert calls[3]["key"] == "fresh"
+    assert load_feed_cache(path).key == "fresh"
+
+
+def test_download_feed_prefers_cached_working_key(monkeypatch, tmp_path) -> None:
+    path = str(tmp_path / "feed.json")
+    save_feed_cache(path, FeedCacheEntry(key="fresh"))
+    client = _FakeClient(
+        [
+            _FakeResponse(200, FEED),
+            _FakeResponse(500),
+            _FakeResponse(200, FEED),
+        ]
+    )
+    monkeypatch.setattr(source2, "http_client", lambda: client)
+
+    async def _resolve_key(page_url, logger):
+        raise AssertionError("ключ не должен запрашиваться со страницы")
+
+    monkeypatch.setattr(source2, "_resolve_key", _resolve_key)
+    logger = logging.getLogger("test")
+
+    def _download():
+        return asyncio.run(source2._download_feed("https://feed", "old", "https://page", path, logger))
+
+    # Настроенный ключ «old» устарел, рабочий «fresh» из кэша идёт первым.
+    assert _download() is not None
+    assert [call["key"] for call in client.calls] == ["fresh"]
+
+    # Ключ из кэша перестал работать — запасной вариант: настроенный ключ.
+    assert _download() is not None
+    assert [call["key"] for call in client.calls] == ["fresh", "fresh", "old"]
+    assert load_feed_cache(path).key == "old"
+
+
+def test_download_feed_falls_back_on_any_http_error_and_skips_tried_key(
+    monkeypatch, tmp_path
+) -> None:
+    path = str(tmp_path / "feed.json")
+    save_feed_cache(path, FeedCacheEntry(key="fresh"))
+    client = _FakeClient(
+        [_FakeResponse(404), _FakeResponse(200, FEED), _FakeResponse(410), _FakeResponse(403)]
+    )
+    monkeypatch.setattr(source2, "http_client", lambda: client)
+
+    async def _resolve_key(page_url, logger):
+        return "old"
+
+    monkeypatch.setattr(source2, "_resolve_key", _resolve_key)
+    logger = logging.getLogger("test")
+
+    def _download():
+        return asyncio.run(source2._download_feed("https://feed", "old", "https://page", path, logger))
+
+    # 404 на ключе из кэша — не обрыв источника, а переход к настроенному ключу.
+    assert _download() is not None
+    assert [call["key"] for call in client.calls] == ["fresh", "old"]
+
+    # Оба ключа не работают, со страницы пришёл уже опробованный — повторно не запрашивается.
+    save_feed_cache(path, FeedCacheEntry(key="fresh"))
+    assert _download() is None
+    assert [call["key"] for call in client.calls] == ["fresh", "old", "fresh", "old"]
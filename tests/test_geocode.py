@@ -13,3 +13,130 @@ def test_parse_coordinates_with_space() -> None:
 
 def test_format_coordinates() -> None:
     assert format_coordinates(38.7223456, -9.1393123) == "38.722346, -9.139312"
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, payload: dict | None = None, headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self) -> dict:
+        return self._payload
+
+
+def test_reverse_geocode_retries_after_429_and_reads_rate(monkeypatch, tmp_path) -> None:
+    import asyncio
+    import logging
+    import time
+
+    from app.integrations import geocode
+    from app.utils.rate_limit import QuotaLedger, RateLimiter, TokenBucket
+
+    responses = [
+        _FakeResponse(429, headers={"Retry-After": "0"}),
+        _FakeResponse(
+            200,
+            {
+                "results": [{"components": {"country_code": "pt"}}],
+                "rate": {"limit": 2500, "remaining": 1200, "reset": time.time() + 3600},
+            },
+        ),
+    ]
+
+    class _FakeClient:
+        async def get(self, *args, **kwargs) -> _FakeResponse:
+            return responses.pop(0)
+
+    fake_client = _FakeClient()
+    monkeypatch.setattr(geocode, "http_client", lambda: fake_client)
+    ledger = QuotaLedger(str(tmp_path / "ledger.json"), daily_quota=2500, reserve=10)
+    limiter = RateLimiter(TokenBucket(1000, 1), ledger)
+
+    in_pt = asyncio.run(
+        geocode.reverse_geocode_portugal(
+            38.7, -9.1, "https://example.test", "key", 0.0, logging.getLogger("test"), limiter=limiter
+        )
+    )
+
+    assert in_pt
+    assert ledger.calls == 2
+    assert ledger.remaining == 1200
+
+
+def test_forward_geocode_retries_not_found_after_negative_ttl(monkeypatch, tmp_path) -> None:
+    import asyncio
+    import logging
+    import time
+
+    from app.integrations import geocode
+    from app.integrations.geocode_cache import GeocodeCache
+
+    responses = [
+        _FakeResponse(200, {"results": []}),
+        _FakeResponse(
+            200,
+            {"results": [{"geometry": {"lat": 38.8, "lng": -9.38}, "components": {"country_code": "pt"}}]},
+        ),
+    ]
+
+    class _FakeClient:
+        async def get(self, *args, **kwargs) -> _FakeResponse:
+            return responses.pop(0)
+
+    fake_client = _FakeClient()
+    monkeypatch.setattr(geocode, "http_client", lambda: fake_client)
+    cache = GeocodeCache(str(tmp_path / "geo.sqlite3"), ttl_days=180, negative_ttl_days=0, max_entries=100)
+
+    def _geocode():
+        return asyncio.run(
+            geocode.geocode_location_portugal(
+                "Sintra", "https://example.test", "key", 0.0, logging.getLogger("test"), cache=cache
+            )
+        )
+
+    assert _geocode() is None
+    time.sleep(0.01)
+    # «Не найдено» истекло по negative TTL — OpenCage спрашивается снова.
+    assert _geocode() == (38.8, -9.38)
+    assert responses == []
+
+
+def test_geocode_retries_gateway_errors_through_limiter_and_ledger(monkeypatch, tmp_path) -> None:
+    import asyncio
+    import logging
+
+    from app.integrations import geocode
+    from app.utils.rate_limit import QuotaLedger, RateLimiter, TokenBucket
+
+    responses = [
+        _FakeResponse(503),
+        _FakeResponse(200, {"results": [{"components": {"country_code": "es"}}]}),
+    ]
+    retries_seen = []
+
+    class _FakeClient:
+        async def get(self, *args, retries=None, **kwargs) -> _FakeResponse:
+            retries_seen.append(retries)
+            return responses.pop(0)
+
+    fake_client = _FakeClient()
+    monkeypatch.setattr(geocode, "http_client", lambda: fake_client)
+    ledger = QuotaLedger(str(tmp_path / "ledger.json"), daily_quota=2500, reserve=10)
+    limiter = RateLimiter(TokenBucket(1000, 1), ledger)
+    monkeypatch.setattr(limiter, "retry_after", lambda seconds: None)
+
+    in_pt = asyncio.run(
+        geocode.reverse_geocode_portugal(
+            42.0, -8.6, "https://example.test", "key", 0.0, logging.getLogger("test"), limiter=limiter
+        )
+    )
+
+    assert not in_pt
+    # Повтор после 503 — через лимитер геокодера, и оба запроса учтены в журнале.
+    assert retries_seen == [0, 0]
+    assert ledger.calls == 2
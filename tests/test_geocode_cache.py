@@ -0,0 +1,45 @@
+import time
+
+from app.integrations.geocode_cache import GeocodeCache
+
+
+def _cache(tmp_path, **kwargs) -> GeocodeCache:
+    params = {"ttl_days": 180, "negative_ttl_days": 14, "max_entries": 100}
+    params.update(kwargs)
+    return GeocodeCache(str(tmp_path / "geo.sqlite3"), **params)
+
+
+def test_geocode_cache_roundtrip_persists(tmp_path) -> None:
+    cache = _cache(tmp_path)
+    key = cache.forward_key("  Lisboa,   Portugal ")
+    cache.put(key, True, 38.72, -9.14, True)
+    cache.close()
+
+    reopened = _cache(tmp_path)
+    stored = reopened.get(reopened.forward_key("lisboa, portugal"))
+    assert stored is not None and stored.in_pt and stored.lat == 38.72
+    assert reopened.stats.hits == 1
+
+
+def test_geocode_cache_reverse_key_rounded(tmp_path) -> None:
+    cache = _cache(tmp_path)
+    assert cache.reverse_key(38.722312, -9.139301) == cache.reverse_key(38.72249, -9.13911)
+
+
+def test_geocode_cache_negative_ttl_expires(tmp_path) -> None:
+    cache = _cache(tmp_path, negative_ttl_days=0)
+    cache.put("fwd:nowhere", False, 0.0, 0.0, False)
+    time.sleep(0.01)
+    assert cache.get("fwd:nowhere") is None
+    assert cache.stats.expired == 1
+
+
+def test_geocode_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = _cache(tmp_path, max_entries=2)
+    for idx in range(3):
+        cache.put(f"fwd:{idx}", True, 1.0, 1.0, True)
+        time.sleep(0.01)
+    cache.get("fwd:0")
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get("fwd:1") is None
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+
+from app.utils.http import HttpClient
+
+
+def test_get_retries_gateway_errors_and_records_host_stats() -> None:
+    statuses = [503, 502, 200]
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(statuses.pop(0), text="ok")
+
+    client = HttpClient(retries=2, backoff_sec=0, transport=httpx.MockTransport(_handler))
+    response = asyncio.run(client.get("https://feed.example.pt/export", params={"key": "k"}))
+
+    assert response.status_code == 200
+    stats = client.stats["feed.example.pt"]
+    assert (stats.requests, stats.retries, stats.errors) == (3, 2, 2)
+    assert sum(stats.buckets) == 3
+
+
+def test_get_does_not_retry_rate_limit() -> None:
+    calls = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(429)
+
+    client = HttpClient(retries=2, backoff_sec=0, transport=httpx.MockTransport(_handler))
+
+    async def _stream() -> int:
+        async with client.stream("https://api.example.com/json") as response:
+            return response.status_code
+
+    assert asyncio.run(_stream()) == 429
+    assert len(calls) == 1
+
+
+def test_get_retries_override_disables_client_retries() -> None:
+    calls = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = HttpClient(retries=2, backoff_sec=0, transport=httpx.MockTransport(_handler))
+    response = asyncio.run(client.get("https://api.opencagedata.com/json", retries=0))
+
+    assert response.status_code == 503
+    assert len(calls) == 1
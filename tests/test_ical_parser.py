@@ -0,0 +1,36 @@
+import datetime
+
+from app.sources.source2_portugalrunning import _iter_ical_events
+
+
+FEED = [
+    "BEGIN:VCALENDAR\r\n",
+    "BEGIN:VEVENT\r\n",
+    "SUMMARY:Corrida Antiga 2020\r\n",
+    "DTSTART:20200105T090000\r\n",
+    "LOCATION:Porto\r\n",
+    "END:VEVENT\r\n",
+    "BEGIN:VEVENT\r\n",
+    "SUMMARY:Trail da Serra\\, edição 2099\r\n",
+    "DTSTART;VALUE=DATE:20990301\r\n",
+    "DESCRIPTION:Linha 1\\nLinha 2 com barra \\\\n literal\\; fim\r\n",
+    "LOCATION:Rua Muito Comprida\\, Vi\r\n",
+    " la Real\\, Portugal\r\n",
+    "END:VEVENT\r\n",
+    "END:VCALENDAR\r\n",
+]
+
+
+def test_iter_ical_events_unfolds_and_unescapes() -> None:
+    events = list(_iter_ical_events(FEED))
+    assert len(events) == 2
+    event = events[1]
+    assert event["SUMMARY"] == "Trail da Serra, edição 2099"
+    assert event["DTSTART"] == "20990301"
+    assert event["DESCRIPTION"] == "Linha 1\nLinha 2 com barra \\n literal; fim"
+    assert event["LOCATION"] == "Rua Muito Comprida, Vila Real, Portugal"
+
+
+def test_iter_ical_events_drops_past_events_early() -> None:
+    events = list(_iter_ical_events(FEED, since=datetime.date(2026, 1, 1)))
+    assert [event["SUMMARY"] for event in events] == ["Trail da Serra, edição 2099"]
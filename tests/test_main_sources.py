@@ -0,0 +1,33 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from app.main import _run_sources
+from app.utils.browser import SharedBrowser
+
+
+def test_failing_source_does_not_affect_other_source(caplog) -> None:
+    logger = logging.getLogger("test")
+    good_results = {"//a.pt/corrida-2027": ("https://a.pt/corrida-2027", "38.7, -9.1", "Corrida 2027")}
+    finished: list[str] = []
+
+    async def _good(browser):
+        await asyncio.sleep(0.02)  # завершается позже упавшего источника
+        finished.append("good")
+        return good_results
+
+    async def _bad(browser):
+        raise RuntimeError("страница источника недоступна")
+
+    config = SimpleNamespace(block_resources=False, user_agent=None)
+    with caplog.at_level(logging.ERROR, logger="test"):
+        source_results, source_errors = asyncio.run(
+            _run_sources(
+                {"bad": _bad, "good": _good}, SharedBrowser(True, logger), config, logger
+            )
+        )
+
+    assert finished == ["good"]
+    assert source_results == {"good": good_results}
+    assert source_errors == ["bad"]
+    assert "Ошибка источника bad" in caplog.text
@@ -1,8 +1,11 @@
+import logging
+
 from app.integrations.matching import (
     KnownIndex,
     MatchConfig,
     is_service_page,
     normalize_event_name,
+    parse_url,
 )
 
 
@@ -89,6 +92,21 @@ def test_child_same_year_in_parent_matched() -> None:
     assert result is not None and result[0] == "A"
 
 
+def test_earliest_known_path_wins() -> None:
+    # несколько известных путей подходят — как и раньше, возвращается первый в RACES
+    idx = KnownIndex(
+        [
+            "https://www.portimer.pt/eventos/hygoes_2026/resultados",
+            "https://www.portimer.pt/eventos/hygoes_2026",
+            "https://www.portimer.pt/eventos/hygoes_2026/inscritos",
+        ]
+    )
+    assert idx.match("https://www.portimer.pt/pt/eventos/hygoes_2026") == (
+        "A",
+        "portimer.pt/eventos/hygoes_2026/resultados",
+    )
+
+
 # --- Категория C: новый год — это НОВАЯ трасса (не должно схлопываться) ---
 
 def test_different_year_is_new() -> None:
@@ -151,6 +169,39 @@ def test_b_disabled_by_config() -> None:
     assert idx.match("https://nativewarriors.pt/evento/corrida-das-fogueiras-2026") is None
 
 
+def test_b_token_match_with_article_and_subpage() -> None:
+    idx = KnownIndex(["https://waitastart.com/trail-serra-2026"])
+    result = idx.match("https://nativewarriors.pt/evento/trail-da-serra-2026-inscricoes")
+    assert result is not None and result[0] == "B"
+
+
+def test_b_token_match_extra_id_token() -> None:
+    idx = KnownIndex(["https://bol.pt/Comprar/Bilhetes/corrida_atlantica_2026-troia_grandola"])
+    result = idx.match("https://lap2go.com/pt/event/172727-corrida-atlantica-2026-troia-grandola")
+    assert result is not None and result[0] == "B"
+
+
+def test_b_token_different_event_same_year_not_matched() -> None:
+    # общие «trilhos» и год — ещё не то же событие (жаккар 0.5)
+    idx = KnownIndex(["https://waitastart.com/trilhos-da-cola-2026"])
+    assert idx.match("https://nativewarriors.pt/evento/trilhos-do-inha-2026") is None
+
+
+def test_b_token_year_guard() -> None:
+    idx = KnownIndex(["https://waitastart.com/trail-da-serra-2025-2026"])
+    assert idx.match("https://nativewarriors.pt/evento/trail-serra-2026") is None
+
+
+def test_b_decision_logged_with_score(caplog) -> None:
+    # полное вхождение без достаточного жаккара — отклоняется, решение в логе
+    logger = logging.getLogger("test_matching_b")
+    idx = KnownIndex(["https://waitastart.com/trail-serra-estrela-2026"])
+    with caplog.at_level(logging.INFO, logger="test_matching_b"):
+        result = idx.match("https://nativewarriors.pt/evento/trail-serra-2026", logger=logger)
+    assert result is None
+    assert "жаккар=0.75 вхождение=1.00 → отклонено" in caplog.text
+
+
 # --- Категория N: совпадение по названию + год ---
 
 def test_name_normalization_strips_accents_keeps_year() -> None:
@@ -186,3 +237,77 @@ def test_name_match_disabled() -> None:
     cfg = MatchConfig(name_match=False)
     idx = KnownIndex([], MatchConfig(name_match=False), names=["Mâmoa River Trail 2025"])
     assert idx.match("https://x.pt/e", name="Mâmoa River Trail 2025") is None
+
+
+# --- Уровень F: нечёткое совпадение названия ---
+
+def test_fuzzy_name_reordered_without_articles() -> None:
+    idx = KnownIndex([], names=["Trail Serra da Estrela 2026"])
+    result = idx.match("https://x.pt/e", name="Serra Estrela Trail 2026")
+    assert result is not None and result[0] == "F"
+
+
+def test_fuzzy_name_typo_returns_score() -> None:
+    idx = KnownIndex([], names=["Maratona de Lisboa 2026"])
+    result = idx.match_name_fuzzy("Maratonna de Lisboa 2026")
+    assert result is not None
+    assert result[0] == "Maratona de Lisboa 2026"
+    assert 0.85 <= result[1] < 1.0
+
+
+def test_fuzzy_name_different_year_not_matched() -> None:
+    idx = KnownIndex([], names=["Trail Serra da Estrela 2025"])
+    assert idx.match_name_fuzzy("Serra da Estrela Trail 2026") is None
+
+
+def test_fuzzy_name_format_word_must_match() -> None:
+    # «Meia Maratona» и «Maratona» — разные трассы
+    idx = KnownIndex([], names=["Maratona de Lisboa 2026"])
+    assert idx.match_name_fuzzy("Meia Maratona de Lisboa 2026") is None
+
+
+def test_fuzzy_name_different_event_not_matched() -> None:
+    idx = KnownIndex([], names=["Corrida de Natal de Braga 2026"])
+    assert idx.match_name_fuzzy("Corrida de Natal de Guimarães 2026") is None
+
+
+def test_fuzzy_name_disabled() -> None:
+    idx = KnownIndex([], MatchConfig(name_fuzzy_match=False), names=["Maratona de Lisboa 2026"])
+    assert idx.match("https://x.pt/e", name="Maratonna de Lisboa 2026") is None
+
+
+# --- Разбор URL и пакетное сопоставление ---
+
+def test_parse_url_strips_lang_and_is_memoized() -> None:
+    parsed = parse_url("https://www.runporto.com/pt/eventos/Corrida_S_Joao/?utm_source=x")
+    assert parsed.normalized == "//runporto.com/pt/eventos/Corrida_S_Joao"
+    assert parsed.host == "runporto.com"
+    assert parsed.path == ("eventos", "Corrida_S_Joao")
+    assert parsed.slug == "corrida-s-joao"
+    assert parse_url("https://www.runporto.com/pt/eventos/Corrida_S_Joao/?utm_source=x") is parsed
+
+
+def test_match_many_counts_categories() -> None:
+    idx = KnownIndex(
+        ["https://acorrer.pt/eventos/cabrum-360", "https://waitastart.com/corrida-das-fogueiras-2026"],
+        names=["Mâmoa River Trail 2025"],
+    )
+    report = idx.match_many(
+        [
+            ("https://dourorun.pt/", None),
+            ("https://acorrer.pt/eventos/cabrum-360", None),
+            ("https://acorrer.pt/eventos/cabrum-360/inscritos", None),
+            ("https://nativewarriors.pt/evento/corrida-das-fogueiras-2026", None),
+            ("https://x.pt/e", "Mamoa River Trail 2025"),
+            ("https://x.pt/nova-prova-2026", "Nova Prova 2026"),
+        ]
+    )
+    assert [result[0] if result else None for result in report.results] == [
+        "D",
+        "exact",
+        "A",
+        "B",
+        "N",
+        None,
+    ]
+    assert report.counts == {"D": 1, "exact": 1, "A": 1, "B": 1, "N": 1, "F": 0, "new": 1}
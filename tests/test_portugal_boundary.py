@@ -0,0 +1,42 @@
+from app.integrations.portugal_boundary import (
+    INSIDE,
+    NEAR_BORDER,
+    OUTSIDE,
+    PortugalBoundary,
+    portugal_boundary,
+)
+
+
+BOUNDARY = PortugalBoundary(15)
+
+
+def test_mainland_cities_inside() -> None:
+    assert BOUNDARY.classify(38.7223, -9.1393) == INSIDE  # Lisboa
+    assert BOUNDARY.classify(41.1496, -8.6109) == INSIDE  # Porto
+    assert BOUNDARY.classify(37.0194, -7.9304) == INSIDE  # Faro
+
+
+def test_islands_inside() -> None:
+    assert BOUNDARY.classify(37.7412, -25.6756) == INSIDE  # Ponta Delgada
+    assert BOUNDARY.classify(32.6669, -16.9241) == INSIDE  # Funchal
+
+
+def test_spain_and_canaries_outside() -> None:
+    assert BOUNDARY.classify(40.4168, -3.7038) == OUTSIDE  # Madrid
+    assert BOUNDARY.classify(42.2406, -8.7207) == OUTSIDE  # Vigo
+    assert BOUNDARY.classify(28.2916, -16.6291) == OUTSIDE  # Tenerife
+
+
+def test_points_near_land_border_need_fallback() -> None:
+    assert BOUNDARY.classify(38.8808, -7.1631) == NEAR_BORDER  # Elvas
+    assert BOUNDARY.classify(38.8794, -6.9707) == NEAR_BORDER  # Badajoz
+
+
+def test_zero_fallback_distance_never_near_border() -> None:
+    boundary = PortugalBoundary(0)
+    assert boundary.classify(38.8808, -7.1631) in (INSIDE, OUTSIDE)
+
+
+def test_portugal_boundary_is_built_once_per_buffer() -> None:
+    assert portugal_boundary(15) is portugal_boundary(15)
+    assert portugal_boundary(15) is not portugal_boundary(5)
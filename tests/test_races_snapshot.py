@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+
+from app.integrations.matching import KnownIndex, MatchConfig
+from app.integrations.races_snapshot import (
+    RacesSnapshot,
+    load_snapshot,
+    save_snapshot,
+    snapshot_age_hours,
+    snapshot_fingerprint,
+)
+
+
+def test_snapshot_roundtrip_and_fingerprint_guard(tmp_path) -> None:
+    path = str(tmp_path / "races.pickle")
+    config = MatchConfig()
+    fingerprint = snapshot_fingerprint("sheet", "RACES", "WEBSITE", ("RACE NAME",), config)
+    index = KnownIndex(["https://runporto.com/eventos/trail-2027"], config, names=["Trail 2027"])
+    saved_at = (datetime.now(timezone.utc) - timedelta(hours=5)).isoformat()
+    save_snapshot(path, RacesSnapshot(fingerprint, "2026-10-01T10:00:00Z", saved_at, index))
+
+    snapshot = load_snapshot(path, fingerprint)
+    assert snapshot is not None
+    assert snapshot.index.match("https://runporto.com/pt/eventos/trail-2027") is not None
+    assert 4.9 < snapshot_age_hours(snapshot) < 5.1
+
+    # Другие настройки сопоставления — снимок недействителен.
+    other = snapshot_fingerprint(
+        "sheet", "RACES", "WEBSITE", ("RACE NAME",), MatchConfig(cross_platform_match=False)
+    )
+    assert load_snapshot(path, other) is None
+    assert load_snapshot(str(tmp_path / "missing.pickle"), fingerprint) is None
@@ -0,0 +1,62 @@
+import time
+
+from app.utils.rate_limit import QuotaExhausted, QuotaLedger, RateLimiter, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_throttles() -> None:
+    bucket = TokenBucket(rate_per_sec=20, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.02
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.04
+
+
+def test_token_bucket_pause_blocks() -> None:
+    bucket = TokenBucket(rate_per_sec=1000, capacity=5)
+    bucket.pause(0.05)
+    started = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.04
+
+
+def test_quota_ledger_persists_and_switches_to_cache_only(tmp_path) -> None:
+    path = str(tmp_path / "ledger.json")
+    ledger = QuotaLedger(path, daily_quota=3, reserve=1)
+    ledger.record_call()
+    assert not ledger.cache_only()
+    ledger.record_call()
+    ledger.flush()
+
+    reloaded = QuotaLedger(path, daily_quota=3, reserve=1)
+    assert reloaded.calls == 2
+    assert reloaded.cache_only()
+
+
+def test_quota_ledger_batches_writes(tmp_path) -> None:
+    path = tmp_path / "ledger.json"
+    ledger = QuotaLedger(str(path), daily_quota=100, reserve=1, flush_every=3)
+    ledger.record_call()
+    ledger.record_call()
+    assert not path.exists()
+    ledger.record_call()
+    assert QuotaLedger(str(path), daily_quota=100, reserve=1).calls == 3
+
+    ledger.record_call()
+    ledger.flush()
+    assert QuotaLedger(str(path), daily_quota=100, reserve=1).calls == 4
+    assert not (tmp_path / "ledger.json.tmp").exists()
+
+
+def test_rate_limiter_respects_server_remaining(tmp_path) -> None:
+    ledger = QuotaLedger(str(tmp_path / "ledger.json"), daily_quota=0, reserve=5)
+    limiter = RateLimiter(TokenBucket(1000, 1), ledger)
+    limiter.acquire()
+    limiter.update_quota(remaining=4, reset=time.time() + 3600)
+    try:
+        limiter.acquire()
+    except QuotaExhausted:
+        pass
+    else:
+        raise AssertionError("ожидался QuotaExhausted")
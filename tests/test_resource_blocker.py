@@ -0,0 +1,47 @@
+import asyncio
+
+from app.utils.resource_blocker import ResourceBlocker
+
+
+class _FakeRequest:
+    def __init__(self, resource_type: str, url: str) -> None:
+        self.resource_type = resource_type
+        self.url = url
+
+
+class _FakeRoute:
+    def __init__(self, resource_type: str, url: str) -> None:
+        self.request = _FakeRequest(resource_type, url)
+        self.outcome = ""
+
+    async def abort(self) -> None:
+        self.outcome = "abort"
+
+    async def continue_(self) -> None:
+        self.outcome = "continue"
+
+
+def test_blocks_by_type_and_domain() -> None:
+    blocker = ResourceBlocker(("image", "font"), ("googletagmanager.com",), ())
+    assert blocker.should_block("image", "https://portugalruncalendar.com/logo.png")
+    assert blocker.should_block("script", "https://www.googletagmanager.com/gtm.js")
+    assert not blocker.should_block("document", "https://portugalruncalendar.com/")
+    assert not blocker.should_block("script", "https://portugalruncalendar.com/app.js")
+
+
+def test_allow_domain_has_priority() -> None:
+    blocker = ResourceBlocker(("image",), ("example.com",), ("cdn.example.com",))
+    assert not blocker.should_block("image", "https://cdn.example.com/a.png")
+    assert blocker.should_block("script", "https://example.com/a.js")
+
+
+def test_handler_counts_blocked_requests() -> None:
+    blocker = ResourceBlocker(("image",), (), ())
+    blocked = _FakeRoute("image", "https://x.pt/a.jpg")
+    allowed = _FakeRoute("document", "https://x.pt/")
+    asyncio.run(blocker._handle(blocked))
+    asyncio.run(blocker._handle(allowed))
+    assert (blocked.outcome, allowed.outcome) == ("abort", "continue")
+    assert blocker.stats.blocked == 1 and blocker.stats.allowed == 1
+    assert blocker.stats.blocked_by_type == {"image": 1}
+    assert blocker.stats.estimated_bytes_saved > 0
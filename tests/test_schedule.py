@@ -0,0 +1,43 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.utils.schedule import CronSchedule, next_run_time, parse_schedule
+
+LISBON = ZoneInfo("Europe/Lisbon")
+
+
+def test_daily_schedule_next_run() -> None:
+    schedule = CronSchedule.parse("2 6 * * *")
+    assert schedule.next_after(datetime(2026, 3, 10, 5, 0, tzinfo=LISBON)) == datetime(
+        2026, 3, 10, 6, 2, tzinfo=LISBON
+    )
+    assert schedule.next_after(datetime(2026, 3, 10, 6, 2, tzinfo=LISBON)) == datetime(
+        2026, 3, 11, 6, 2, tzinfo=LISBON
+    )
+
+
+def test_steps_ranges_weekdays_and_multiple_expressions() -> None:
+    schedules = parse_schedule("*/30 8-10 * * 1-5; 0 12 * * 0")
+    # Суббота 14.03.2026 -> воскресенье 12:00 раньше понедельника 08:00.
+    assert next_run_time(schedules, datetime(2026, 3, 14, 9, 0, tzinfo=LISBON)) == datetime(
+        2026, 3, 15, 12, 0, tzinfo=LISBON
+    )
+    assert next_run_time(schedules, datetime(2026, 3, 16, 8, 10, tzinfo=LISBON)) == datetime(
+        2026, 3, 16, 8, 30, tzinfo=LISBON
+    )
+
+
+def test_day_of_month_or_weekday_like_cron() -> None:
+    schedule = CronSchedule.parse("0 6 1 * 7")
+    # Ограничены оба поля — подходит 1-е число ИЛИ воскресенье.
+    assert schedule.next_after(datetime(2026, 3, 2, 7, 0, tzinfo=LISBON)).day == 8
+    assert schedule.next_after(datetime(2026, 3, 29, 7, 0, tzinfo=LISBON)).day == 1
+
+
+def test_invalid_expression() -> None:
+    with pytest.raises(ValueError):
+        CronSchedule.parse("61 6 * * *")
+    with pytest.raises(ValueError):
+        parse_schedule(" ")
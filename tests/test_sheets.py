@@ -2,7 +2,13 @@ import logging
 
 import gspread
 
-from app.integrations.sheets import _get_or_create_worksheet
+from app.integrations.sheets import (
+    SheetsSession,
+    _chunk_rows,
+    _delete_requests,
+    _get_or_create_worksheet,
+    diff_missing_races,
+)
 
 
 class _FakeWorksheet:
@@ -46,3 +52,71 @@ def test_get_or_create_worksheet_missing() -> None:
 
     assert result.title == "Missing races"
     assert spreadsheet.added == ["Missing races"]
+
+
+class _FakeBatchSpreadsheet:
+    def __init__(self) -> None:
+        self.requests: list[object] = []
+
+    def values_get(self, range_name: str) -> dict:
+        self.requests.append(range_name)
+        return {"values": [["RACE NAME", "DATE", "WEBSITE", "RACE NAME (PT)"]]}
+
+    def values_batch_get(self, ranges: list[str]) -> dict:
+        self.requests.append(ranges)
+        return {
+            "valueRanges": [
+                {"values": [["https://a.pt/x "], [], ["https://b.pt"]]},
+                {"values": [["Trail A 2027"]]},
+                {"values": [[], ["Corrida B 2027"]]},
+            ]
+        }
+
+
+def test_read_known_races_uses_one_batch_request() -> None:
+    session = object.__new__(SheetsSession)
+    session.logger = logging.getLogger("test")
+    session._spreadsheet = _FakeBatchSpreadsheet()
+
+    websites, names = session.read_known_races(
+        "RACES", "WEBSITE", ("RACE NAME", "RACE NAME (PT)", "MISSING")
+    )
+
+    assert websites == ["https://a.pt/x", "https://b.pt"]
+    assert names == ["Trail A 2027", "Corrida B 2027"]
+    assert session._spreadsheet.requests == [
+        "'RACES'!1:1",
+        ["'RACES'!C2:C", "'RACES'!A2:A", "'RACES'!D2:D"],
+    ]
+
+
+def test_diff_missing_races_keeps_existing_rows() -> None:
+    existing = [
+        ["Источник", "Ссылка", "Координаты", "Заметка"],
+        ["a.com", "https://www.a.pt/trail-2027/", "1, 2", "проверено"],
+        ["a.com", "https://old.pt/race-2026", "3, 4"],
+        ["", "", "", "заметка без ссылки"],
+        ["a.com", "https://a.pt/trail-2027", "1, 2"],
+    ]
+    rows = [("a.com", "https://a.pt/trail-2027", "1, 2"), ("b.com", "https://new.pt/x", "5, 6")]
+
+    diff = diff_missing_races(existing, rows)
+
+    assert diff.delete_rows == [3, 5]
+    assert diff.append_rows == [["b.com", "https://new.pt/x", "5, 6"]]
+    assert (diff.kept, diff.needs_header) == (1, False)
+    assert diff_missing_races([], rows).needs_header
+
+
+def test_delete_requests_merge_ranges_bottom_up_and_chunk_rows() -> None:
+    requests = _delete_requests(7, [3, 4, 5, 9])
+    ranges = [
+        (request["deleteDimension"]["range"]["startIndex"], request["deleteDimension"]["range"]["endIndex"])
+        for request in requests
+    ]
+    assert ranges == [(8, 9), (2, 5)]
+
+    rows = [["s", "u" * 40, "c"]] * 10
+    chunks = _chunk_rows(rows, 120)
+    assert sum(len(chunk) for chunk in chunks) == 10
+    assert all(len(chunk) == 2 for chunk in chunks)
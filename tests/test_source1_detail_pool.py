@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+from app.sources.source1_portugalruncalendar import _DETAIL_ATTEMPTS, _DetailPool, _WaitStats
+
+
+class _FakeLocator:
+    def __init__(self, page: "_FakePage") -> None:
+        self.page = page
+
+    @property
+    def first(self) -> "_FakeLocator":
+        return self
+
+    async def wait_for(self, state: str) -> None:
+        return None
+
+    async def inner_text(self) -> str:
+        return f"coords:{self.page.url}"
+
+
+class _FakePage:
+    """Вкладка: задержка загрузки по URL, выбранные URL всегда падают."""
+
+    def __init__(self, delays: dict[str, float], failing: set[str], log: dict) -> None:
+        self.delays = delays
+        self.failing = failing
+        self.log = log
+        self.url = ""
+
+    async def goto(self, url: str, wait_until: str) -> None:
+        self.log["goto"].append(url)
+        await asyncio.sleep(self.delays.get(url, 0.0))
+        if url in self.failing:
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+        self.url = url
+        self.log["completed"].append(url)
+
+    def locator(self, selector: str) -> _FakeLocator:
+        return _FakeLocator(self)
+
+    async def title(self) -> str:
+        return f"title:{self.url}"
+
+
+def _load(urls: list[str], delays: dict[str, float], failing: set[str], size: int = 2):
+    log: dict = {"goto": [], "completed": []}
+    pages = [_FakePage(delays, failing, log) for _ in range(size)]
+    pool = _DetailPool(pages, "div.coords", _WaitStats(False), logging.getLogger("test"))
+    cards = asyncio.run(pool.load(urls))
+    return pool, cards, log
+
+
+def test_results_keep_listing_order_when_completions_are_out_of_order() -> None:
+    urls = ["https://a.pt/slow", "https://a.pt/fast", "https://a.pt/medium"]
+    _, cards, log = _load(urls, {urls[0]: 0.05, urls[2]: 0.02}, set())
+
+    assert log["completed"] != urls
+    assert [card.url for card in cards] == urls
+    assert [card.coords_text for card in cards] == [f"coords:{url}" for url in urls]
+    assert [card.title for card in cards] == [f"title:{url}" for url in urls]
+
+
+def test_failing_card_is_skipped_and_others_return() -> None:
+    urls = ["https://a.pt/1", "https://a.pt/broken", "https://a.pt/3"]
+    pool, cards, _ = _load(urls, {}, {urls[1]})
+
+    assert cards[1].error is not None and cards[1].coords_text == ""
+    assert [card.error for card in (cards[0], cards[2])] == [None, None]
+    assert [card.coords_text for card in (cards[0], cards[2])] == [
+        f"coords:{urls[0]}",
+        f"coords:{urls[2]}",
+    ]
+    assert (pool.loaded, pool.failed) == (2, 1)
+
+
+def test_retries_are_bounded() -> None:
+    urls = ["https://a.pt/broken", "https://a.pt/ok"]
+    _, cards, log = _load(urls, {}, {urls[0]}, size=3)
+
+    assert log["goto"].count(urls[0]) == _DETAIL_ATTEMPTS
+    assert cards[0].attempts == _DETAIL_ATTEMPTS
+    assert cards[1].attempts == 1
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from app.sources.source1_portugalruncalendar import _NAME_SELECTOR, _extract_listing
+
+
+class _FakeLocator:
+    def __init__(self, items: list[dict]) -> None:
+        self._items = items
+
+    async def count(self) -> int:
+        return len(self._items)
+
+    def nth(self, idx: int) -> "_FakeLocator":
+        return _FakeLocator([self._items[idx]])
+
+    @property
+    def first(self) -> "_FakeLocator":
+        return self.nth(0)
+
+    async def get_attribute(self, name: str) -> str | None:
+        return self._items[0].get(name)
+
+    async def text_content(self) -> str | None:
+        return self._items[0].get("text")
+
+    def locator(self, selector: str) -> "_FakeLocator":
+        if selector == _NAME_SELECTOR:
+            name = self._items[0].get("name")
+            return _FakeLocator([{"text": name}] if name else [])
+        detail = self._items[0].get("detail")
+        return _FakeLocator([{"href": detail}] if detail else [])
+
+
+class _FakePage:
+    def __init__(self, items: list[dict], bulk_fails: bool) -> None:
+        self.items = items
+        self.bulk_fails = bulk_fails
+        self.bulk_calls = 0
+
+    async def eval_on_selector_all(self, selector: str, script: str, arg=None) -> list[dict]:
+        self.bulk_calls += 1
+        if self.bulk_fails:
+            raise RuntimeError("script failed")
+        return [
+            {"href": item.get("href"), "detail": item.get("detail"), "name": item.get("name", "")}
+            for item in self.items
+        ]
+
+    def locator(self, selector: str) -> _FakeLocator:
+        return _FakeLocator(self.items)
+
+
+ITEMS = [
+    {"href": "/evento/a", "detail": "https://a.pt/inscricoes", "name": " Trail A 2027 "},
+    {"href": None},
+    {"href": "/evento/b"},
+]
+EXPECTED = [("/evento/a", "https://a.pt/inscricoes", "Trail A 2027"), ("/evento/b", None, "")]
+
+
+def test_extract_listing_single_roundtrip() -> None:
+    page = _FakePage(ITEMS, bulk_fails=False)
+    listing = asyncio.run(_extract_listing(page, "a.block", "a.w-full", logging.getLogger("test")))
+    assert listing == EXPECTED
+    assert page.bulk_calls == 1
+
+
+def test_extract_listing_falls_back_to_locators() -> None:
+    page = _FakePage(ITEMS, bulk_fails=True)
+    listing = asyncio.run(_extract_listing(page, "a.block", "a.w-full", logging.getLogger("test")))
+    assert listing == EXPECTED
@@ -0,0 +1,63 @@
+from app.sources.source1_payload import (
+    events_from_html,
+    events_from_payload,
+    next_page_url,
+    same_endpoint,
+)
+
+
+BASE = "https://portugalruncalendar.com/"
+
+
+def test_events_from_xhr_payload_prefers_external_url() -> None:
+    payload = {
+        "data": {
+            "events": [
+                {
+                    "title": "Meia Maratona de Lisboa 2027",
+                    "slug": "meia-maratona-lisboa-2027",
+                    "url": "/eventos/meia-maratona-lisboa-2027",
+                    "website": "https://www.meiamaratonalisboa.pt/",
+                    "location": {"name": "Lisboa", "lat": "38.70", "lng": "-9.14"},
+                },
+                {"title": "Sem coordenadas", "url": "/eventos/x"},
+            ],
+            "total": 2,
+        }
+    }
+    events = events_from_payload(payload, BASE)
+    assert len(events) == 1
+    assert events[0].url == "https://www.meiamaratonalisboa.pt/"
+    assert events[0].name == "Meia Maratona de Lisboa 2027"
+    assert (events[0].lat, events[0].lon) == (38.70, -9.14)
+
+
+def test_events_from_json_ld_in_html() -> None:
+    html = """
+    <script type="application/ld+json">
+    {"@type": "Event", "name": "Trail do Gerês", "url": "https://portugalruncalendar.com/e/geres",
+     "location": {"@type": "Place", "geo": {"latitude": 41.73, "longitude": -8.16}}}
+    </script>
+    <script type="application/json">not json</script>
+    """
+    events = events_from_html(html, BASE)
+    assert [(event.url, event.lat, event.lon) for event in events] == [
+        ("https://portugalruncalendar.com/e/geres", 41.73, -8.16)
+    ]
+
+
+def test_next_page_url() -> None:
+    assert next_page_url("https://api.example.com/events?page=2&limit=20", 20) == (
+        "https://api.example.com/events?page=3&limit=20"
+    )
+    assert next_page_url("https://api.example.com/events?offset=40", 20) == (
+        "https://api.example.com/events?offset=60"
+    )
+    assert next_page_url("https://api.example.com/events?limit=20", 20) is None
+
+
+def test_same_endpoint_ignores_query() -> None:
+    listing = "https://api.example.com/events?page=1"
+    assert same_endpoint("https://api.example.com/events/?page=3&limit=20", listing)
+    assert not same_endpoint("https://api.example.com/featured?page=1", listing)
+    assert not same_endpoint("https://widgets.example.com/events?page=1", listing)
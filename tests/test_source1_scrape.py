@@ -0,0 +1,259 @@
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs, urlsplit
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.integrations.matching import KnownIndex
+from app.sources.source1_portugalruncalendar import _HREFS_JS, scrape_source1
+
+
+BASE = "https://portugalruncalendar.com/"
+API = "https://api.portugalruncalendar.com/events?page=1"
+COORDS_SELECTOR = "div.coords"
+LISBON = (38.72, -9.14)
+
+
+def _event(slug: str, name: str) -> dict:
+    return {
+        "title": name,
+        "website": f"https://{slug}.pt/corrida-{slug}-2027",
+        "lat": LISBON[0],
+        "lng": LISBON[1],
+    }
+
+
+class _FakeResponse:
+    def __init__(self, url: str, payload, status: int = 200) -> None:
+        self.url = url
+        self._payload = payload
+        self.status = status
+        self.ok = status < 400
+        self.request = type("_Request", (), {"resource_type": "xhr"})()
+        self.headers = {"content-type": "application/json"}
+
+    async def json(self):
+        return self._payload
+
+
+class _FakeRequest:
+    def __init__(self, pages: dict[int, list[dict]]) -> None:
+        self.pages = pages
+        self.calls: list[str] = []
+
+    async def get(self, url: str, timeout: int) -> _FakeResponse:
+        self.calls.append(url)
+        number = int(parse_qs(urlsplit(url).query)["page"][0])
+        return _FakeResponse(url, {"events": self.pages.get(number, [])})
+
+
+class _FakeLocator:
+    def __init__(self, page: "_FakePage", selector: str) -> None:
+        self.page = page
+        self.selector = selector
+
+    async def count(self) -> int:
+        return 0  # кнопки Próxima нет
+
+    @property
+    def first(self) -> "_FakeLocator":
+        return self
+
+    async def wait_for(self, state: str) -> None:
+        return None
+
+    async def inner_text(self) -> str:
+        return f"{LISBON[0]}, {LISBON[1]}"
+
+
+class _FakePage:
+    def __init__(self, context: "_FakeContext") -> None:
+        self.context = context
+        self.url = ""
+        self.handlers: list = []
+
+    def set_default_timeout(self, timeout_ms: int) -> None:
+        return None
+
+    def on(self, event: str, handler) -> None:
+        self.handlers.append(handler)
+
+    async def goto(self, url: str, wait_until: str) -> None:
+        self.url = url
+        if url == BASE:
+            self.context.listing_visits += 1
+            for handler in self.handlers:
+                handler(_FakeResponse(API, {"events": self.context.first_payload}))
+                for url, payload in self.context.extra_responses:
+                    handler(_FakeResponse(url, payload))
+        else:
+            self.context.detail_visits.append(url)
+
+    async def wait_for_function(self, script: str, arg=None, timeout=None) -> None:
+        if not self.context.listing and self.context.empty_listing_times_out:
+            raise PlaywrightTimeoutError("Timeout 1000ms exceeded.")
+
+    async def eval_on_selector_all(self, selector: str, script: str, arg=None) -> list:
+        if script == _HREFS_JS:
+            return [row["href"] for row in self.context.listing]
+        return self.context.listing
+
+    async def content(self) -> str:
+        return self.context.html
+
+    def locator(self, selector: str) -> _FakeLocator:
+        return _FakeLocator(self, selector)
+
+    async def title(self) -> str:
+        return "Corrida Nova 2027 - Lisboa | Portugal Run Calendar"
+
+    async def close(self) -> None:
+        return None
+
+
+class _FakeContext:
+    def __init__(
+        self,
+        first_payload: list[dict],
+        api_pages: dict[int, list[dict]],
+        listing=(),
+        html: str = "",
+        extra_responses=(),
+        empty_listing_times_out: bool = False,
+    ):
+        self.first_payload = first_payload
+        self.request = _FakeRequest(api_pages)
+        self.listing = list(listing)
+        self.html = html
+        self.extra_responses = list(extra_responses)
+        self.empty_listing_times_out = empty_listing_times_out
+        self.listing_visits = 0
+        self.detail_visits: list[str] = []
+
+    async def new_page(self) -> _FakePage:
+        return _FakePage(self)
+
+
+def _scrape(context: _FakeContext, mode: str, known_index: KnownIndex | None) -> dict:
+    return asyncio.run(
+        scrape_source1(
+            context,
+            BASE,
+            "a.block",
+            "button.next",
+            COORDS_SELECTOR,
+            "a.w-full",
+            1000,
+            10,
+            "https://opencage.test",
+            "",
+            0.0,
+            None,
+            None,
+            15.0,
+            2,
+            False,
+            mode,
+            known_index,
+            logging.getLogger("test"),
+        )
+    )
+
+
+def test_replay_continues_past_page_of_known_races() -> None:
+    known = [_event(f"known-{idx}", f"Known {idx} 2027") for idx in range(3)]
+    context = _FakeContext(
+        first_payload=[_event("first", "Corrida Primeira 2027")],
+        api_pages={2: known, 3: [_event("late", "Corrida Tardia 2027")]},
+    )
+    known_index = KnownIndex([event["website"] for event in known])
+
+    results = _scrape(context, "json", known_index)
+
+    assert set(results) == {"//first.pt/corrida-first-2027", "//late.pt/corrida-late-2027"}
+    # страница 4 пуста — на ней пагинация и остановилась
+    assert len(context.request.calls) == 3
+
+
+def test_replay_stops_when_api_repeats_page() -> None:
+    # API не понимает параметр страницы и всегда отдаёт первую страницу
+    first = [_event("first", "Corrida Primeira 2027")]
+    context = _FakeContext(first_payload=first, api_pages={n: first for n in range(2, 20)})
+
+    results = _scrape(context, "json", None)
+
+    assert set(results) == {"//first.pt/corrida-first-2027"}
+    assert len(context.request.calls) == 1
+
+
+def test_listing_item_known_by_name_skips_detail_page() -> None:
+    context = _FakeContext(
+        first_payload=[],
+        api_pages={},
+        listing=[
+            {"href": "/evento/trail-conhecido", "detail": None, "name": "Trail Conhecido 2027"},
+            {"href": "/evento/corrida-nova", "detail": None, "name": "Corrida Nova 2027"},
+        ],
+    )
+    known_index = KnownIndex([], names=["Trail Conhecido 2027"])
+
+    results = _scrape(context, "dom", known_index)
+
+    assert context.detail_visits == ["https://portugalruncalendar.com/evento/corrida-nova"]
+    assert set(results) == {"//portugalruncalendar.com/evento/corrida-nova"}
+
+
+def test_stray_json_ld_event_does_not_replace_dom_listing() -> None:
+    stray = json.dumps(_event("widget", "Corrida Patrocinada 2027"))
+    context = _FakeContext(
+        first_payload=[],
+        api_pages={},
+        listing=[
+            {"href": "/evento/corrida-um", "detail": None, "name": "Corrida Um 2027"},
+            {"href": "/evento/corrida-dois", "detail": None, "name": "Corrida Dois 2027"},
+        ],
+        html=f'<script type="application/ld+json">{stray}</script>',
+    )
+
+    results = _scrape(context, "auto", None)
+
+    assert set(results) == {
+        "//portugalruncalendar.com/evento/corrida-um",
+        "//portugalruncalendar.com/evento/corrida-dois",
+    }
+
+
+def test_side_widget_xhr_is_not_taken_for_listing_endpoint() -> None:
+    context = _FakeContext(
+        first_payload=[
+            _event("first", "Corrida Primeira 2027"),
+            _event("second", "Corrida Segunda 2027"),
+        ],
+        api_pages={2: [_event("late", "Corrida Tardia 2027")]},
+        extra_responses=[
+            (
+                "https://widgets.example.com/featured?page=1",
+                {"items": [_event("ad", "Corrida Anúncio 2027")]},
+            )
+        ],
+    )
+
+    results = _scrape(context, "auto", None)
+
+    assert set(results) == {
+        "//first.pt/corrida-first-2027",
+        "//second.pt/corrida-second-2027",
+        "//late.pt/corrida-late-2027",
+    }
+    assert all(call.startswith(API.split("?")[0]) for call in context.request.calls)
+
+
+def test_empty_listing_is_not_a_load_failure() -> None:
+    # Межсезонье: ссылок событий нет, ожидание первой ссылки истекает.
+    context = _FakeContext(first_payload=[], api_pages={}, empty_listing_times_out=True)
+
+    results = _scrape(context, "auto", None)
+
+    assert results == {}
+    assert context.listing_visits == 1
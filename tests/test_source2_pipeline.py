@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from app.integrations.matching import KnownIndex
+from app.sources import source2_portugalrunning as source2
+from app.utils.card_fetcher import CardResult
+
+
+PR = "https://www.portugalrunning.com/eventos"
+
+EVENTS = [
+    # известна по названию
+    {"SUMMARY": "Trail Conhecido 2099", "URL": f"{PR}/trail-conhecido/", "LOCATION": "Braga"},
+    # известна по канонической ссылке фида
+    {"SUMMARY": "Corrida Velha 2099", "URL": f"{PR}/corrida-velha-2099/", "LOCATION": "Porto"},
+    # регистрационная ссылка с карточки уже есть в RACES
+    {"SUMMARY": "Meia Nova 2099", "URL": f"{PR}/meia-nova/", "LOCATION": "Faro"},
+    # новая трасса
+    {"SUMMARY": "Trail Fresco 2099", "URL": f"{PR}/trail-fresco/", "LOCATION": "Sintra"},
+]
+REG_LINKS = {
+    f"{PR}/meia-nova/": "https://known-reg.pt/meia-nova-2099",
+    f"{PR}/trail-fresco/": "https://trail-fresco.pt/inscricao",
+}
+
+
+class _FakeCardFetcher:
+    requested: list[str] = []
+
+    def __init__(self, timeout_sec, workers, per_host, logger) -> None:
+        self.fetched = self.not_found = self.failed = 0
+
+    async def fetch_many(self, urls: list[str], selector: str) -> list[CardResult]:
+        _FakeCardFetcher.requested.extend(urls)
+        self.fetched += len(urls)
+        return [CardResult(url, found=True, href=REG_LINKS.get(url)) for url in urls]
+
+
+def test_known_events_never_reach_cards_or_geocoding(monkeypatch, tmp_path) -> None:
+    geocoded: list[str] = []
+
+    async def _fake_download(*args, **kwargs):
+        return [dict(event, DTSTART="20990601") for event in EVENTS]
+
+    async def _fake_geocode(locations, *args, **kwargs):
+        geocoded.extend(locations)
+        return {location: (38.8, -9.38) for location in locations}
+
+    _FakeCardFetcher.requested = []
+    monkeypatch.setattr(source2, "_download_feed", _fake_download)
+    monkeypatch.setattr(source2, "CardFetcher", _FakeCardFetcher)
+    monkeypatch.setattr(source2, "geocode_locations_portugal", _fake_geocode)
+    known_index = KnownIndex(
+        [f"{PR}/corrida-velha-2099/", "https://known-reg.pt/meia-nova-2099"],
+        names=["Trail Conhecido 2099"],
+    )
+
+    results = asyncio.run(
+        source2.scrape_source2(
+            None,
+            "https://www.portugalrunning.com/export-events/all/",
+            "key",
+            "https://www.portugalrunning.com/calendario/",
+            str(tmp_path / "feed.json"),
+            str(tmp_path / "events.json"),
+            0,
+            "a.registration",
+            1000,
+            4,
+            2,
+            "https://opencage.test",
+            "",
+            0.0,
+            None,
+            None,
+            2,
+            known_index,
+            logging.getLogger("test"),
+        )
+    )
+
+    # имя → ссылка фида → карточка → повторная проверка → геокодинг пачкой
+    assert sorted(_FakeCardFetcher.requested) == [f"{PR}/meia-nova/", f"{PR}/trail-fresco/"]
+    assert geocoded == ["Sintra"]
+    assert [url for url, _, _ in results.values()] == ["https://trail-fresco.pt/inscricao"]